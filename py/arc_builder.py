@@ -0,0 +1,64 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from dist_matrix import project_flat
+
+# =========================================================
+# 유효 아크(arc) 생성기 (KD-tree 공간 색인 기반)
+# =========================================================
+# 기존 _build_valid_arcs 는 모든 (i, j) 쌍을 MAX_DIST 와 비교하고
+# 이중 루프 안에서 `i in self.hubs` 리스트 탐색을 수행했습니다 (O(N²·H)).
+# 여기서는 평면 좌표 KD-tree 로 반경 내 이웃만 뽑고,
+# 허브 강제 아크와 승객 -> 목적지 아크를 배열 연산으로 추가합니다.
+
+
+def build_valid_arcs(lat, lon, hubs, user_dest, max_dist, verbose=True):
+    """
+    유효 아크 목록 [(i, j), ...] 생성
+
+    - 평면 거리(111000/88800 근사)가 max_dist 이하인 모든 쌍 (양방향)
+    - 허브에서 나가거나 허브로 들어오는 모든 아크
+    - 승객 -> 목적지 아크 (거리와 무관하게 강제 포함)
+    """
+    pts = project_flat(lat, lon)
+    n = len(pts)
+    hubs = np.asarray(hubs if isinstance(hubs, np.ndarray) else list(hubs), dtype=np.int64)
+
+    # 1. 반경 내 이웃 쌍 (i < j) -> 양방향
+    pairs = cKDTree(pts).query_pairs(r=max_dist, output_type='ndarray').astype(np.int64)
+    src = [pairs[:, 0], pairs[:, 1]]
+    dst = [pairs[:, 1], pairs[:, 0]]
+
+    # 2. 허브 강제 아크 (허브 <-> 전체 노드)
+    if len(hubs):
+        others = np.arange(n, dtype=np.int64)
+        h_rep = np.repeat(hubs, n)
+        o_tile = np.tile(others, len(hubs))
+        src += [h_rep, o_tile]
+        dst += [o_tile, h_rep]
+
+    # 3. 승객 -> 목적지 아크 (user_dest: {승객: 목적지} 또는 (승객 배열, 목적지 배열))
+    if isinstance(user_dest, dict):
+        user_dest = (np.fromiter(user_dest.keys(), dtype=np.int64, count=len(user_dest)),
+                     np.fromiter(user_dest.values(), dtype=np.int64, count=len(user_dest)))
+    if user_dest is not None and len(user_dest[0]):
+        src.append(np.asarray(user_dest[0], dtype=np.int64))
+        dst.append(np.asarray(user_dest[1], dtype=np.int64))
+
+    src = np.concatenate(src)
+    dst = np.concatenate(dst)
+    keep = src != dst
+    # (i, j) 를 하나의 정수 키로 묶어 중복 제거 + 정렬
+    codes = np.unique(src[keep] * n + dst[keep])
+    arcs = list(zip((codes // n).tolist(), (codes % n).tolist()))
+
+    if verbose:
+        density = len(arcs) / max(n * (n - 1), 1)
+        print(f" - 유효 아크 수: {len(arcs):,} / {n * (n - 1):,} (밀도 {density:.1%})")
+    return arcs
+
+
+def build_node_arcs(nodes, max_dist, verbose=True):
+    """NodeStore 에서 바로 유효 아크 생성 (허브 / 승객 목적지는 저장소 배열 그대로 사용)"""
+    return build_valid_arcs(nodes.lat, nodes.lon, nodes.hubs, (nodes.users, nodes.dest[nodes.users]),
+                            max_dist, verbose=verbose)
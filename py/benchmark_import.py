@@ -0,0 +1,107 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# =========================================================
+# 콜드 스타트 / import 시간 벤치마크 (python -X importtime)
+# =========================================================
+# 모듈마다 새 인터프리터로 `python -X importtime -c "import 모듈"` 을 실행해
+# stderr 의 import 시간 표에서 최상위 import 누적 시간을 합산하고, 가장 무거운 패키지를 함께 보여줍니다.
+# `cli.py --help` 는 실제 프로세스 시작부터 종료까지의 벽시계 시간도 잽니다.
+#
+#   python benchmark_import.py              # 기본 모듈 전체, 3회 중 최솟값
+#   python benchmark_import.py elbow_map -n 5
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+
+DEFAULT_MODULES = [
+    "cli", "pipeline", "final_stop_set", "cheonan_heatmap", "elbow_hub", "elbow_map", "hub_location",
+    "map_render", "create_passengers", "fast_ver_opt", "ideal_ver_opt", "v2g_economics", "v2g_scheduler",
+    "scenario_mc", "gridstable", "social",
+]
+REPEAT = 3
+TOP_PACKAGES = 3
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr, module=None):
+    """
+    -X importtime 출력 -> (최상위 import 누적 합 ms, [(패키지, ms), ...] 무거운 순)
+
+    패키지별 시간은 하위 모듈의 self 시간을 최상위 패키지 이름으로 묶은 합입니다. (module 자신은 제외)
+    """
+    total, by_package = 0.0, {}
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        if len(m.group(3)) == 1:   # 들여쓰기 1칸 = 최상위 import
+            total += int(m.group(2)) / 1000
+        root = m.group(4).split(".")[0]
+        if root != module:
+            by_package[root] = by_package.get(root, 0.0) + int(m.group(1)) / 1000
+    return total, sorted(by_package.items(), key=lambda t: -t[1])
+
+
+def import_time(module, repeat=REPEAT, python=sys.executable):
+    """새 프로세스에서 module import 시간 (repeat 회 중 최솟값) + 무거운 최상위 패키지"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=BASE_DIR,
+                              capture_output=True, text=True, encoding="utf-8", errors="replace")
+        wall = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            err = proc.stderr.strip().splitlines()
+            return {"module": module, "import_ms": None, "wall_ms": wall, "heaviest": "",
+                    "error": err[-1] if err else f"종료 코드 {proc.returncode}"}
+        total, top = parse_importtime(proc.stderr, module)
+        if best is None or total < best["import_ms"]:
+            best = {"module": module, "import_ms": total, "wall_ms": wall,
+                    "heaviest": ", ".join(f"{name} {ms:.0f}ms" for name, ms in top[:TOP_PACKAGES]), "error": ""}
+    return best
+
+
+def startup_time(args, repeat=REPEAT, python=sys.executable):
+    """명령 전체 실행 벽시계 시간 ms (repeat 회 중 최솟값)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([python] + list(args), cwd=BASE_DIR, capture_output=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main(argv=None):
+    """모듈별 import 시간 표 출력 + visualization/import_time.csv 저장"""
+    parser = argparse.ArgumentParser(description="-X importtime 콜드 스타트 벤치마크")
+    parser.add_argument("modules", nargs="*", help=f"측정할 모듈 (생략 시 {len(DEFAULT_MODULES)}개 기본 모듈)")
+    parser.add_argument("-n", "--repeat", type=int, default=REPEAT, help="반복 횟수 (최솟값 사용)")
+    opts = parser.parse_args(argv)
+
+    import pandas as pd
+
+    rows = [import_time(m, opts.repeat) for m in (opts.modules or DEFAULT_MODULES)]
+    table = pd.DataFrame(rows)
+    baseline = startup_time(["-c", "pass"], opts.repeat)
+    cli_help = startup_time(["cli.py", "--help"], opts.repeat)
+
+    print(table.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+    print(f"⏱ 빈 인터프리터 {baseline:.0f}ms, `cli.py --help` {cli_help:.0f}ms "
+          f"(인터프리터 제외 {cli_help - baseline:.0f}ms)")
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+    out_path = os.path.join(VISUAL_DIR, "import_time.csv")
+    table.to_csv(out_path, index=False, encoding="utf-8-sig")
+    print(f"✅ import 시간 저장: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
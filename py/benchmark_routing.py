@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+import importlib.util
+import json
+import time
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from demand_generator import sample_request_times
+from dist_matrix import LAT_TO_M, LON_TO_M
+
+# =========================================================
+# 1. 경로 자동 설정
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/ 폴더
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+BENCH_DIR = os.path.join(VISUAL_DIR, "benchmark")
+
+# 기본 인스턴스 크기: (승객 수, 차량 수, 허브 수 / None = 전체)
+# 차량 경로가 허브 -> 다른 허브 형태라 허브는 2개 이상이어야 합니다.
+DEFAULT_SIZES = [(12, 3, None), (30, 6, None), (60, 12, None), (120, 12, None)]
+DEFAULT_ENGINES = ["xpress", "xpress_tight", "heuristic", "realtime"]
+# MIP 엔진 -> fast_ver_opt 정식화 ("xpress_tight" 는 강화 정식화 + 부분 순회 절단 콜백)
+XPRESS_ENGINES = {"xpress": "bigm", "xpress_tight": "tight"}
+
+ORIGIN_SPREAD = 800    # 승객 출발지: 임의 정류장 주변 정규분포 (m)
+
+
+def xpress_available():
+    """xpress 패키지 설치 여부 (라이선스 문제는 실행 시 오류로 기록)"""
+    return importlib.util.find_spec("xpress") is not None
+
+
+# =========================================================
+# 2. 벤치마크 인스턴스 생성
+# =========================================================
+def make_instance(df_base, num_passengers, num_hubs=None, seed=0):
+    """
+    허브 일부 + 전체 정류장으로 기반 노드를 만들고, 정류장 주변에 승객을 샘플링
+    (반환 형식은 hub_and_stop_locations.csv / passenger_data.csv 와 동일)
+    """
+    rng = np.random.default_rng(seed)
+    df_base = df_base.copy()
+    df_base.columns = df_base.columns.str.strip()
+    if num_hubs is not None:
+        hubs = df_base.index[df_base['location_type'] == 0][:num_hubs]
+        df_base = df_base[(df_base['location_type'] != 0) | df_base.index.isin(hubs)]
+    df_base = df_base.reset_index(drop=True)
+
+    stops = df_base.index[df_base['location_type'] == 1].to_numpy()
+    origin = rng.choice(stops, size=num_passengers)
+    jitter = rng.normal(0, ORIGIN_SPREAD, size=(num_passengers, 2))
+    df_psg = pd.DataFrame({
+        'passenger_id': [f'PASS_{i:03d}' for i in range(1, num_passengers + 1)],
+        'location_type': 2,
+        'lat': df_base.loc[origin, 'lat'].to_numpy() + jitter[:, 0] / LAT_TO_M,
+        'lon': df_base.loc[origin, 'lon'].to_numpy() + jitter[:, 1] / LON_TO_M,
+        'dest_id': rng.choice(stops, size=num_passengers),
+        'request_time': sample_request_times(rng, num_passengers),
+    })
+    return df_base, df_psg
+
+
+# =========================================================
+# 3. 엔진별 실행 (워커 프로세스에서 1건씩 실행해 메모리 최고치를 분리)
+# =========================================================
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_xpress(df_base, df_psg, num_vehicles, maxtime, miprelstop, with_results, record, formulation="bigm"):
+    from fast_ver_opt import CheonanSmartCity_Master_Final
+
+    model = CheonanSmartCity_Master_Final(df_base, df_psg, BENCH_DIR, num_vehicles=num_vehicles,
+                                          formulation=formulation)
+    model.build_model()
+    attrs = model.prob.attributes
+    record.update(build_time=model.build_time, variables=attrs.cols, constraints=attrs.rows,
+                  arcs=len(model.arcs))
+
+    start = time.perf_counter()
+    if with_results:
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        model.solve_and_generate_results(maxtime=maxtime, miprelstop=miprelstop)
+        record["output_time"] = time.perf_counter() - start - model.solve_time
+    else:
+        model.solve(maxtime=maxtime, miprelstop=miprelstop)
+    record["solve_time"] = model.solve_time
+
+    if attrs.mipsols > 0:
+        obj, bound = attrs.mipobjval, attrs.bestbound
+        record["objective"] = obj
+        record["gap"] = abs(bound - obj) / max(abs(obj), 1e-9)
+        record["served"] = int(sum(model.prob.getSolution(model.z[u]) > 0.5 for u in model.users))
+    record["status"] = "ok" if attrs.mipsols > 0 else "no_solution"
+
+
+def _run_heuristic(df_base, df_psg, num_vehicles, time_limit, record):
+    from heuristic_dispatch import HeuristicDispatcher
+
+    start = time.perf_counter()
+    h = HeuristicDispatcher(df_base, df_psg, num_vehicles=num_vehicles, time_limit=time_limit)
+    record["build_time"] = time.perf_counter() - start
+    record["arcs"] = int(h.allowed.sum())
+    res = h.solve()
+    record.update(solve_time=h.solve_time, objective=res["objective"], served=len(res["served"]),
+                  status="ok")
+
+
+def _run_realtime(df_base, df_psg, num_vehicles, record):
+    from realtime_dispatcher import RealtimeDispatcher
+
+    start = time.perf_counter()
+    d = RealtimeDispatcher(df_base, num_vehicles=num_vehicles)
+    record["build_time"] = time.perf_counter() - start
+    start = time.perf_counter()
+    m = d.replay(df_psg)
+    record.update(solve_time=time.perf_counter() - start, objective=m["objective"], served=m["accepted"],
+                  p50_ms=m["p50_ms"], p99_ms=m["p99_ms"], status="ok")
+
+
+def _run_case(case):
+    """벤치마크 1건 실행 -> 결과 레코드(dict)"""
+    df_base, df_psg = make_instance(case["base"], case["passengers"], case["hubs"], case["seed"])
+    record = {
+        "engine": case["engine"],
+        "passengers": case["passengers"],
+        "vehicles": case["vehicles"],
+        "hubs": int((df_base['location_type'] == 0).sum()),
+        "seed": case["seed"],
+        "build_time": None, "solve_time": None, "output_time": None,
+        "objective": None, "gap": None, "served": None,
+        "variables": None, "constraints": None, "arcs": None,
+        "mem_base_mb": _peak_rss_mb(), "mem_peak_mb": None, "status": None,
+    }
+    try:
+        if case["engine"] in XPRESS_ENGINES:
+            _run_xpress(df_base, df_psg, case["vehicles"], case["maxtime"], case["miprelstop"],
+                        case["with_results"], record, XPRESS_ENGINES[case["engine"]])
+        elif case["engine"] == "heuristic":
+            _run_heuristic(df_base, df_psg, case["vehicles"], case["time_limit"], record)
+        elif case["engine"] == "realtime":
+            _run_realtime(df_base, df_psg, case["vehicles"], record)
+        else:
+            raise ValueError(f"알 수 없는 엔진입니다: {case['engine']}")
+    except Exception as e:  # 라이선스 한도 초과 등은 기록만 하고 다음 케이스로 진행
+        record["status"] = f"error: {type(e).__name__}: {e}"
+    record["mem_peak_mb"] = _peak_rss_mb()
+    return record
+
+
+# =========================================================
+# 4. 벤치마크 스위트
+# =========================================================
+def run_benchmark(node_file, sizes=DEFAULT_SIZES, engines=DEFAULT_ENGINES, seeds=(0,), maxtime=60,
+                  miprelstop=0.15, time_limit=0.5, with_results=False, output_dir=BENCH_DIR, tag="routing"):
+    """
+    크기별 인스턴스 × 엔진 × 시드 조합을 실행하고 JSON / CSV 보고서를 저장
+
+    - 각 실행은 새 워커 프로세스에서 돌려 메모리 최고치(mem_peak_mb)가 서로 섞이지 않게 합니다.
+    - xpress 가 없으면 MIP 엔진은 건너뛰고 나머지 엔진만 실행합니다.
+    - with_results=True 이면 solve_and_generate_results(지도/엑셀 출력) 시간도 output_time 으로 기록합니다.
+    """
+    df_base = node_file if isinstance(node_file, pd.DataFrame) else pd.read_csv(node_file)
+    engines = list(engines)
+    if any(e in XPRESS_ENGINES for e in engines) and not xpress_available():
+        print("⚠️ xpress 미설치: MIP 엔진을 건너뜁니다.")
+        engines = [e for e in engines if e not in XPRESS_ENGINES]
+
+    records = []
+    for n_psg, n_veh, n_hub in sizes:
+        for seed in seeds:
+            for engine in engines:
+                case = {"base": df_base, "engine": engine, "passengers": n_psg, "vehicles": n_veh,
+                        "hubs": n_hub, "seed": seed, "maxtime": maxtime, "miprelstop": miprelstop,
+                        "time_limit": time_limit, "with_results": with_results}
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    record = pool.submit(_run_case, case).result()
+                records.append(record)
+                obj = f"{record['objective']:,.0f}" if record["objective"] is not None else "-"
+                print(f"📊 [{engine}] 승객 {n_psg} / 차량 {n_veh} / 허브 {record['hubs']} (seed {seed}): "
+                      f"구축 {record['build_time'] or 0:.2f}초, 풀이 {record['solve_time'] or 0:.2f}초, "
+                      f"목적함수 {obj}, {record['status']}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, f"benchmark_{tag}.json")
+    csv_path = os.path.join(output_dir, f"benchmark_{tag}.csv")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2, default=float)
+    pd.DataFrame(records).to_csv(csv_path, index=False, encoding="utf-8-sig")
+    print(f"✅ 벤치마크 보고서 저장: {json_path}")
+    return records
+
+
+def main():
+    """기본 허브 파일로 엔진별 벤치마크 실행"""
+    hub_file = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
+    run_benchmark(hub_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import os
+from scipy.spatial import cKDTree
+
+# =========================================================
+# 교통 사각지대(버스정류장 400m 서비스권 밖 인구 격자) 판정 공용 모듈
+# =========================================================
+# 정류장마다 400m 버퍼를 만들어 하나로 합친(union) 뒤 격자 중심점마다 within 을 검사하는 대신,
+# 정류장 좌표로 KD-tree 를 만들고 "가장 가까운 정류장까지 거리 <= 400m" 로 판정합니다.
+# 폴리곤 합집합이 필요 없어 전국 격자 / 전국 정류장 규모에서도 메모리와 시간이 선형에 가깝습니다.
+# 기존 결과와 같도록 기본값은 buffer(400) 다각형(사분원당 16분할)과 같은 판정을 하며,
+# 내접 다각형 반지름 ~ 400m 사이에 걸친 소수의 점만 정류장별 버퍼로 정밀 검사합니다.
+# (resolution=None 이면 정확한 원 기준)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+
+BUS_EXCEL_PATH = os.path.join(DATA_DIR, "국토교통부_전국 버스정류장 위치정보_20251031.xlsx")
+
+SERVICE_DIST = 400        # 서비스 반경 400m
+METRIC_EPSG = 5179
+QUERY_CHUNK = 1_000_000   # 한 번에 질의할 격자 수 (메모리 상한)
+BUFFER_RESOLUTION = 16    # GeoPandas buffer 기본 분할 수
+
+
+def points_xy(gdf):
+    """GeoDataFrame (EPSG:5179) -> 점/중심점 좌표 (n, 2) 배열"""
+    geom = gdf.geometry
+    if not (geom.geom_type == "Point").all():
+        geom = geom.centroid
+    return np.column_stack([geom.x.to_numpy(), geom.y.to_numpy()])
+
+
+def covered_mask(query_xy, stops, radius=SERVICE_DIST, chunk_size=QUERY_CHUNK, resolution=BUFFER_RESOLUTION):
+    """각 질의 점이 radius 안에 정류장을 하나라도 가지는지 (bool 배열, stops 는 좌표 배열 또는 cKDTree)"""
+    query_xy = np.asarray(query_xy, dtype=np.float64)
+    out = np.zeros(len(query_xy), dtype=bool)
+    tree = stops if isinstance(stops, cKDTree) else cKDTree(np.asarray(stops, dtype=np.float64).reshape(-1, 2))
+    if tree.n == 0:
+        return out
+    bound = np.nextafter(radius, np.inf)  # 정확히 radius 인 점도 서비스권으로 포함
+    for start in range(0, len(query_xy), chunk_size):
+        dist, _ = tree.query(query_xy[start:start + chunk_size], k=1, distance_upper_bound=bound, workers=-1)
+        out[start:start + chunk_size] = dist <= radius
+        if resolution:
+            # 내접 다각형 반지름보다 먼 점은 buffer 다각형 안에 있는지 직접 확인
+            inner = radius * np.cos(np.pi / (4 * resolution))
+            for k in np.flatnonzero((dist > inner) & (dist <= radius)):
+                out[start + k] = _in_buffer(tree, query_xy[start + k], radius, resolution)
+    return out
+
+
+def _in_buffer(tree, pt, radius, resolution):
+    import shapely
+
+    near = tree.query_ball_point(pt, radius)
+    buffers = shapely.buffer(shapely.points(tree.data[near]), radius, quad_segs=resolution)
+    return bool(shapely.contains_xy(buffers, pt[0], pt[1]).any())
+
+
+def find_blind_spots(grid, bus_stops, radius=SERVICE_DIST):
+    """인구가 있고(val > 0) 중심점 radius 안에 정류장이 없는 격자 (grid 의 부분 GeoDataFrame)"""
+    populated = grid[grid['val'] > 0]
+    covered = covered_mask(points_xy(populated), points_xy(bus_stops), radius)
+    return populated[~covered].copy()
+
+
+# =========================================================
+# 전국 정류장 엑셀 기반 도시별 일괄 분석
+# =========================================================
+def load_bus_stops(excel_path=BUS_EXCEL_PATH, city=None):
+    """전국 버스정류장 엑셀 -> EPSG:5179 GeoDataFrame (city 를 주면 도시명으로 필터, geo_cache 캐시 사용)"""
+    from geo_cache import load_bus_stops as load_cached_stops
+
+    stops = load_cached_stops(excel_path, columns=['도시명'])
+    if city is not None:
+        stops = stops[stops['도시명'] == city]
+    return stops
+
+
+def blind_spots_by_city(grid_paths, excel_path=BUS_EXCEL_PATH, radius=SERVICE_DIST):
+    """
+    도시별 인구 격자({도시명: shp 경로})마다 사각지대 격자를 구함
+
+    정류장은 도시 구분 없이 전국 좌표로 KD-tree 를 한 번만 만들어 공유하므로,
+    시 경계 바로 바깥(인접 도시) 정류장의 서비스권도 반영됩니다.
+    반환: (요약 DataFrame, {도시명: 사각지대 GeoDataFrame})
+    """
+    from geo_cache import load_grid
+
+    tree = cKDTree(points_xy(load_bus_stops(excel_path)))
+
+    results, summary = {}, []
+    for city, path in grid_paths.items():
+        grid = load_grid(path)
+        populated = grid[grid['val'] > 0]
+        covered = covered_mask(points_xy(populated), tree, radius)
+        shadow = populated[~covered].copy()
+        results[city] = shadow
+        summary.append({
+            "도시명": city,
+            "인구격자수": len(populated),
+            "사각지대격자수": len(shadow),
+            "사각지대인구": float(shadow['val'].sum()),
+            "사각지대인구비율": float(shadow['val'].sum() / max(populated['val'].sum(), 1)),
+        })
+        print(f" - {city}: 사각지대 격자 {len(shadow):,} / {len(populated):,}")
+    return pd.DataFrame(summary), results
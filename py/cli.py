@@ -0,0 +1,80 @@
+import argparse
+import importlib
+import os
+import sys
+
+# =========================================================
+# 분석 스크립트 통합 실행 진입점
+# =========================================================
+# 각 스크립트는 import 해도 아무 작업을 하지 않고 main() 만 제공하므로,
+# 여기서는 고른 명령의 모듈만 그때 import 합니다. (geopandas / folium / sklearn / xpress 는
+# 해당 명령을 실행할 때만 로드되어 `python cli.py --help` 는 표준 라이브러리만으로 바로 뜹니다)
+#
+#   python cli.py                  # 명령 목록
+#   python cli.py hubs             # elbow_map.main()
+#   python cli.py pipeline --dry-run
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+
+# 명령 -> (모듈, 함수, 설명)
+COMMANDS = {
+    "stops": ("final_stop_set", "main", "사각지대 분석 + 100명 이상 후보 정류장 선정"),
+    "heatmap": ("cheonan_heatmap", "main", "교통 사각지대 인구 히트맵"),
+    "siting": ("stop_siting", "main", "지역별 후보 정류장 일괄 선정"),
+    "elbow": ("elbow_hub", "main", "KMeans k 스윕 + 엘보우 그래프"),
+    "hubs": ("elbow_map", "main", "인구 가중 p-median 허브 선정 + 지도"),
+    "hub-sweep": ("hub_location", "main", "충전소 후보지 k 스윕 (median / coverage)"),
+    "passengers": ("create_passengers", "main", "피크타임 승객 데이터 생성"),
+    "demand": ("demand_generator", "main", "벤치마크용 합성 수요 세트"),
+    "fast-opt": ("fast_ver_opt", "main", "Xpress MIP 배차 (지도 + 엑셀)"),
+    "ideal-opt": ("ideal_ver_opt", "main", "Xpress 통합 모델 (SoC + 탑승 + 시간 + V2G)"),
+    "decompose": ("decompose_solve", "main", "허브별 분해 풀이"),
+    "heuristic": ("heuristic_dispatch", "main", "휴리스틱 배차"),
+    "realtime": ("realtime_dispatcher", "main", "실시간 배차 재생"),
+    "benchmark": ("benchmark_routing", "main", "배차 엔진 벤치마크"),
+    "v2g-day": ("e-drt_inicoi5", "main", "하루 SMP V2G 수익 (기존 계산)"),
+    "v2g": ("v2g_economics", "main", "다년 SMP V2G 수익 분석"),
+    "v2g-schedule": ("v2g_scheduler", "main", "시간별 충방전 LP 스케줄"),
+    "scenario": ("scenario_mc", "main", "몬테카를로 시나리오 분위수 표"),
+    "grid": ("gridstable", "main", "피크 쉐이빙 계통 기여도"),
+    "social": ("social", "main", "탄소 저감 / 사회적 가치 요약"),
+    "pipeline": ("pipeline", "main", "의존 그래프 파이프라인 실행 (인자 그대로 전달)"),
+    "import-time": ("benchmark_import", "main", "-X importtime 콜드 스타트 측정 (인자 그대로 전달)"),
+}
+PASS_ARGS = {"pipeline", "import-time"}   # 나머지 인자를 main(argv) 로 넘기는 명령
+
+
+def load_command(name):
+    """명령의 실행 함수 (모듈은 이때 처음 import)"""
+    module, func, _ = COMMANDS[name]
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    if module.isidentifier():
+        return getattr(importlib.import_module(module), func)
+    # 파일명에 '-' 가 있어 import 문으로 불러올 수 없는 스크립트
+    import runpy
+
+    return runpy.run_path(os.path.join(BASE_DIR, module + ".py"))[func]
+
+
+def main(argv=None):
+    width = max(len(n) for n in COMMANDS)
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="천안 e-DRT / V2G 분석 명령",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(f"  {n:<{width}}  {d}" for n, (_, _, d) in COMMANDS.items()))
+    parser.add_argument("command", nargs="?", choices=list(COMMANDS), metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="pipeline / import-time 명령에 넘길 인자")
+    opts = parser.parse_args(argv)
+
+    if opts.command is None:
+        parser.print_help()
+        return 0
+    if opts.args and opts.command not in PASS_ARGS:
+        parser.error(f"{opts.command} 명령은 추가 인자를 받지 않습니다: {opts.args}")
+    func = load_command(opts.command)
+    return func(opts.args) if opts.command in PASS_ARGS else func()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
 import os
-import requests
-import time
+
+from osrm_cache import get_default_cache
+from road_snap import snap_points
 
 # =========================================================
 # 1. 프로젝트 경로 자동 설정
@@ -22,21 +23,19 @@ output_file_path = os.path.join(DATA_DIR, "passenger_data.csv")
 # 2. 도로 스냅(Snap) 및 데이터 생성 로직
 # =========================================================
 def snap_to_road(lat, lon):
-    """OSRM API를 사용하여 무작위 좌표를 실제 도로 위로 보정"""
-    try:
-        url = f"http://router.project-osrm.org/nearest/v1/driving/{lon},{lat}"
-        r = requests.get(url, timeout=2)
-        if r.status_code == 200:
-            data = r.json()
-            if data['code'] == 'Ok':
-                snapped_lon, snapped_lat = data['waypoints'][0]['location']
-                return snapped_lat, snapped_lon
-    except:
-        pass
+    """OSRM API를 사용하여 무작위 좌표를 실제 도로 위로 보정 (디스크 캐시 공유)"""
+    snapped = get_default_cache().nearest(lat, lon)
+    if snapped is not None:
+        return snapped
     return lat, lon
 
 
-def generate_peak_passenger_data_v2(base_path, output_path, num_passengers=60):
+def generate_peak_passenger_data_v2(base_path, output_path, num_passengers=60, snap_mode="batch", road_path=None):
+    """
+    snap_mode : "sequential" -> 기존 방식 (한 명씩 OSRM 요청)
+                "batch"      -> OSRM 병렬 일괄 요청 (커넥션 풀 + 요청 수 제한)
+                "offline"    -> road_path 의 로컬 도로망으로 투영 (네트워크 불필요)
+    """
     try:
         if not os.path.exists(base_path):
             print(f"❌ 파일을 찾을 수 없습니다: {base_path}")
@@ -56,31 +55,36 @@ def generate_peak_passenger_data_v2(base_path, output_path, num_passengers=60):
         weights = [0.50, 0.30, 0.10, 0.07, 0.03]
 
         passengers = []
-        print(f"🚀 [Road Snapping] 실제 도로망 기반 수요 생성 시작 (총 {num_passengers}명)")
+        print(f"🚀 [Road Snapping] 실제 도로망 기반 수요 생성 시작 (총 {num_passengers}명, 모드: {snap_mode})")
 
         for i in range(num_passengers):
             request_time = np.random.choice(time_batches, p=weights)
 
-            # 1. 무작위 좌표 생성 후 2. 도로 위로 보정
+            # 1. 무작위 좌표 생성 (2. 도로 위 보정은 모드에 따라 즉시 또는 일괄 처리)
             raw_lat = np.random.uniform(lat_min, lat_max)
             raw_lon = np.random.uniform(lon_min, lon_max)
-            snapped_lat, snapped_lon = snap_to_road(raw_lat, raw_lon)
-
-            # API 과부하 방지용 미세 대기
-            time.sleep(0.05)
+            if snap_mode == "sequential":
+                # (API 과부하 방지용 요청 간격은 캐시 계층에서 네트워크 요청 시에만 적용)
+                raw_lat, raw_lon = snap_to_road(raw_lat, raw_lon)
 
             passengers.append({
                 'passenger_id': f'PASS_{i + 1:03d}',
                 'location_type': 2,
-                'lat': snapped_lat,
-                'lon': snapped_lon,
+                'lat': raw_lat,
+                'lon': raw_lon,
                 'dest_id': np.random.choice(stop_indices),
                 'request_time': request_time
             })
 
-            if (i + 1) % 10 == 0:
+            if snap_mode == "sequential" and (i + 1) % 10 == 0:
                 print(f"📦 [{i + 1}/{num_passengers}] 좌표 보정 완료...")
 
+        if snap_mode != "sequential":
+            snapped_lat, snapped_lon = snap_points([p['lat'] for p in passengers], [p['lon'] for p in passengers],
+                                                   mode=snap_mode, road_path=road_path)
+            for p, lat, lon in zip(passengers, snapped_lat, snapped_lon):
+                p['lat'], p['lon'] = float(lat), float(lon)
+
         df_passengers = pd.DataFrame(passengers)
         df_passengers = df_passengers.sort_values(by=['request_time', 'passenger_id']).reset_index(drop=True)
 
@@ -95,6 +99,11 @@ def generate_peak_passenger_data_v2(base_path, output_path, num_passengers=60):
         print(f"❌ 에러 발생: {e}")
 
 
-if __name__ == "__main__":
+def main():
+    """허브 / 정류장 파일로 피크타임 승객 데이터 생성"""
     # 공모전용 60명 피크타임 데이터 생성
-    generate_peak_passenger_data_v2(base_file_path, output_file_path, num_passengers=60)
\ No newline at end of file
+    generate_peak_passenger_data_v2(base_file_path, output_file_path, num_passengers=60)
+
+
+if __name__ == "__main__":
+    main()
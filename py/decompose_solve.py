@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import time
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from dist_matrix import LAT_TO_M, LON_TO_M
+
+# =========================================================
+# 1. 경로 자동 설정
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/ 폴더
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+
+
+# =========================================================
+# 2. 허브 클러스터 기준 승객 분할 (Cluster-first)
+# =========================================================
+# elbow_map.py 에서 KMeans 군집마다 가장 가까운 충전소를 허브로 매칭했으므로,
+# 승객은 가장 가까운 허브(= 그 허브의 군집)에 배정합니다.
+
+def assign_passengers_to_hubs(df_base, df_passengers):
+    """승객별 담당 허브의 df_base 인덱스 배열"""
+    hubs = df_base.index[df_base['location_type'] == 0].to_numpy()
+    d_lat = (df_passengers['lat'].values[:, None] - df_base.loc[hubs, 'lat'].values[None, :]) * LAT_TO_M
+    d_lon = (df_passengers['lon'].values[:, None] - df_base.loc[hubs, 'lon'].values[None, :]) * LON_TO_M
+    return hubs[np.argmin(d_lat ** 2 + d_lon ** 2, axis=1)]
+
+
+def allocate_vehicles(counts, num_vehicles):
+    """승객 수 비례로 차량 배분 (최대 잉여 방식, 승객이 있는 허브는 최소 1대)"""
+    counts = np.asarray(counts, dtype=np.float64)
+    share = counts / counts.sum() * num_vehicles
+    alloc = np.maximum(np.floor(share).astype(int), 1)
+    while alloc.sum() < num_vehicles:
+        alloc[np.argmax(share - alloc)] += 1
+    while alloc.sum() > num_vehicles and (alloc > 1).any():
+        cand = np.where(alloc > 1)[0]
+        alloc[cand[np.argmin((share - alloc)[cand])]] -= 1
+    return alloc
+
+
+# =========================================================
+# 3. 군집별 부분 문제 (Route-second, 워커 프로세스에서 실행)
+# =========================================================
+def _solve_subproblem(task):
+    """담당 승객만 남긴 축소 모델을 풀고 전역 노드 인덱스로 변환한 해를 반환"""
+    from fast_ver_opt import CheonanSmartCity_Master_Final
+    from route_extract import extract_routes
+
+    hub, df_base, df_psg, n_veh, maxtime, miprelstop, formulation = task
+    start = time.perf_counter()
+
+    # 차량 경로가 허브 -> ... -> 허브(다른 허브 포함) 형태이므로 허브/정류장은 모두 유지하고
+    # 승객만 군집별로 나눕니다. (dest_id 가 그대로 유효)
+    global_psg = df_psg.index.to_numpy()  # 전역 승객 순번
+    sub_psg = df_psg.reset_index(drop=True)
+
+    model = CheonanSmartCity_Master_Final(df_base, sub_psg, None, num_vehicles=n_veh, formulation=formulation)
+    model.build_model()
+    model.solve(maxtime=maxtime, miprelstop=miprelstop)
+
+    result = {"hub": hub, "routes": {}, "served": [], "objective": None,
+              "time": time.perf_counter() - start}
+    if model.prob.attributes.mipsols == 0:
+        return result
+
+    n_base = len(df_base)
+
+    def to_global(k):
+        return k if k < n_base else n_base + int(global_psg[k - n_base])
+
+    for route in extract_routes(model):
+        result["routes"][route.vehicle] = [(to_global(i), to_global(j)) for i, j in route.arcs]
+        result["served"] += [to_global(u) for u in route.passengers]
+    result["objective"] = model.prob.attributes.mipobjval
+    return result
+
+
+# =========================================================
+# 4. 분해 풀이 + 전역 모델 웜스타트
+# =========================================================
+def solve_decomposed(node_file, passenger_file, visual_dir, num_vehicles=12, workers=None,
+                     sub_maxtime=60, maxtime=120, miprelstop=0.15, compare=False, generate_results=True,
+                     formulation="bigm"):
+    """
+    1) 승객을 허브 군집별로 분할  2) 부분 문제를 병렬 프로세스로 풀이
+    3) 해를 합쳐 전역 모델의 MIP 시작해로 등록 후 전역 풀이
+    compare=True 이면 같은 조건의 단일(모놀리식) 풀이와 소요 시간을 비교합니다.
+    formulation 은 부분 / 전역 / 비교 모델 모두에 적용됩니다. (fast_ver_opt.FORMULATIONS)
+    """
+    from fast_ver_opt import CheonanSmartCity_Master_Final
+
+    print("--- [Decompose] 허브 군집 분해 풀이 시작 ---")
+    t0 = time.perf_counter()
+    df_base = pd.read_csv(node_file)
+    df_psg = pd.read_csv(passenger_file).reset_index(drop=True)
+
+    owner = assign_passengers_to_hubs(df_base, df_psg)
+    hubs, counts = np.unique(owner, return_counts=True)
+    alloc = allocate_vehicles(counts, num_vehicles)
+    tasks = [(int(h), df_base, df_psg[owner == h], int(nv), sub_maxtime, miprelstop, formulation)
+             for h, nv in zip(hubs, alloc)]
+    for h, c, nv in zip(hubs, counts, alloc):
+        print(f" - 허브 {h}: 승객 {c}명, 차량 {nv}대")
+
+    with ProcessPoolExecutor(max_workers=workers or len(tasks)) as pool:
+        results = list(pool.map(_solve_subproblem, tasks))
+    t_sub = time.perf_counter() - t0
+
+    # 부분 해 병합 (차량 번호는 허브 순서대로 이어 붙임)
+    routes, served, offset = {}, [], 0
+    for res, nv in zip(results, alloc):
+        for v_local, arcs in res["routes"].items():
+            routes[offset + v_local] = arcs
+        served += res["served"]
+        offset += int(nv)
+    print(f" - 부분 문제 풀이 완료: {t_sub:.1f}초, 탑승 승객 {len(served)}명")
+
+    model = CheonanSmartCity_Master_Final(df_base, df_psg, visual_dir, num_vehicles=num_vehicles,
+                                          formulation=formulation)
+    model.build_model()
+    model.add_mip_start(routes, served)
+    if generate_results:
+        model.solve_and_generate_results(maxtime=maxtime, miprelstop=miprelstop)
+    else:
+        model.solve(maxtime=maxtime, miprelstop=miprelstop)
+    t_decomp = time.perf_counter() - t0
+
+    summary = {
+        "decomposed_time": t_decomp,
+        "subproblem_time": t_sub,
+        "decomposed_objective": model.prob.attributes.mipobjval,
+        "warm_start_served": len(served),
+    }
+
+    if compare:
+        t1 = time.perf_counter()
+        mono = CheonanSmartCity_Master_Final(df_base, df_psg, visual_dir, num_vehicles=num_vehicles,
+                                             formulation=formulation)
+        mono.build_model()
+        mono.solve(maxtime=maxtime, miprelstop=miprelstop)
+        summary["monolithic_time"] = time.perf_counter() - t1
+        summary["monolithic_objective"] = mono.prob.attributes.mipobjval
+        gain = summary["monolithic_time"] - t_decomp
+        print(f"--- [Decompose] 단일 풀이 {summary['monolithic_time']:.1f}초 vs 분해 풀이 {t_decomp:.1f}초 "
+              f"(절감 {gain:.1f}초) ---")
+        print(f" - 목적함수: 단일 {summary['monolithic_objective']:,.0f} / 분해 {summary['decomposed_objective']:,.0f}")
+
+    return summary
+
+
+def main():
+    """허브별 분해 풀이 (전체 MIP 와 비교)"""
+    hub_file = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
+    psg_file = os.path.join(DATA_DIR, "passenger_data.csv")
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+
+    solve_decomposed(hub_file, psg_file, VISUAL_DIR, compare=True)
+
+
+if __name__ == "__main__":
+    main()
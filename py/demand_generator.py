@@ -0,0 +1,188 @@
+import pandas as pd
+import numpy as np
+import os
+
+from dist_matrix import LAT_TO_M, LON_TO_M  # 위경도 -> 미터 근사 계수 (최적화 모델과 공용)
+
+# =========================================================
+# 1. 프로젝트 경로 자동 설정
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")  # data/
+SYNTH_DIR = os.path.join(DATA_DIR, "synthetic")  # 벤치마크용 대량 수요
+
+base_file_path = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
+
+GRID_SHP_PATH = os.path.join(
+    DATA_DIR,
+    "grid_data",
+    "(B100)국토통계_인구정보-총 인구 수(전체)-(격자) 100M_충청남도 천안시_202410",
+    "nlsp_021001001.shp"
+)
+
+# 피크 타임 가중치 (create_passengers.py 와 동일)
+TIME_BATCHES = np.array([0, 30, 60, 90, 120])
+TIME_WEIGHTS = np.array([0.50, 0.30, 0.10, 0.07, 0.03])
+
+CELL_SIZE = 100        # 격자 한 변 (m)
+
+OUTPUT_COLUMNS = ['passenger_id', 'location_type', 'lat', 'lon', 'dest_id', 'request_time', 'day', 'scenario']
+
+# 기본 벤치마크 시나리오 (수요 배율 + 시간대 가중치)
+DEFAULT_SCENARIOS = [
+    {"name": "peak", "scale": 1.0, "time_weights": TIME_WEIGHTS},
+    {"name": "flat", "scale": 1.0, "time_weights": np.full(len(TIME_BATCHES), 1 / len(TIME_BATCHES))},
+]
+
+
+# =========================================================
+# 2. 인구 격자 로드 (출발지 가중치)
+# =========================================================
+def load_population_grid(grid_path=GRID_SHP_PATH):
+    """100m 인구 격자 -> (위도, 경도, 인구) 배열 (인구 0 격자 제외)"""
+    from geo_cache import load_grid
+
+    grid = load_grid(grid_path)
+    grid = grid[grid['val'] > 0]
+    centroids = grid.geometry.centroid.to_crs(epsg=4326)
+    return {
+        'lat': centroids.y.to_numpy(dtype=np.float64),
+        'lon': centroids.x.to_numpy(dtype=np.float64),
+        'weight': grid['val'].to_numpy(dtype=np.float64),
+    }
+
+
+# =========================================================
+# 3. 벡터화 샘플링
+# =========================================================
+def sample_passengers(rng, request_times, grid, stop_indices, start_id=1, id_width=3):
+    """
+    정렬된 request_times 길이만큼 승객을 한 번에 샘플링
+
+    출발지는 인구 비례로 격자를 뽑고, 격자 안에서 균등하게 흩뿌립니다.
+    """
+    n = len(request_times)
+    p = grid['weight'] / grid['weight'].sum()
+    cells = rng.choice(len(p), size=n, p=p)
+    jitter = rng.uniform(-CELL_SIZE / 2, CELL_SIZE / 2, size=(n, 2))
+
+    ids = np.arange(start_id, start_id + n)
+    return pd.DataFrame({
+        'passenger_id': [f'PASS_{i:0{id_width}d}' for i in ids],
+        'location_type': np.full(n, 2, dtype=np.int8),
+        'lat': grid['lat'][cells] + jitter[:, 0] / LAT_TO_M,
+        'lon': grid['lon'][cells] + jitter[:, 1] / LON_TO_M,
+        'dest_id': rng.choice(np.asarray(stop_indices), size=n),
+        'request_time': request_times,
+    })
+
+
+def sample_request_times(rng, n, time_weights=TIME_WEIGHTS):
+    """배치별 인원을 다항분포로 한 번에 뽑아 정렬된 요청 시각 배열 생성"""
+    w = np.asarray(time_weights, dtype=np.float64)
+    counts = rng.multinomial(n, w / w.sum())
+    return np.repeat(TIME_BATCHES, counts)
+
+
+def generate_passengers(num_passengers, seed=42, base_path=base_file_path, grid=None):
+    """단일 수요 세트를 DataFrame 으로 생성 (passenger_data.csv 와 같은 컬럼)"""
+    df_base = pd.read_csv(base_path)
+    df_base.columns = df_base.columns.str.strip()
+    stop_indices = df_base[df_base['location_type'] == 1].index.to_numpy()
+    grid = grid if grid is not None else load_population_grid()
+
+    rng = np.random.default_rng(seed)
+    times = sample_request_times(rng, num_passengers)
+    width = max(3, len(str(num_passengers)))
+    return sample_passengers(rng, times, grid, stop_indices, id_width=width)
+
+
+# =========================================================
+# 4. 대량 / 다일자 / 다시나리오 스트리밍 저장
+# =========================================================
+class _ChunkWriter:
+    """CSV 또는 Parquet 으로 청크 단위 이어쓰기"""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_parquet = path.endswith(".parquet")
+        self._writer = None
+        self._wrote_header = False
+
+    def write(self, df):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self._wrote_header else 'w', header=not self._wrote_header,
+                      index=False, encoding='utf-8-sig' if not self._wrote_header else 'utf-8')
+            self._wrote_header = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def write_synthetic_demand(output_path, num_passengers, days=1, scenarios=None, seed=42,
+                           chunk_size=50000, base_path=base_file_path, grid=None, road_path=None):
+    """
+    num_passengers 명 × days 일 × 시나리오 수만큼 수요를 청크 단위로 생성해 저장
+
+    - 시나리오/일자마다 독립된 난수열(SeedSequence [seed, 시나리오, 일자])을 사용해 재현 가능
+    - road_path 를 주면 로컬 도로망으로 오프라인 스냅 (road_snap.OfflineRoadSnapper)
+    """
+    scenarios = scenarios if scenarios is not None else DEFAULT_SCENARIOS[:1]
+    df_base = pd.read_csv(base_path)
+    df_base.columns = df_base.columns.str.strip()
+    stop_indices = df_base[df_base['location_type'] == 1].index.to_numpy()
+    grid = grid if grid is not None else load_population_grid()
+
+    snapper = None
+    if road_path is not None:
+        from road_snap import OfflineRoadSnapper
+        snapper = OfflineRoadSnapper(road_path)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    writer = _ChunkWriter(output_path)
+    total = 0
+    try:
+        for s_idx, scenario in enumerate(scenarios):
+            n_day = int(round(num_passengers * scenario.get("scale", 1.0)))
+            width = max(3, len(str(n_day)))
+            for day in range(days):
+                rng = np.random.default_rng([seed, s_idx, day])
+                times = sample_request_times(rng, n_day, scenario.get("time_weights", TIME_WEIGHTS))
+                for start in range(0, n_day, chunk_size):
+                    chunk = sample_passengers(rng, times[start:start + chunk_size], grid, stop_indices,
+                                              start_id=start + 1, id_width=width)
+                    if snapper is not None:
+                        chunk['lat'], chunk['lon'] = snapper.snap(chunk['lat'].values, chunk['lon'].values)
+                    chunk['day'] = day
+                    chunk['scenario'] = scenario["name"]
+                    writer.write(chunk[OUTPUT_COLUMNS])
+                    total += len(chunk)
+                print(f"📦 [{scenario['name']}] {day + 1}/{days}일차 {n_day:,}명 생성 완료")
+    finally:
+        writer.close()
+
+    print(f"✅ [완료] 총 {total:,}건 저장: {output_path}")
+    return total
+
+
+def main():
+    """벤치마크용 합성 수요 세트 (1천 ~ 10만 건) 저장"""
+    # 최적화 모델 벤치마크용 1천 ~ 10만 건 수요 세트
+    population = load_population_grid()
+    for size in [1000, 10000, 100000]:
+        write_synthetic_demand(os.path.join(SYNTH_DIR, f"passenger_data_{size}.csv"), size,
+                               scenarios=DEFAULT_SCENARIOS, grid=population)
+
+
+if __name__ == "__main__":
+    main()
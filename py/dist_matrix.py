@@ -0,0 +1,141 @@
+import numpy as np
+
+# =========================================================
+# 거리 행렬 공통 엔진 (fast_ver_opt / ideal_ver_opt 공용)
+# =========================================================
+# 기존 최적화 모델은 N×N 이중 for 문으로 거리 행렬을 채웠습니다.
+# 여기서는 NumPy 브로드캐스팅으로 한 번에 계산하고, float32 로 저장합니다.
+
+# 위경도 -> 미터 변환 근사 계수 (천안 위도 기준, 기존 모델과 동일)
+LAT_TO_M = 111000
+LON_TO_M = 88800
+
+EARTH_RADIUS_M = 6371008.8
+
+# 전체 행렬을 만들 때 한 번에 처리할 행 수 (임시 메모리 상한)
+BLOCK_ROWS = 2048
+
+
+def project_flat(lat, lon):
+    """위경도를 기존 111000/88800 근사로 평면 좌표(m)로 변환 (x=경도 방향, y=위도 방향)"""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    return np.column_stack([lon * LON_TO_M, lat * LAT_TO_M])
+
+
+def _unit_sphere(lat, lon):
+    """위경도를 단위 구면 위의 3차원 좌표로 변환 (하버사인 kNN 탐색용)"""
+    la = np.radians(np.asarray(lat, dtype=np.float64))
+    lo = np.radians(np.asarray(lon, dtype=np.float64))
+    return np.column_stack([np.cos(la) * np.cos(lo), np.cos(la) * np.sin(lo), np.sin(la)])
+
+
+def _pair_block(lat_a, lon_a, lat_b, lon_b, method):
+    """a 점들 × b 점들 거리 블록 계산 (float64)"""
+    if method == "flat":
+        d_lat = (lat_a[:, None] - lat_b[None, :]) * LAT_TO_M
+        d_lon = (lon_a[:, None] - lon_b[None, :]) * LON_TO_M
+        return np.sqrt(d_lat ** 2 + d_lon ** 2)
+    if method == "haversine":
+        la_a, lo_a = np.radians(lat_a), np.radians(lon_a)
+        la_b, lo_b = np.radians(lat_b), np.radians(lon_b)
+        d_la = la_a[:, None] - la_b[None, :]
+        d_lo = lo_a[:, None] - lo_b[None, :]
+        a = np.sin(d_la / 2) ** 2 + np.cos(la_a[:, None]) * np.cos(la_b[None, :]) * np.sin(d_lo / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    raise ValueError(f"지원하지 않는 거리 계산 방식입니다: {method}")
+
+
+def _block(lat, lon, rows, method):
+    """rows 행 전체에 대한 거리 블록 계산 (float64)"""
+    return _pair_block(lat[rows], lon[rows], lat, lon, method)
+
+
+def _chord_to_meter(chord):
+    """단위 구면 현(chord) 길이를 대권 거리(m)로 변환"""
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+
+
+def build_dist_matrix(lat, lon, method="flat", form="full", k=None, dtype=np.float32):
+    """
+    노드 간 거리 행렬(m) 생성
+
+    method : "flat"(기존 111000/88800 근사) 또는 "haversine"(대권 거리)
+    form   : "full"  -> (N, N) 행렬
+             "upper" -> 상삼각 압축 벡터 (길이 N(N-1)/2, scipy pdist 순서)
+             "knn"   -> 각 행마다 가까운 k 개만 남긴 scipy.sparse CSR 행렬
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    n = len(lat)
+
+    if form == "full":
+        mat = np.empty((n, n), dtype=dtype)
+        for start in range(0, n, BLOCK_ROWS):
+            rows = np.arange(start, min(start + BLOCK_ROWS, n))
+            mat[rows] = _block(lat, lon, rows, method)
+        np.fill_diagonal(mat, 0)
+        return mat
+
+    if form == "upper":
+        out = np.empty(n * (n - 1) // 2, dtype=dtype)
+        pos = 0
+        for i in range(n - 1):
+            # 한 행씩 (i, i+1..N-1) 구간만 계산하므로 N×N 임시 행렬이 생기지 않습니다.
+            row = _block(lat, lon, np.array([i]), method)[0, i + 1:]
+            out[pos:pos + len(row)] = row
+            pos += len(row)
+        return out
+
+    if form == "knn":
+        from scipy.sparse import csr_matrix
+        from scipy.spatial import cKDTree
+
+        if k is None:
+            raise ValueError("form='knn' 에는 k 값이 필요합니다.")
+        k = min(int(k), n - 1)
+        if k <= 0:
+            return csr_matrix((n, n), dtype=dtype)
+
+        if method == "flat":
+            pts = project_flat(lat, lon)
+        elif method == "haversine":
+            # 단위 구면의 현 길이는 대권 거리와 단조 관계이므로 kNN 순서가 보존됩니다.
+            pts = _unit_sphere(lat, lon)
+        else:
+            raise ValueError(f"지원하지 않는 거리 계산 방식입니다: {method}")
+
+        # 자기 자신이 첫 번째 이웃으로 잡히므로 k+1 개를 조회한 뒤 제외합니다.
+        d, idx = cKDTree(pts).query(pts, k=k + 1)
+        self_mask = idx != np.arange(n)[:, None]
+        # 중복 좌표로 자기 자신이 빠지지 않은 행은 마지막 이웃을 버립니다.
+        self_mask[self_mask.all(axis=1), -1] = False
+        d = d[self_mask].reshape(n, k)
+        idx = idx[self_mask].reshape(n, k)
+        if method == "haversine":
+            d = _chord_to_meter(d)
+
+        indptr = np.arange(0, n * k + 1, k)
+        return csr_matrix((d.ravel().astype(dtype), idx.ravel(), indptr), shape=(n, n))
+
+    raise ValueError(f"지원하지 않는 출력 형식입니다: {form}")
+
+
+def build_cross_matrix(lat_a, lon_a, lat_b, lon_b, method="flat", dtype=np.float32):
+    """두 점 집합 사이 거리 행렬(m), (len(a), len(b)) 형태 (예: 정류장 × 허브 후보지)"""
+    lat_a = np.asarray(lat_a, dtype=np.float64)
+    lon_a = np.asarray(lon_a, dtype=np.float64)
+    lat_b = np.asarray(lat_b, dtype=np.float64)
+    lon_b = np.asarray(lon_b, dtype=np.float64)
+    mat = np.empty((len(lat_a), len(lat_b)), dtype=dtype)
+    for start in range(0, len(lat_a), BLOCK_ROWS):
+        rows = slice(start, start + BLOCK_ROWS)
+        mat[rows] = _pair_block(lat_a[rows], lon_a[rows], lat_b, lon_b, method)
+    return mat
+
+
+def upper_index(i, j, n):
+    """상삼각 압축 벡터에서 (i, j) 쌍의 위치 (i != j)"""
+    if i > j:
+        i, j = j, i
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
@@ -1,9 +1,8 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))   # py/
 PROJECT_ROOT = os.path.dirname(BASE_DIR)                # 프로젝트 루트
@@ -11,49 +10,196 @@ PROJECT_ROOT = os.path.dirname(BASE_DIR)                # 프로젝트 루트
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 VIS_DIR = os.path.join(PROJECT_ROOT, "visualization")
 
-os.makedirs(VIS_DIR, exist_ok=True)
+# =========================================================
+# KMeans k 스윕 + 무릎점(Kneedle) 자동 선택
+# =========================================================
+# k 마다 KMeans(n_init) 를 스레드 풀로 동시에 돌리고(같은 좌표 배열을 복사 없이 공유),
+# 이전 k 의 중심점 + 가장 먼 점 1개로 시작하는 warm start 해와 비교해 더 좋은 쪽을 씁니다.
+# 점이 많으면(MINIBATCH_MIN 이상) MiniBatchKMeans 로 바꾸고, 실루엣은 표본으로만 계산합니다.
 
-# ---------------------------------------------------------
-# 1. 데이터 불러오기 (인코딩 수정)
-# ---------------------------------------------------------
+K_RANGE = range(1, 11)
+MINIBATCH_MIN = 20000      # 이 점 수 이상이면 MiniBatchKMeans 사용
+BATCH_SIZE = 4096
+SILHOUETTE_SAMPLE = 5000   # 실루엣 계산 표본 수
 
-file_path = os.path.join(DATA_DIR, "cheonan_all_stops_over_100.csv")
 
+def load_stops(file_path=os.path.join(DATA_DIR, "cheonan_all_stops_over_100.csv")):
+    """후보 정류장 CSV (utf-8-sig 실패 시 cp949, 컬럼명 공백 제거)"""
+    try:
+        df_stops = pd.read_csv(file_path, encoding='utf-8-sig')
+    except UnicodeDecodeError:
+        df_stops = pd.read_csv(file_path, encoding='cp949')
+    df_stops.columns = df_stops.columns.str.strip()
+    return df_stops
 
-try:
-    df_stops = pd.read_csv(file_path, encoding='utf-8-sig')
-except:
-    # 만약 위 방법도 안 되면 'cp949'로 시도
-    df_stops = pd.read_csv(file_path, encoding='cp949')
 
-# 컬럼명에 혹시 모를 공백 제거 (안전장치)
-df_stops.columns = df_stops.columns.str.strip()
+def _model(k, init, n_init, minibatch, random_state):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
 
-print("데이터 로드 완료. 행 개수:", len(df_stops))
-print("컬럼 목록:", df_stops.columns.tolist()) # 컬럼명이 정상인지 확인
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=k, init=init, n_init=n_init, batch_size=BATCH_SIZE,
+                               random_state=random_state)
+    return KMeans(n_clusters=k, init=init, n_init=n_init, random_state=random_state)
 
-# 학습에 사용할 좌표 데이터 (이제 정상적으로 lat을 찾을 수 있습니다)
-X = df_stops[['lat', 'lon']]
 
-# ---------------------------------------------------------
-# 2. 엘보우 기법 (Elbow Method) - 최적의 k 찾기
-# ---------------------------------------------------------
-inertias = []
-# 데이터가 18개뿐이므로 클러스터 개수는 최대 10개까지만 테스트
-K_range = range(1, 11)
+def _fit(X, k, init, n_init, minibatch, random_state, sample_weight):
+    start = time.perf_counter()
+    model = _model(k, init, n_init, minibatch, random_state).fit(X, sample_weight=sample_weight)
+    return model, time.perf_counter() - start
 
-for k in K_range:
-    kmeans_test = KMeans(n_clusters=k, random_state=42, n_init=10)
-    kmeans_test.fit(X)
-    inertias.append(kmeans_test.inertia_)
 
-# 엘보우 그래프 시각화
-plt.figure(figsize=(10, 5))
-plt.plot(K_range, inertias, 'bx-')
-plt.xlabel('Number of Clusters (k)')
-plt.ylabel('Inertia (SSE)')
-plt.title('The Elbow Method using Inertia')
-plt.grid(True)
-output_path = os.path.join(VIS_DIR, "elbow_kmeans.png")
-plt.savefig(output_path, dpi=200, bbox_inches="tight")
-plt.show()
\ No newline at end of file
+def _inertia(X, model, sample_weight):
+    """MiniBatchKMeans 의 inertia_ 는 마지막 배치 기준이므로 전체 점으로 다시 계산"""
+    d2 = model.transform(X).min(axis=1) ** 2
+    return float(d2 @ sample_weight) if sample_weight is not None else float(d2.sum())
+
+
+def _grow(X, centers, sample_weight):
+    """warm start 초기값: 이전 중심점 + 가장 먼(가중 제곱거리 최대) 점"""
+    d2 = ((X[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    if sample_weight is not None:
+        d2 = d2 * sample_weight
+    return np.vstack([centers, X[np.argmax(d2)]])
+
+
+# =========================================================
+# 무릎점 (Kneedle, Satopaa et al. 2011)
+# =========================================================
+def knee_point(x, y, sensitivity=1.0):
+    """
+    볼록·감소 곡선(inertia)의 무릎 x 값 (없으면 None)
+
+    x, y 를 [0, 1] 로 정규화한 뒤 차이 곡선 (1 - x) - y 의 국소 최댓값마다
+    임계값(최댓값 - sensitivity · 평균 x 간격)을 두고, 다음 국소 최댓값 전에 차이가
+    임계값 아래로 떨어지면 그 최댓값을 무릎으로 봅니다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) < 3 or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return None
+    xn = (x - x.min()) / np.ptp(x)
+    yn = (y - y.min()) / np.ptp(y)
+    diff = (1 - xn) - yn
+
+    is_max = np.r_[False, (diff[1:-1] >= diff[:-2]) & (diff[1:-1] >= diff[2:]), False]
+    step = np.diff(xn).mean()
+    threshold, candidate = None, None
+    for j in range(len(x)):
+        if is_max[j]:
+            threshold, candidate = diff[j] - sensitivity * step, j
+        elif threshold is not None and diff[j] < threshold:
+            return x[candidate].item()
+    return None
+
+
+# =========================================================
+# k 스윕
+# =========================================================
+def sweep_k(X, k_values=K_RANGE, sample_weight=None, n_init=10, minibatch=None, workers=None,
+            warm_start=True, silhouette_sample=SILHOUETTE_SAMPLE, random_state=42):
+    """
+    k 별 inertia / 실루엣(표본) / 소요 시간 DataFrame
+
+    - k 마다의 KMeans(n_init) 는 스레드 풀로 병렬 실행 (각 적합은 BLAS/OpenMP 스레드 1개로 제한)
+    - warm_start=True 이면 이전 k 해의 중심점 + 가장 먼 점으로 시작한 해와 비교해 inertia 가 낮은 쪽 사용
+    - minibatch=None 이면 점 수가 MINIBATCH_MIN 이상일 때 MiniBatchKMeans 사용
+    """
+    from sklearn.metrics import silhouette_score
+    from threadpoolctl import threadpool_limits
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    w = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    n = len(X)
+    ks = [k for k in sorted(set(int(k) for k in k_values)) if 1 <= k <= n]
+    if minibatch is None:
+        minibatch = n >= MINIBATCH_MIN
+    if minibatch:
+        n_init = min(n_init, 3)
+
+    # 1) k 별 독립 적합 (k-means++ n_init 회) 병렬
+    with threadpool_limits(limits=1), ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        fits = dict(zip(ks, pool.map(
+            lambda k: _fit(X, k, "k-means++", n_init, minibatch, random_state + k, w), ks)))
+
+    # 2) warm start: 이전 k 해에서 중심점 1개 추가
+    rows, prev = [], None
+    for k in ks:
+        model, elapsed = fits[k]
+        inertia = _inertia(X, model, w)
+        source = "k-means++"
+        if warm_start and prev is not None and prev.cluster_centers_.shape[0] == k - 1:
+            warm, t = _fit(X, k, _grow(X, prev.cluster_centers_, w), 1, minibatch, random_state + k, w)
+            warm_inertia = _inertia(X, warm, w)
+            elapsed += t
+            if warm_inertia < inertia:
+                model, inertia, source = warm, warm_inertia, "warm"
+        prev = model
+
+        labels = model.predict(X)
+        silhouette = np.nan
+        if 2 <= len(np.unique(labels)) < n:
+            silhouette = float(silhouette_score(X, labels, sample_size=min(silhouette_sample, n),
+                                                random_state=random_state))
+        rows.append({"k": k, "inertia": inertia, "silhouette": silhouette, "init": source, "elapsed": elapsed})
+
+    return pd.DataFrame(rows)
+
+
+def choose_k(X, k_values=K_RANGE, sweep=None, **kwargs):
+    """
+    inertia 곡선의 무릎점 k (무릎이 없으면 실루엣 최대 k, 그것도 없으면 가장 작은 k)
+
+    sweep 에 sweep_k 결과를 주면 다시 적합하지 않습니다.
+    """
+    if sweep is None:
+        sweep = sweep_k(X, k_values, **kwargs)
+    knee = knee_point(sweep['k'], sweep['inertia'])
+    if knee is not None:
+        return int(knee)
+    if sweep['silhouette'].notna().any():
+        return int(sweep.loc[sweep['silhouette'].idxmax(), 'k'])
+    return int(sweep['k'].min())
+
+
+def main(show=False):
+    """정류장 k 스윕 + 엘보우 그래프 저장 (show=True 일 때만 창 표시)"""
+    import matplotlib.pyplot as plt
+
+    os.makedirs(VIS_DIR, exist_ok=True)
+
+    # ---------------------------------------------------------
+    # 1. 데이터 불러오기
+    # ---------------------------------------------------------
+    df_stops = load_stops()
+    print("데이터 로드 완료. 행 개수:", len(df_stops))
+    print("컬럼 목록:", df_stops.columns.tolist())
+
+    X = df_stops[['lat', 'lon']].to_numpy()
+
+    # ---------------------------------------------------------
+    # 2. 엘보우 기법 (Elbow Method) - 최적의 k 찾기
+    # ---------------------------------------------------------
+    # 데이터가 18개뿐이므로 클러스터 개수는 최대 10개까지만 테스트
+    result = sweep_k(X, K_RANGE)
+    best_k = choose_k(X, sweep=result)
+    print(result.to_string(index=False))
+    print(f"✅ 무릎점 k = {best_k}")
+
+    # 엘보우 그래프 시각화
+    plt.figure(figsize=(10, 5))
+    plt.plot(result['k'], result['inertia'], 'bx-')
+    plt.axvline(best_k, color='r', linestyle='--', label=f'knee k={best_k}')
+    plt.xlabel('Number of Clusters (k)')
+    plt.ylabel('Inertia (SSE)')
+    plt.title('The Elbow Method using Inertia')
+    plt.legend()
+    plt.grid(True)
+    output_path = os.path.join(VIS_DIR, "elbow_kmeans.png")
+    plt.savefig(output_path, dpi=200, bbox_inches="tight")
+    if show:
+        plt.show()
+    plt.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
-import xpress as xp
 import numpy as np
 import pandas as pd
-import folium
-import requests
-import polyline
 import time
 import os
-from datetime import datetime
+from dist_matrix import build_dist_matrix
+from arc_builder import build_node_arcs
+from node_store import NodeStore
+from osrm_cache import get_default_cache
+from route_extract import extract_routes, passenger_logs, routes_to_frame, _column_index
+from map_render import point_layer, line_layer
+from subtour_cuts import SubtourSeparator
 
 # =========================================================
 # 1. 경로 자동 설정 (os 모듈 활용)
@@ -18,129 +20,306 @@ PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트 (e_vrt_v2g_proje
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")  # data/ 폴더
 VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")  # visualization/ 폴더
 
-# 저장용 폴더가 없으면 자동 생성
-os.makedirs(VISUAL_DIR, exist_ok=True)
+# 모델 상수 (분 / m 단위)
+TRAVEL_SPEED = 500    # 차량 주행 속도 (m/분)
+PICKUP_WINDOW = 60    # 요청 후 탑승까지 허용 시간 (분)
+ALT_SPEED = 250       # 대안 수단(버스/도보) 속도 (m/분)
+ALT_EXTRA = 10        # 대안 수단 대기 / 환승 시간 (분)
 
-# Xpress 초기화
-try:
-    xp.init('c:/xpressmp/bin/xpauth.xpr')
-except:
-    pass
+# 정식화 방식
+#   bigm  : 기존 모델 (모든 아크 × 차량에 M=5000 시간 전파식, 탑승 시간창도 Big-M)
+#   tight : 노드 시간창을 변수 범위로, 아크별 M 축소 / 시간상 불가능한 아크 제거,
+#           차량 대칭 제거, 부분 순회 절단은 노드 콜백으로 지연 추가 (subtour_cuts)
+FORMULATIONS = ("bigm", "tight")
+
+
+_XP = None
+
+
+def _xpress():
+    """xpress 는 모델을 만들 때 처음 import + 라이선스 초기화 (모듈 import 는 가볍게)"""
+    global _XP
+    if _XP is None:
+        import xpress as xp
+        try:
+            xp.init('c:/xpressmp/bin/xpauth.xpr')
+        except:
+            pass
+        _XP = xp
+    return _XP
 
 
 class CheonanSmartCity_Master_Final:
-    def __init__(self, node_file, passenger_file, visual_dir):
+    def __init__(self, node_file, passenger_file, visual_dir, num_vehicles=12, formulation="bigm"):
         print("--- [System] 마스터 통합 모델 가동 (Smart Choice 적용 버전) ---")
+        if formulation not in FORMULATIONS:
+            raise ValueError(f"formulation 은 {FORMULATIONS} 중 하나여야 합니다: {formulation}")
         self.visual_dir = visual_dir
+        self.formulation = formulation
 
-        # 데이터 로드
-        self.df_base = pd.read_csv(node_file)
-        self.df_passengers = pd.read_csv(passenger_file)
-        self.df = pd.concat([self.df_base, self.df_passengers], ignore_index=True)
+        # 데이터 로드 (파일 경로 또는 이미 읽어 둔 DataFrame) -> 노드 배열 저장소
+        self.nodes = NodeStore.from_frames(node_file, passenger_file)
 
-        self.N = len(self.df)
-        self.hubs = self.df[self.df['location_type'] == 0].index.tolist()
-        self.stops = self.df[self.df['location_type'] == 1].index.tolist()
-        self.users = self.df[self.df['location_type'] == 2].index.tolist()
-        self.user_dest = {u: int(self.df.at[u, 'dest_id']) for u in self.users}
+        self.N = len(self.nodes)
+        # xpress 변수 인덱스용 리스트 (멤버십 검사는 self.nodes.is_hub / hub_set 사용)
+        self.hubs = self.nodes.hubs.tolist()
+        self.stops = self.nodes.stops.tolist()
+        self.users = self.nodes.users.tolist()
+        self.user_dest = self.nodes.user_dest
 
         self.dist = self._build_dist_matrix()
         self.MAX_DIST = 6000
         self.arcs = self._build_valid_arcs()
 
-        self.V = 12
+        self.V = num_vehicles
         self.M = 5000  # Big-M
-        self.prob = xp.problem("Cheonan_Master_Final")
+        self.prob = _xpress().problem("Cheonan_Master_Final")
 
     def _build_dist_matrix(self):
-        mat = np.zeros((self.N, self.N))
-        coords = self.df[['lat', 'lon']].values
-        for i in range(self.N):
-            for j in range(self.N):
-                if i != j:
-                    # 위경도 -> 미터 변환 근사치
-                    mat[i, j] = np.sqrt(
-                        ((coords[i][0] - coords[j][0]) * 111000) ** 2 + ((coords[i][1] - coords[j][1]) * 88800) ** 2)
-        return mat
+        # 위경도 -> 미터 변환 근사치 (공용 거리 엔진, 벡터화 + float32)
+        return build_dist_matrix(self.nodes.lat, self.nodes.lon, method="flat")
 
     def _build_valid_arcs(self):
-        valid = set()
-        for i in range(self.N):
-            for j in range(self.N):
-                if i == j: continue
-                if i in self.hubs or j in self.hubs or self.dist[i, j] <= self.MAX_DIST:
-                    valid.add((i, j))
-        for u, d in self.user_dest.items():
-            valid.add((u, d))
-        return list(valid)
+        # KD-tree 반경 탐색 + 허브/승객 목적지 강제 아크 (아크 밀도 출력)
+        return build_node_arcs(self.nodes, self.MAX_DIST)
+
+    def _build_arc_index(self):
+        # 노드별 진입/진출 아크 인덱스 (제약식마다 아크 목록을 다시 훑지 않도록 미리 구축)
+        self.arc_src = np.array([i for (i, j) in self.arcs], dtype=np.int64)
+        self.arc_dst = np.array([j for (i, j) in self.arcs], dtype=np.int64)
+        self.in_arcs = [[] for _ in range(self.N)]
+        self.out_arcs = [[] for _ in range(self.N)]
+        for a, (i, j) in enumerate(self.arcs):
+            self.out_arcs[i].append(a)
+            self.in_arcs[j].append(a)
+        is_hub = self.nodes.is_hub
+        self.hub_out_arcs = np.flatnonzero(is_hub[self.arc_src])
+        self.hub_in_arcs = np.flatnonzero(is_hub[self.arc_dst])
 
     def build_model(self):
+        xp = _xpress()
         print("--- [Logic] 수리적 모델 구축 (AI Smart Choice 모드) ---")
+        build_start = time.perf_counter()
         p = self.prob
+        self._build_arc_index()
+        A, V = len(self.arcs), self.V
+        arc_dist = self.dist[self.arc_src, self.arc_dst].astype(np.float64)
 
-        # 변수 정의
-        self.x = {(i, j, v): p.addVariable(vartype=xp.binary, name=f"x_{i}_{j}_{v}") for (i, j) in self.arcs for v in
-                  range(self.V)}
-        self.z = {u: p.addVariable(vartype=xp.binary, name=f"z_{u}") for u in self.users}
-        self.t = {(i, v): p.addVariable(lb=0, ub=self.M) for i in range(self.N) for v in range(self.V)}
-        self.dis = {(h, v): p.addVariable(lb=0, ub=20.0) for h in self.hubs for v in range(self.V)}
+        # 변수 정의 (배열 API 로 일괄 생성, x[a, v] 는 a 번째 아크를 v 차량이 운행)
+        self.X = p.addVariables(A, V, vartype=xp.binary, name="x")
+        self.x = {(i, j, v): self.X[a, v] for a, (i, j) in enumerate(self.arcs) for v in range(V)}
+        self.z = p.addVariables(self.users, vartype=xp.binary, name="z")
+        self.t = p.addVariables(self.N, V, lb=0, ub=self.M, name="t")
+        self.dis = p.addVariables(self.hubs, range(V), lb=0, ub=20.0, name="dis")
 
         # 목적 함수: (승객 가치) + (V2G 방전 가치) - (주행 거리 비용)
         p.setObjective(
             xp.Sum(50000 * self.z[u] for u in self.users) +
-            xp.Sum(200 * self.dis[h, v] for h in self.hubs for v in range(self.V)) -
-            xp.Sum(0.15 * self.dist[i, j] * self.x[i, j, v] for (i, j) in self.arcs for v in range(self.V)),
+            xp.Sum(200 * self.dis[h, v] for h in self.hubs for v in range(V)) -
+            xp.Sum((0.15 * arc_dist)[:, None] * self.X),
             sense=xp.maximize
         )
 
-        # 제약 조건 설정
-        for v in range(self.V):
-            p.addConstraint(xp.Sum(self.x[h, j, v] for (h, j) in self.arcs if h in self.hubs) == 1)
-            p.addConstraint(xp.Sum(self.x[i, h, v] for (i, h) in self.arcs if h in self.hubs) == 1)
+        # 제약 조건 설정 (유형별로 모아서 한 번에 추가)
+        non_hubs = np.flatnonzero(~self.nodes.is_hub)
+        flow = []
+        for v in range(V):
+            flow.append(xp.Sum(self.X[self.hub_out_arcs, v]) == 1)
+            flow.append(xp.Sum(self.X[self.hub_in_arcs, v]) == 1)
 
-            for k in range(self.N):
-                if k not in self.hubs:
-                    p.addConstraint(xp.Sum(self.x[i, k, v] for (i, k2) in self.arcs if k2 == k) ==
-                                    xp.Sum(self.x[k, j, v] for (k2, j) in self.arcs if k2 == k))
-
-            for (i, j) in self.arcs:
-                p.addConstraint(self.t[j, v] >= self.t[i, v] + (self.dist[i, j] / 500) - self.M * (1 - self.x[i, j, v]))
+            for k in non_hubs:
+                flow.append(xp.Sum(self.X[self.in_arcs[k], v]) == xp.Sum(self.X[self.out_arcs[k], v]))
+        p.addConstraint(flow)
 
+        psg = []
         for u in self.users:
-            p.addConstraint(
-                xp.Sum(self.x[i, u, v] for (i, u_idx) in self.arcs if u_idx == u for v in range(self.V)) <= 1)
-            p.addConstraint(
-                self.z[u] == xp.Sum(self.x[i, u, v] for (i, u_idx) in self.arcs if u_idx == u for v in range(self.V)))
-
-            req_time = self.df.at[u, 'request_time']
+            in_u = self.in_arcs[u]
+            psg.append(xp.Sum(self.X[in_u, :]) <= 1)
+            psg.append(self.z[u] == xp.Sum(self.X[in_u, :]))
             d = self.user_dest[u]
+            for v in range(V):
+                psg.append(xp.Sum(self.X[self.in_arcs[d], v]) >= xp.Sum(self.X[in_u, v]))
+        p.addConstraint(psg)
+
+        travel = arc_dist / TRAVEL_SPEED
+        if self.formulation == "tight":
+            self._add_tight_constraints(travel)
+        else:
+            self._add_bigm_constraints(travel)
+
+        self.build_time = time.perf_counter() - build_start
+        print(f" - 모델 구축 시간: {self.build_time:.2f}초 "
+              f"(변수 {p.attributes.cols:,}개, 제약 {p.attributes.rows:,}개)")
+
+    def _alt_time(self, u):
+        # [Smart Choice 로직] 대안 수단(버스/도보) 이동 시간 -> 이보다 늦게 도착하면 태우지 않음
+        return self.dist[u, self.user_dest[u]] / ALT_SPEED + ALT_EXTRA
+
+    def _add_bigm_constraints(self, travel):
+        # 시간 전파 (Big-M): 모든 아크 × 차량을 배열 연산으로 생성
+        xp = _xpress()
+        p = self.prob
+        p.addConstraint(self.t[self.arc_dst, :] >= self.t[self.arc_src, :] + travel[:, None]
+                        - self.M * (1 - self.X))
 
-            # [Smart Choice 로직] 대안 수단(버스/도보) 대비 우위성 판단
-            alt_transport_time = (self.dist[u, d] / 250) + 10
-
+        psg = []
+        for u in self.users:
+            req_time = float(self.nodes.request_time[u])
+            d = self.user_dest[u]
+            alt_transport_time = self._alt_time(u)
             for v in range(self.V):
-                is_p = xp.Sum(self.x[i, u, v] for (i, idx) in self.arcs if idx == u)
-                p.addConstraint(self.t[u, v] >= req_time * is_p)
-                p.addConstraint(self.t[u, v] <= (req_time + 60) * is_p + self.M * (1 - is_p))
-                p.addConstraint(xp.Sum(self.x[i, d, v] for (i, d2) in self.arcs if d2 == d) >= is_p)
-                p.addConstraint((self.t[d, v] - req_time) <= alt_transport_time + self.M * (1 - is_p))
+                is_p = xp.Sum(self.X[self.in_arcs[u], v])
+                psg.append(self.t[u, v] >= req_time * is_p)
+                psg.append(self.t[u, v] <= (req_time + PICKUP_WINDOW) * is_p + self.M * (1 - is_p))
+                psg.append((self.t[d, v] - req_time) <= alt_transport_time + self.M * (1 - is_p))
+        p.addConstraint(psg)
+
+    def time_windows(self):
+        """
+        노드별 도착 시각 창 (earliest, latest) 배열 (분)
+
+        - 승객: [요청 시각, 요청 시각 + PICKUP_WINDOW] (가장 가까운 허브에서 바로 와도 늦으면 earliest > latest)
+        - 정류장: [가장 가까운 허브에서의 주행 시간, horizon]
+          horizon = 모든 승객의 (탑승 시간창 끝, 대안 수단 도착 시각) 중 최댓값.
+          이 시각 이후에 방문하는 정류장은 탑승 / 하차와 무관한 우회라서, 끝 허브로 바로 가면
+          거리(삼각 부등식)만 줄어듭니다. 따라서 최적해를 잃지 않고 정류장 시각을 horizon 이하로 둘 수 있습니다.
+        - 허브: [0, horizon + 허브로 들어오는 최장 주행 시간] (출발 허브는 0분 출발, 도착 허브는 마지막 도착 시각)
+        """
+        nd = self.nodes
+        dist_time = self.dist / TRAVEL_SPEED
+        req = nd.request_time
+        alt = np.array([self._alt_time(u) for u in self.users])
+        horizon = float((req[nd.users] + np.maximum(PICKUP_WINDOW, alt)).max()) if len(alt) else 0.0
+
+        earliest = dist_time[nd.hubs].min(axis=0).astype(np.float64)
+        latest = np.full(self.N, horizon)
+        earliest[nd.users] = np.maximum(earliest[nd.users], req[nd.users])
+        latest[nd.users] = req[nd.users] + PICKUP_WINDOW
+        earliest[nd.hubs] = 0.0
+        latest[nd.hubs] = horizon + dist_time[:, nd.hubs].max()
+        return earliest, latest
+
+    def _add_tight_constraints(self, travel):
+        """
+        강화 정식화 (tight)
+
+        - 시간창은 변수 범위로 (방문하지 않는 노드의 t 도 창 안의 아무 값이면 되므로 항상 유효)
+        - 아크 (i, j) 시간 전파의 M = latest_i + 주행 시간 - earliest_j (0 이하면 행 생략),
+          earliest_i + 주행 시간 > latest_j 인 아크는 변수 상한 0 으로 제거
+        - 허브 출발 아크는 t[j] >= sum((earliest_i + 주행 시간) * x[i, j]) 로 묶음
+          (출발 허브는 0분 출발, 같은 허브로 돌아오는 경로는 허브별 진출 + 진입 <= 1 로 금지)
+        - 차량은 모두 같으므로 태운 승객 수가 차량 번호 순으로 줄어들도록 대칭 제거
+        - 부분 순회 제거식은 B&B 노드에서 위반된 것만 추가 (subtour_cuts.SubtourSeparator)
+        """
+        xp = _xpress()
+        p = self.prob
+        V = self.V
+        nd = self.nodes
+        src, dst = self.arc_src, self.arc_dst
+        earliest, latest = self.time_windows()
+
+        # 1. 시간창 -> 변수 범위
+        t_cols = self.t.ravel().tolist()
+        p.chgBounds(t_cols, ['L'] * len(t_cols), np.repeat(earliest, V).tolist())
+        p.chgBounds(t_cols, ['U'] * len(t_cols), np.repeat(np.maximum(latest, earliest), V).tolist())
+
+        # 2. 시간상 불가능한 아크 / 시간창이 비어 있는 승객 제거
+        dead = (earliest[src] + travel > latest[dst] + 1e-9) | (earliest[dst] > latest[dst]) \
+            | (earliest[src] > latest[src])
+        if dead.any():
+            dead_cols = self.X[np.flatnonzero(dead), :].ravel().tolist()
+            p.chgBounds(dead_cols, ['U'] * len(dead_cols), [0.0] * len(dead_cols))
+        self.n_dead_arcs = int(dead.sum())
+
+        # 3. 허브 출발이 아닌 아크의 시간 전파 (아크별 M)
+        is_hub = nd.is_hub
+        big_m = latest[src] + travel - earliest[dst]
+        inner = np.flatnonzero(~is_hub[src] & ~dead & (big_m > 1e-9))
+        p.addConstraint(self.t[dst[inner], :] >= self.t[src[inner], :] + travel[inner, None]
+                        - big_m[inner, None] * (1 - self.X[inner, :]))
+
+        # 허브 출발 아크 포함, 진입 아크 전체에 대한 도착 시각 하한 (출발 허브 0분 기준)
+        lift = earliest[src] + travel
+        rows = []
+        for j in np.flatnonzero(~is_hub):
+            in_j = self.in_arcs[j]
+            for v in range(V):
+                rows.append(self.t[j, v] >= xp.Sum(lift[in_j] * self.X[in_j, v]))
+        # 같은 허브로 돌아오지 않음 (기존 모델에서는 허브 시각의 순환 때문에 불가능했던 경로)
+        for h in self.hubs:
+            for v in range(V):
+                rows.append(xp.Sum(self.X[self.out_arcs[h], v]) + xp.Sum(self.X[self.in_arcs[h], v]) <= 1)
+
+        # 4. 대안 수단보다 늦게 내려 주지 않음 (아크 대신 승객별 M 축소)
+        for u in self.users:
+            d = self.user_dest[u]
+            req_time = float(nd.request_time[u])
+            limit = req_time + self._alt_time(u)
+            m_u = latest[d] - limit
+            if m_u <= 1e-9:
+                continue
+            for v in range(V):
+                is_p = xp.Sum(self.X[self.in_arcs[u], v])
+                rows.append(self.t[d, v] <= limit + m_u * (1 - is_p))
+
+        # 5. 차량 대칭 제거: 차량 v 의 탑승 승객 수 >= 차량 v+1 의 탑승 승객 수
+        user_in = np.concatenate([self.in_arcs[u] for u in self.users]) if self.users else np.zeros(0, np.int64)
+        for v in range(V - 1):
+            rows.append(xp.Sum(self.X[user_in, v]) >= xp.Sum(self.X[user_in, v + 1]))
+        p.addConstraint(rows)
+
+        # 6. 부분 순회 절단 (지연 분리)
+        self.separator = SubtourSeparator(src, dst, _column_index(self.X), is_hub)
+        self.separator.attach(p)
 
     def _get_osrm_path(self, i, j):
-        try:
-            time.sleep(0.1)
-            url = f"http://router.project-osrm.org/route/v1/driving/{self.df.at[i, 'lon']},{self.df.at[i, 'lat']};{self.df.at[j, 'lon']},{self.df.at[j, 'lat']}?overview=full"
-            r = requests.get(url, timeout=2)
-            if r.status_code == 200:
-                return polyline.decode(r.json()['routes'][0]['geometry'])
-        except:
-            pass
-        return [[self.df.at[i, 'lat'], self.df.at[i, 'lon']], [self.df.at[j, 'lat'], self.df.at[j, 'lon']]]
+        # 디스크 캐시 우선 조회, 없을 때만 OSRM 요청 (서버 주소는 OSRM_BASE_URL 로 변경 가능)
+        lat1, lon1 = float(self.nodes.lat[i]), float(self.nodes.lon[i])
+        lat2, lon2 = float(self.nodes.lat[j]), float(self.nodes.lon[j])
+        path = get_default_cache().route(lat1, lon1, lat2, lon2)
+        if path:
+            return path
+        return [[lat1, lon1], [lat2, lon2]]
+
+    def add_mip_start(self, routes, served):
+        """
+        외부 해(분해 풀이, 휴리스틱 등)를 MIP 시작해로 등록
+
+        routes : {차량 v: [(i, j), ...]} 운행 아크 목록
+        served : 탑승 처리된 승객 노드 목록
+        """
+        x_val = np.zeros((len(self.arcs), self.V))
+        arc_pos = {arc: a for a, arc in enumerate(self.arcs)}
+        if self.formulation == "tight":
+            # 대칭 제거식에 맞게 태운 승객 수가 많은 차량부터 번호를 다시 매김
+            user_set = self.nodes.user_set
+            order = sorted(routes, key=lambda v: -sum(j in user_set for _, j in routes[v]))
+            routes = {new: routes[old] for new, old in enumerate(order)}
+        for v, arcs in routes.items():
+            for arc in arcs:
+                if arc in arc_pos:
+                    x_val[arc_pos[arc], v] = 1.0
+        served = set(served)
+        z_val = [1.0 if u in served else 0.0 for u in self.users]
+        self.prob.addMipSol(list(x_val.ravel()) + z_val,
+                           list(self.X.ravel()) + [self.z[u] for u in self.users], "warm_start")
+
+    def solve(self, maxtime=120, miprelstop=0.15):
+        self.prob.controls.miprelstop = miprelstop
+        self.prob.controls.maxtime = maxtime
+        solve_start = time.perf_counter()
+        self.prob.solve()
+        self.solve_time = time.perf_counter() - solve_start
+        print(f" - 풀이 시간: {self.solve_time:.2f}초 (모델 구축 {getattr(self, 'build_time', 0.0):.2f}초 별도)")
+        if self.formulation == "tight":
+            print(f" - 부분 순회 절단: {self.separator.n_cuts:,}개 (노드 콜백 {self.separator.n_calls:,}회), "
+                  f"시간상 불가능한 아크 {self.n_dead_arcs:,}개 제거")
+
+    def solve_and_generate_results(self, maxtime=120, miprelstop=0.15):
+        import folium
 
-    def solve_and_generate_results(self):
         print("--- [Solver] 최적화 실행 중 ---")
-        self.prob.controls.miprelstop = 0.15
-        self.prob.controls.maxtime = 120
-        self.prob.solve()
+        self.solve(maxtime=maxtime, miprelstop=miprelstop)
 
         # 결과 저장 경로 설정
         map_path = os.path.join(self.visual_dir, "cheonan_smart_choice_map.html")
@@ -150,67 +329,49 @@ class CheonanSmartCity_Master_Final:
         colors = ['red', 'blue', 'green', 'purple', 'orange', 'darkred', 'cadetblue', 'darkpurple', 'pink', 'lightblue',
                   'lightgreen', 'gray']
 
-        # 마커 추가
-        for idx, row in self.df.iterrows():
-            color = 'black' if row['location_type'] == 0 else ('blue' if row['location_type'] == 1 else 'red')
-            icon_type = 'star' if row['location_type'] == 0 else ('info-sign' if row['location_type'] == 1 else 'user')
-            folium.Marker([row['lat'], row['lon']], tooltip=f"Type {int(row['location_type'])} - ID {idx}",
-                          icon=folium.Icon(color=color, icon=icon_type)).add_to(m)
-
-        passenger_verify_logs = []
-        for v in range(self.V):
-            curr = -1
-            for h in self.hubs:
-                if any(self.prob.getSolution(self.x[h, j, v]) > 0.5 for (h_idx, j) in self.arcs if h_idx == h):
-                    curr = h
-                    break
-            if curr == -1: continue
-
-            v_path_nodes = [curr]
+        # 마커 추가 (허브는 아이콘 마커, 정류장 / 승객은 GeoJson 레이어 1개)
+        nd = self.nodes
+        others = np.flatnonzero(~nd.is_hub)
+        points = {
+            'lat': nd.lat[others], 'lon': nd.lon[others],
+            'color': np.where(nd.is_stop[others], 'blue', 'red'),
+            'label': np.char.add(np.char.add("Type ", nd.type[others].astype(str)),
+                                 np.char.add(" - ID ", others.astype(str))),
+        }
+        for idx in self.hubs:
+            folium.Marker([nd.lat[idx], nd.lon[idx]], tooltip=f"Type 0 - ID {idx}",
+                          icon=folium.Icon(color='black', icon='star')).add_to(m)
+        point_layer(points, "정류장 / 승객", color_field='color', tooltip_fields=['label']).add_to(m)
+
+        # 해 벡터를 한 번에 받아 차량별 경로 객체로 변환 (지도 / 엑셀 / 분석 공용)
+        self.routes = extract_routes(self)
+        route_coords = []
+        for route in self.routes:
             full_coords = []
-            visited = {curr}
-            while True:
-                next_node = -1
-                for (i, j) in self.arcs:
-                    if i == curr and self.prob.getSolution(self.x[i, j, v]) > 0.5:
-                        next_node = j
-                        break
-                if next_node == -1 or next_node in visited: break
-                full_coords.extend(self._get_osrm_path(curr, next_node))
-                v_path_nodes.append(next_node)
-                visited.add(next_node)
-                curr = next_node
-                if curr in self.hubs: break
-
-            if full_coords:
-                folium.PolyLine(full_coords, color=colors[v % 12], weight=4, opacity=0.7).add_to(m)
-
-            # 로그 수집
-            for u in self.users:
-                if self.prob.getSolution(self.z[u]) > 0.5 and u in v_path_nodes:
-                    dest = self.user_dest[u]
-                    try:
-                        u_idx, d_idx = v_path_nodes.index(u), v_path_nodes.index(dest)
-                        path_chain = v_path_nodes[u_idx: d_idx + 1]
-                        passenger_verify_logs.append({
-                            '승객ID': self.df.at[u, 'passenger_id'],
-                            '이동경로(노드순서)': " -> ".join(map(str, path_chain)),
-                            '배차차량': f"e-DRT_{v + 1:02d}"
-                        })
-                    except:
-                        pass
+            for i, j in route.arcs:
+                full_coords.extend(self._get_osrm_path(i, j))
+            route_coords.append(full_coords)
+        # OSRM 경로는 지도 줌(13)에 맞게 단순화해 레이어 1개로 표시
+        line_layer(route_coords, "차량 경로", colors=[colors[r.vehicle % 12] for r in self.routes],
+                   labels=[r.name for r in self.routes]).add_to(m)
+
+        passenger_verify_logs = passenger_logs(self.routes, self.nodes, self.user_dest)
 
         m.save(map_path)
         with pd.ExcelWriter(excel_path) as writer:
             pd.DataFrame(passenger_verify_logs).to_excel(writer, sheet_name='승객별_경로_검증', index=False)
-            self.df.to_excel(writer, sheet_name='위경도좌표정보', index=True)
+            nd.frame().to_excel(writer, sheet_name='위경도좌표정보', index=True)
+            routes_to_frame(self.routes, nd).to_excel(writer, sheet_name='차량별_운행경로', index=False)
 
         print(f"✅ 결과물이 visualization 폴더에 생성되었습니다.")
         print(f"📍 지도: {map_path}")
         print(f"📍 보고서: {excel_path}")
 
 
-if __name__ == "__main__":
+def main():
+    """기존 허브 / 승객 CSV 로 MIP 풀이 후 지도 + 엑셀 보고서 저장"""
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+
     # 데이터 경로 자동 조합
     hub_file = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
     psg_file = os.path.join(DATA_DIR, "passenger_data.csv")
@@ -218,4 +379,8 @@ if __name__ == "__main__":
     # 모델 초기화 (경로 전달)
     model = CheonanSmartCity_Master_Final(hub_file, psg_file, VISUAL_DIR)
     model.build_model()
-    model.solve_and_generate_results()
\ No newline at end of file
+    model.solve_and_generate_results()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 원본 공간 데이터 -> 컬럼형 캐시 (GeoParquet / Feather)
+# =========================================================
+# 전국 버스정류장 엑셀(.xlsx) 과 100m 인구 격자(.shp/.dbf) 를 매번 읽고 좌표계를 바꾸는 대신,
+# 한 번 EPSG:5179 로 변환 / 시 경계로 필터링한 결과를 data/cache 에 저장해 두고 다시 씁니다.
+# - 격자, 시 경계 : GeoParquet (필요한 컬럼만 읽음)
+# - 정류장       : Feather (메모리 맵으로 필요한 컬럼만 읽고, 좌표는 x / y 컬럼으로 보관)
+# 캐시마다 원본 파일의 해시를 옆에 .json 으로 기록하고, 원본이 바뀌면 다시 만듭니다.
+# (크기 / 수정 시각이 그대로면 해시 계산도 건너뜀)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+BUS_EXCEL_PATH = os.path.join(DATA_DIR, "국토교통부_전국 버스정류장 위치정보_20251031.xlsx")
+GRID_SHP_PATH = os.path.join(
+    DATA_DIR,
+    "grid_data",
+    "(B100)국토통계_인구정보-총 인구 수(전체)-(격자) 100M_충청남도 천안시_202410",
+    "nlsp_021001001.shp"
+)
+
+METRIC_EPSG = 5179
+SHP_PARTS = (".shp", ".shx", ".dbf", ".prj", ".cpg")
+STOP_COLUMNS = ['정류장번호', '정류장명', '위도', '경도', '도시명']
+
+
+# ---------------------------------------------------------
+# 원본 파일 해시 / 캐시 유효성
+# ---------------------------------------------------------
+def _source_files(path):
+    """shp 는 함께 쓰는 .dbf / .shx / .prj 까지 원본으로 취급"""
+    stem, ext = os.path.splitext(path)
+    if ext.lower() != ".shp":
+        return [path]
+    return [stem + part for part in SHP_PARTS if os.path.exists(stem + part)]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _fingerprint(sources, previous=None):
+    """원본별 {크기, 수정 시각, 해시} (크기 / 수정 시각이 같으면 이전 해시 재사용)"""
+    previous = previous or {}
+    out = {}
+    for path in sources:
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        old = previous.get(key)
+        if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+            out[key] = old
+        else:
+            out[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": file_hash(path)}
+    return out
+
+
+def _replace_with(path, write):
+    """
+    write(임시 경로) 후 os.replace 로 교체
+
+    동시에 같은 캐시를 만드는 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일은 프로세스별로 둡니다.
+    (Windows 에서 다른 프로세스가 열어 둔 파일은 교체할 수 없는데, 그 경우 내용이 같으므로 새 파일은 버림)
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except PermissionError:
+        if not os.path.exists(path):
+            raise
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_meta(meta_path, fp):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"sources": fp}, f, ensure_ascii=False, indent=2)
+
+    _replace_with(meta_path, write)
+
+
+def _cached(name, sources, build, read, write, refresh=False):
+    """캐시가 원본 해시와 일치하면 read(path), 아니면 build() -> write(obj, path) 후 반환"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, name)
+    meta_path = path + ".json"
+
+    meta = None
+    if not refresh and os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    files = [f for src in sources for f in _source_files(src)]
+    fp = _fingerprint(files, meta["sources"] if meta else None)
+    if meta is not None and {k: v["sha1"] for k, v in fp.items()} == \
+            {k: v["sha1"] for k, v in meta["sources"].items()}:
+        if fp != meta["sources"]:  # 내용은 같고 수정 시각만 바뀐 경우 기록 갱신
+            _write_meta(meta_path, fp)
+        return read(path)
+
+    print(f"📦 [캐시 생성] {name}")
+    obj = build()
+    # 데이터 -> 메타 순서로 교체 (메타가 먼저 바뀌면 이전 데이터를 새 원본의 캐시로 읽을 수 있음)
+    _replace_with(path, lambda tmp: write(obj, tmp))
+    _write_meta(meta_path, fp)
+    return obj
+
+
+def _cache_name(prefix, path, ext, *tags):
+    # 지역별 격자 파일명이 모두 같으므로(nlsp_021001001.shp) 경로 해시로 구분
+    stem = os.path.splitext(os.path.basename(path))[0]
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return "_".join([prefix, stem, key, *tags]) + ext
+
+
+# ---------------------------------------------------------
+# 인구 격자 / 시 경계
+# ---------------------------------------------------------
+def load_grid(grid_path=GRID_SHP_PATH, columns=("val",), refresh=False):
+    """100m 인구 격자 (EPSG:5179 GeoDataFrame, 지정한 컬럼 + geometry 만 읽음)"""
+    import geopandas as gpd
+
+    columns = list(columns)
+
+    def build():
+        return gpd.read_file(grid_path).to_crs(epsg=METRIC_EPSG)
+
+    grid = _cached(_cache_name("grid", grid_path, ".parquet"), [grid_path], build,
+                   read=lambda p: gpd.read_parquet(p, columns=columns + ["geometry"]),
+                   write=lambda g, p: g.to_parquet(p, index=True), refresh=refresh)
+    return grid[columns + ["geometry"]]
+
+
+def load_boundary(grid_path=GRID_SHP_PATH, hull=False, refresh=False):
+    """격자 전체를 합친 시 경계 폴리곤 (hull=True 이면 볼록 껍질, EPSG:5179 GeoDataFrame 1행)"""
+    import geopandas as gpd
+
+    def build():
+        shape = load_grid(grid_path, columns=()).geometry.union_all()
+        return gpd.GeoDataFrame(geometry=[shape.convex_hull if hull else shape], crs=f"EPSG:{METRIC_EPSG}")
+
+    return _cached(_cache_name("boundary", grid_path, ".parquet", "hull" if hull else "union"), [grid_path],
+                   build, read=gpd.read_parquet, write=lambda g, p: g.to_parquet(p), refresh=refresh)
+
+
+# ---------------------------------------------------------
+# 버스 정류장
+# ---------------------------------------------------------
+def _stops_frame(excel_path, grid_path, hull):
+    """엑셀 -> (정류장 컬럼 + EPSG:5179 x, y) DataFrame (grid_path 를 주면 시 경계 안만)"""
+    import geopandas as gpd
+
+    bus_df = pd.read_excel(excel_path).dropna(subset=['위도', '경도'])
+    pts = gpd.GeoSeries(gpd.points_from_xy(bus_df['경도'], bus_df['위도']), crs="EPSG:4326",
+                        index=bus_df.index).to_crs(epsg=METRIC_EPSG)
+    if grid_path is not None:
+        inside = pts.intersects(load_boundary(grid_path, hull=hull).geometry.iloc[0])
+        bus_df, pts = bus_df[inside.values], pts[inside.values]
+    out = bus_df[[c for c in STOP_COLUMNS if c in bus_df.columns]].copy()
+    for c in out.columns:
+        if out[c].dtype == object:
+            out[c] = out[c].astype(str)
+    out['x'] = pts.x.to_numpy()
+    out['y'] = pts.y.to_numpy()
+    return out.reset_index(drop=True)
+
+
+def _read_feather(path, columns=None):
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def load_bus_stops(excel_path=BUS_EXCEL_PATH, grid_path=None, hull=False, columns=None, refresh=False):
+    """
+    버스정류장 (EPSG:5179 GeoDataFrame)
+
+    grid_path 를 주면 그 격자의 시 경계(hull=True 이면 볼록 껍질) 안 정류장만,
+    None 이면 엑셀 전체(전국) 정류장을 돌려줍니다. columns 로 읽을 속성 컬럼을 줄일 수 있습니다.
+    """
+    import geopandas as gpd
+
+    sources = [excel_path] + ([grid_path] if grid_path is not None else [])
+    tags = [_cache_name("in", grid_path, ""), "hull" if hull else "union"] if grid_path else ["all"]
+    read_cols = None if columns is None else list(columns) + ['x', 'y']
+    df = _cached(_cache_name("stops", excel_path, ".feather", *tags), sources,
+                 build=lambda: _stops_frame(excel_path, grid_path, hull),
+                 read=lambda p: _read_feather(p, read_cols),
+                 write=lambda d, p: d.reset_index(drop=True).to_feather(p), refresh=refresh)
+    if read_cols is not None:
+        df = df[read_cols]
+    return gpd.GeoDataFrame(df.drop(columns=['x', 'y']),
+                            geometry=gpd.points_from_xy(df['x'].to_numpy(np.float64), df['y'].to_numpy(np.float64)),
+                            crs=f"EPSG:{METRIC_EPSG}")
@@ -0,0 +1,370 @@
+import numpy as np
+import pandas as pd
+import time
+import os
+
+from dist_matrix import build_dist_matrix
+from node_store import NodeStore
+
+# =========================================================
+# 1. 경로 자동 설정
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/ 폴더
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+
+# =========================================================
+# 2. 운영 규칙 (fast_ver_opt.build_model / ideal_ver_opt 와 동일한 값)
+# =========================================================
+PASSENGER_VALUE = 50000   # 승객 1명 탑승 가치
+V2G_VALUE = 200           # 방전 kWh 당 가치
+DIST_COST = 0.15          # 주행 m 당 비용
+SPEED = 500               # 이동 시간 = 거리 / 500 (분)
+ALT_SPEED = 250           # [Smart Choice] 대안 수단 시간 = 거리 / 250 + 10 (분)
+ALT_EXTRA = 10
+PICKUP_WINDOW = 60        # 요청 후 60분 이내 탑승
+MAX_DIST = 6000           # 허브/승객 목적지 외 아크 최대 거리
+MAX_LOAD = 4              # 최대 탑승 인원
+BATTERY_CAP = 64.0        # kWh
+ENERGY_PER_KM = 0.31      # kWh/km
+SOC_MIN, SOC_MAX = 20.0, 100.0
+V2G_MAX = 20.0            # 허브 1회 최대 방전량 (kWh)
+
+
+class HeuristicDispatcher:
+    """
+    솔버 없이 동작하는 배차 엔진 (최소 비용 삽입 + 지역 탐색)
+
+    차량 경로는 [출발 허브, ..., 도착 허브] 이며, MIP 와 같이 출발 허브로는 돌아오지 않습니다.
+    결과의 routes / served 는 CheonanSmartCity_Master_Final.add_mip_start 에 그대로 넣을 수 있습니다.
+    """
+
+    def __init__(self, node_file, passenger_file, num_vehicles=12, max_dist=MAX_DIST, time_limit=0.5):
+        self.nodes = NodeStore.from_frames(node_file, passenger_file)
+
+        self.N = len(self.nodes)
+        self.V = num_vehicles
+        self.time_limit = time_limit
+        self.hubs = self.nodes.hubs
+        self.users = self.nodes.users
+        self.is_user = self.nodes.is_user.copy()
+
+        self.dist = build_dist_matrix(self.nodes.lat, self.nodes.lon, dtype=np.float64)
+
+        # 승객별 요청 시각 / 목적지 / 대안 수단 시간 (승객이 아닌 노드는 -1, 0)
+        # (실시간 배차기가 뒤에 승객을 덧붙이므로 저장소 필드의 복사본 사용)
+        self.req = self.nodes.request_time.copy()
+        self.dest = self.nodes.dest.copy()
+        self.alt = np.zeros(self.N)
+        self.alt[self.users] = self.dist[self.users, self.dest[self.users]] / ALT_SPEED + ALT_EXTRA
+
+        # 운행 가능한 아크 (MIP 의 유효 아크와 동일한 규칙)
+        self.allowed = self.dist <= max_dist
+        self.allowed[self.hubs, :] = True
+        self.allowed[:, self.hubs] = True
+        self.allowed[self.users, self.dest[self.users]] = True
+        np.fill_diagonal(self.allowed, False)
+
+        # 노드별 가까운 허브 순위 (도착 허브 선택용)
+        self.hub_rank = self.hubs[np.argsort(self.dist[:, self.hubs], axis=1)]
+        self.start_hub = self.hubs[np.arange(self.V) % len(self.hubs)]
+
+        self.routes = [[] for _ in range(self.V)]
+        # 차량별로 더 이상 바꿀 수 없는(이미 운행/출발한) 경로 앞부분 길이
+        self.locked = [0] * self.V
+        self.fixed_times = [[] for _ in range(self.V)]
+        # 현재 계획의 출발점 (실시간 배차기가 운행을 마친 앞부분을 떼어내면 그 끝 노드 / 시각 / 누적 거리로 바뀜)
+        self.origin = [int(h) for h in self.start_hub]
+        self.origin_time = [0.0] * self.V
+        self.driven = [0.0] * self.V
+        self.history = [[] for _ in range(self.V)]   # 떼어낸 앞부분 노드 (출발 허브부터, origin 제외)
+        self.done_psg = [0] * self.V                 # 떼어낸 앞부분에서 태운 승객 수
+        self.clock = 0.0
+        self.retry_unserved = True
+        self.values = [self._value(v, []) for v in range(self.V)]
+
+    # ---------------------------------------------------------
+    # 경로 평가
+    # ---------------------------------------------------------
+    def _end_hub(self, v, last):
+        ranks = self.hub_rank[last]
+        if ranks[0] != self.start_hub[v] or len(ranks) == 1:
+            return ranks[0]
+        return ranks[1]
+
+    def _nodes(self, v, inner):
+        start = self.origin[v]
+        return [start] + inner + [self._end_hub(v, inner[-1] if inner else start)]
+
+    def _evaluate(self, v, inner, times=None):
+        """(총 주행거리, 도착 SoC) / 규칙 위반 시 None (times 를 주면 노드별 도착 시각을 채움)"""
+        nodes = np.array(self._nodes(v, inner))
+        if not self.allowed[nodes[:-1], nodes[1:]].all():
+            return None
+        legs = self.dist[nodes[:-1], nodes[1:]]
+        total = self.driven[v] + float(legs.sum())
+        soc_end = SOC_MAX - total / 1000 * ENERGY_PER_KM / BATTERY_CAP * 100
+        if soc_end < SOC_MIN:
+            return None
+
+        lock, fixed = self.locked[v], self.fixed_times[v]
+        t, load, onboard = self.origin_time[v], 0, {}
+        if times is not None:
+            times.append(t)
+        for k in range(1, len(nodes)):
+            node = nodes[k]
+            if k <= lock:
+                # 이미 확정된 구간은 실제 도착 시각 사용
+                t = fixed[k - 1]
+            else:
+                if k == lock + 1 and t < self.clock:
+                    t = self.clock  # 확정 구간 이후는 현재 시각 이후에만 출발
+                t += legs[k - 1] / SPEED
+                if self.is_user[node] and t < self.req[node]:
+                    t = self.req[node]
+            if times is not None:
+                times.append(t)
+            if self.is_user[node]:
+                req = self.req[node]
+                if t > req + PICKUP_WINDOW:
+                    return None
+                load += 1
+                if load > MAX_LOAD:
+                    return None
+                onboard.setdefault(self.dest[node], []).append(node)
+            elif node in onboard:
+                for u in onboard.pop(node):
+                    if t - self.req[u] > self.alt[u]:
+                        return None
+                    load -= 1
+        if onboard:
+            return None
+        return total, soc_end
+
+    @staticmethod
+    def _discharge(soc_end):
+        """도착 허브에서 SoC 하한까지 V2G 방전 가능량 (kWh)"""
+        return min(V2G_MAX, (soc_end - SOC_MIN) / 100 * BATTERY_CAP)
+
+    def _value(self, v, inner):
+        ev = self._evaluate(v, inner)
+        if ev is None:
+            return None
+        total, soc_end = ev
+        n_psg = self.done_psg[v] + (int(self.is_user[inner].sum()) if inner else 0)
+        return PASSENGER_VALUE * n_psg + V2G_VALUE * self._discharge(soc_end) - DIST_COST * total
+
+    # ---------------------------------------------------------
+    # 삽입 / 제거
+    # ---------------------------------------------------------
+    def _best_insertion(self, u, v, inner):
+        """승객 u 를 차량 v 경로에 넣는 최선의 (가치, 새 경로) (근사 증분 거리 순으로 검사)"""
+        d = self.dest[u]
+        lock = self.locked[v]
+        full = np.array(self._nodes(v, inner))
+        a, b = full[:-1], full[1:]
+        au, ab = self.dist[a, u], self.dist[a, b]
+        du = au + self.dist[u, b] - ab
+        du[:lock] = np.inf  # 확정된 구간 사이에는 끼워 넣지 않음
+
+        if d in inner:
+            # 목적지를 이미 방문하면 그보다 앞에만 태울 수 있음
+            pos = inner.index(d)
+            for g in np.argsort(du[:pos + 1]):
+                if not np.isfinite(du[g]):
+                    break
+                cand = inner[:g] + [u] + inner[g:]
+                value = self._value(v, cand)
+                if value is not None:
+                    return value, cand
+            return None
+
+        db = self.dist[d, b]
+        dd = self.dist[a, d] + db - ab
+        delta = du[:, None] + dd[None, :]
+        same = au + self.dist[u, d] + db - ab
+        delta[np.diag_indices_from(delta)] = same
+        delta[np.tril_indices_from(delta, k=-1)] = np.inf  # 하차는 탑승 이후 구간에만
+        delta[:lock, :] = np.inf
+        order = np.argsort(delta, axis=None)
+        gaps = len(a)
+        for flat in order:
+            if not np.isfinite(delta.flat[flat]):
+                break
+            g, g2 = divmod(int(flat), gaps)
+            cand = inner[:g] + [u] + inner[g:g2] + [d] + inner[g2:]
+            value = self._value(v, cand)
+            if value is not None:
+                return value, cand
+        return None
+
+    def _remove(self, inner, u):
+        """경로에서 승객 u 를 빼고, 다른 승객이 쓰지 않는 목적지 방문도 제거"""
+        new = [n for n in inner if n != u]
+        d = self.dest[u]
+        if not any(self.is_user[n] and self.dest[n] == d for n in new):
+            new = [n for n in new if n != d]
+        return new
+
+    def _insert_request(self, u, deadline=None):
+        best = None
+        for v in range(self.V):
+            res = self._best_insertion(u, v, self.routes[v])
+            if res is None:
+                continue
+            gain = res[0] - self.values[v]
+            if best is None or gain > best[0]:
+                best = (gain, v, res)
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        if best is None or best[0] <= 0:
+            return False
+        _, v, (value, cand) = best
+        self.routes[v], self.values[v] = cand, value
+        return True
+
+    # ---------------------------------------------------------
+    # 지역 탐색 (2-opt / relocate / exchange)
+    # ---------------------------------------------------------
+    def _two_opt(self, v):
+        r = self.routes[v]
+        for i in range(self.locked[v], len(r) - 1):
+            for j in range(i + 1, len(r)):
+                cand = r[:i] + r[i:j + 1][::-1] + r[j + 1:]
+                value = self._value(v, cand)
+                if value is not None and value > self.values[v] + 1e-6:
+                    self.routes[v], self.values[v] = cand, value
+                    return True
+        return False
+
+    def _relocate(self, u, a):
+        removed = self._remove(self.routes[a], u)
+        val_a = self._value(a, removed)
+        if val_a is None:
+            return False
+        for b in range(self.V):
+            if b == a:
+                continue
+            res = self._best_insertion(u, b, self.routes[b])
+            if res is not None and val_a + res[0] > self.values[a] + self.values[b] + 1e-6:
+                self.routes[a], self.values[a] = removed, val_a
+                self.routes[b], self.values[b] = res[1], res[0]
+                return True
+        return False
+
+    def _exchange(self, u, a, w, b):
+        ra, rb = self._remove(self.routes[a], u), self._remove(self.routes[b], w)
+        res_a = self._best_insertion(w, a, ra) if self._value(a, ra) is not None else None
+        res_b = self._best_insertion(u, b, rb) if self._value(b, rb) is not None else None
+        if res_a is None or res_b is None:
+            return False
+        if res_a[0] + res_b[0] > self.values[a] + self.values[b] + 1e-6:
+            self.routes[a], self.values[a] = res_a[1], res_a[0]
+            self.routes[b], self.values[b] = res_b[1], res_b[0]
+            return True
+        return False
+
+    def _served_by(self):
+        return {u: v for v in range(self.V) for u in self.routes[v] if self.is_user[u]}
+
+    def _movable(self):
+        """확정 구간 밖에서 탑승하는(다른 차량으로 옮길 수 있는) 승객"""
+        return {u: v for v in range(self.V) for u in self.routes[v][self.locked[v]:] if self.is_user[u]}
+
+    def _local_search(self, deadline):
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for v in range(self.V):
+                while self._two_opt(v):
+                    improved = True
+            for u, a in self._movable().items():
+                if time.perf_counter() > deadline:
+                    return
+                if u in self.routes[a] and self._relocate(u, a):
+                    improved = True
+            owner = self._movable()
+            served = list(owner)
+            for x in range(len(served)):
+                for y in range(x + 1, len(served)):
+                    if time.perf_counter() > deadline:
+                        return
+                    u, w = served[x], served[y]
+                    a, b = owner[u], owner[w]
+                    if a != b and u in self.routes[a] and w in self.routes[b] and self._exchange(u, a, w, b):
+                        owner = self._movable()
+                        improved = True
+            # 경로가 바뀌었으니 미배차 승객을 다시 넣어 봄
+            owner = self._served_by()
+            for u in (self.users if self.retry_unserved else []):
+                if u not in owner and self._insert_request(u, deadline):
+                    improved = True
+                    owner = self._served_by()
+
+    # ---------------------------------------------------------
+    # 실행 / 결과
+    # ---------------------------------------------------------
+    def solve(self):
+        print("--- [Heuristic] 삽입 + 지역 탐색 배차 실행 ---")
+        start = time.perf_counter()
+        deadline = start + self.time_limit
+        # 요청 시각 순으로 최소 비용 삽입
+        for u in self.users[np.argsort(self.req[self.users], kind='stable')]:
+            self._insert_request(u)
+        self._local_search(deadline)
+        self.solve_time = time.perf_counter() - start
+        result = self.result()
+        print(f" - 풀이 시간: {self.solve_time:.2f}초, 탑승 {len(result['served'])}/{len(self.users)}명, "
+              f"목적함수 {result['objective']:,.0f}")
+        return result
+
+    def _passenger_id(self, u):
+        return self.nodes.passenger_id[u]
+
+    def result(self):
+        """
+        routes  : {차량: [(i, j), ...]}  (add_mip_start 입력 형식)
+        paths   : {차량: [노드 순서]}     (solve_and_generate_results 의 v_path_nodes 형식)
+        served  : 탑승 승객 노드 목록
+        logs    : 승객별 경로 검증 로그 (결과 보고서 시트 형식)
+        """
+        routes, paths, served, logs, discharge = {}, {}, [], [], {}
+        for v in range(self.V):
+            nodes = [int(n) for n in self.history[v] + self._nodes(v, self.routes[v])]
+            paths[v] = nodes
+            routes[v] = list(zip(nodes[:-1], nodes[1:]))
+            _, soc_end = self._evaluate(v, self.routes[v])
+            discharge[v] = self._discharge(soc_end)
+            for k, u in enumerate(nodes[1:-1], start=1):
+                if not self.is_user[u]:
+                    continue
+                served.append(u)
+                chain = nodes[k: nodes.index(int(self.dest[u]), k) + 1]
+                logs.append({
+                    '승객ID': self._passenger_id(u),
+                    '이동경로(노드순서)': " -> ".join(map(str, chain)),
+                    '배차차량': f"e-DRT_{v + 1:02d}"
+                })
+        return {
+            "routes": routes,
+            "paths": paths,
+            "served": served,
+            "logs": logs,
+            "discharge": discharge,
+            "objective": float(sum(self.values)),
+        }
+
+
+def main():
+    """기본 데이터로 휴리스틱 배차 실행"""
+    hub_file = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
+    psg_file = os.path.join(DATA_DIR, "passenger_data.csv")
+
+    dispatcher = HeuristicDispatcher(hub_file, psg_file)
+    res = dispatcher.solve()
+    print(pd.DataFrame(res["logs"]).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
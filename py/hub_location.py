@@ -0,0 +1,405 @@
+import numpy as np
+import pandas as pd
+import os
+import time
+
+from dist_matrix import build_cross_matrix
+
+# =========================================================
+# 인구 가중 허브 입지 선정 (p-median / 최대 커버리지)
+# =========================================================
+# elbow_map.py 는 KMeans 중심점을 가장 가까운 충전소에 붙이는 방식이라 인구 가중치도,
+# 충전소 용량도 반영하지 못했습니다. 여기서는 정류장 × 후보지 거리 행렬을 한 번 만들고
+# - median   : 인구 가중 총 이동 거리 최소화
+# - coverage : 반경 안 인구 최대화 (반경 밖이면 비용 1 인 0/1 비용 행렬의 p-median 과 동일)
+# 을 greedy 추가 + Teitz–Bart 교환 탐색(후보지 전체를 NumPy 로 한 번에 평가)으로 풉니다.
+# 용량이 있으면 선택된 허브 집합마다 배정 LP(HiGHS)로 비용을 계산하고,
+# 작은 문제는 MIP(scipy.optimize.milp)로 최적해를 구할 수 있습니다.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+VIS_DIR = os.path.join(PROJECT_ROOT, "visualization")
+
+COVER_RADIUS = 3000   # 허브 서비스 반경 (m, elbow_map 지도 원 반경과 동일)
+COL_BLOCK = 512       # 후보지 평가 시 한 번에 처리할 열 수 (임시 메모리 상한)
+SHORTLIST = 8         # 용량 제약이 있을 때 LP 로 다시 평가할 후보 수
+UNSERVED_PENALTY = 10.0  # 용량 부족으로 배정 못 한 인구의 비용 (최대 거리 대비 배수)
+
+# 인프라 후보지 (충전소 고정 좌표)
+INFRA_CANDIDATES = [
+    {"name": "천안한양수자인에코시티 충전소", "lat": 36.7563, "lon": 127.1176, "address": "풍세면 풍세산단로 290"},
+    {"name": "천안추모공원 충전소", "lat": 36.6852, "lon": 127.0985, "address": "광덕면 밤나무골길 38"},
+    {"name": "천안동남경찰서 충전소", "lat": 36.7886, "lon": 127.1514, "address": "청수6로 73"},
+    {"name": "천안박물관 충전소", "lat": 36.7892, "lon": 127.1663, "address": "삼룡동 265-30"},
+    {"name": "동남구청 충전소", "lat": 36.8063, "lon": 127.1512, "address": "옛시청길 39"},
+    {"name": "남서울대학교 충전소", "lat": 36.9105, "lon": 127.1353, "address": "성환읍 대학로 91"},
+    {"name": "서북구청 충전소", "lat": 36.8792, "lon": 127.1726, "address": "성거읍 봉주로 75"}
+]
+
+
+class HubSolution:
+    """허브 선택 결과 (sites: 후보지 인덱스, assign: 정류장별 허브 후보지 인덱스, 미배정 -1)"""
+
+    def __init__(self, k, objective, method, sites, assign, cost, elapsed):
+        self.k = k
+        self.objective = objective
+        self.method = method
+        self.sites = np.asarray(sites, dtype=np.int64)
+        self.assign = np.asarray(assign, dtype=np.int64)
+        self.cost = float(cost)
+        self.elapsed = elapsed
+
+    @property
+    def cluster(self):
+        """정류장별 허브 순번 (sites 안의 위치, 미배정 -1)"""
+        pos = np.full(self.sites.max() + 1 if len(self.sites) else 1, -1, dtype=np.int64)
+        pos[self.sites] = np.arange(len(self.sites))
+        return np.where(self.assign >= 0, pos[self.assign], -1)
+
+    def __repr__(self):
+        return f"HubSolution(k={self.k}, {self.objective}/{self.method}, cost={self.cost:.1f}, sites={self.sites.tolist()})"
+
+
+class HubLocator:
+    """
+    정류장(수요) × 후보지 거리 행렬 기반 허브 입지 선정
+
+    demand : lat, lon (+ weight 컬럼, 없으면 1) DataFrame
+    sites  : lat, lon DataFrame (capacity 컬럼이 있거나 capacity 를 주면 용량 제약 적용)
+    capacity : 허브별 최대 배정 인구 (스칼라 또는 후보지 수 길이 배열)
+    """
+
+    def __init__(self, demand, sites, weight="total_pop", capacity=None, radius=COVER_RADIUS,
+                 method="flat", dtype=np.float32):
+        self.demand = demand.reset_index(drop=True)
+        self.sites = sites.reset_index(drop=True)
+        self.radius = radius
+
+        if weight in self.demand.columns:
+            self.weights = np.nan_to_num(self.demand[weight].to_numpy(dtype=np.float64))
+        else:
+            self.weights = np.ones(len(self.demand))
+
+        if capacity is None and "capacity" in self.sites.columns:
+            capacity = self.sites["capacity"].to_numpy(dtype=np.float64)
+        self.capacity = None if capacity is None else np.broadcast_to(
+            np.asarray(capacity, dtype=np.float64), (len(self.sites),)).copy()
+
+        start = time.perf_counter()
+        self.dist = build_cross_matrix(self.demand['lat'], self.demand['lon'],
+                                       self.sites['lat'], self.sites['lon'], method=method, dtype=dtype)
+        self.build_time = time.perf_counter() - start
+        self._costs = {"median": self.dist}
+        self.solutions = {}
+
+    # -----------------------------------------------------
+    # 비용 행렬 / 평가
+    # -----------------------------------------------------
+    def cost_matrix(self, objective):
+        """median: 거리(m), coverage: 반경 밖이면 1 (가중합 = 커버 못 한 인구)"""
+        if objective not in self._costs:
+            if objective != "coverage":
+                raise ValueError(f"지원하지 않는 목적 함수입니다: {objective}")
+            self._costs[objective] = (self.dist > self.radius).astype(self.dist.dtype)
+        return self._costs[objective]
+
+    def _penalty(self, objective):
+        """용량 부족으로 배정 못 한 인구 1명의 비용"""
+        if objective == "coverage":
+            return 1.0  # 커버하지 못한 것과 동일
+        return UNSERVED_PENALTY * float(self.dist.max() if self.dist.size else 1.0)
+
+    def _nearest(self, C, S):
+        """선택 집합 S 안에서 정류장별 (최소 비용, 그 후보지, 두 번째 최소 비용)"""
+        sub = C[:, S]
+        if len(S) == 1:
+            return sub[:, 0].astype(np.float64), np.full(len(C), S[0]), np.full(len(C), np.inf)
+        part = np.argpartition(sub, 1, axis=1)[:, :2]
+        rows = np.arange(len(C))
+        c1, c2 = sub[rows, part[:, 0]], sub[rows, part[:, 1]]
+        swap = c2 < c1
+        first = np.where(swap, part[:, 1], part[:, 0])
+        d1 = np.minimum(c1, c2).astype(np.float64)
+        d2 = np.maximum(c1, c2).astype(np.float64)
+        return d1, np.asarray(S)[first], d2
+
+    def _weighted_min(self, C, base):
+        """모든 후보지 c 에 대해 Σ w_i · min(C_ic, base_i) (열 블록 단위)"""
+        out = np.empty(C.shape[1])
+        base = base[:, None]
+        for start in range(0, C.shape[1], COL_BLOCK):
+            blk = slice(start, start + COL_BLOCK)
+            out[blk] = self.weights @ np.minimum(C[:, blk], base)
+        return out
+
+    def _assign_capacitated(self, C, S, objective):
+        """용량 제약 배정 LP -> (정류장별 후보지 인덱스(최대 배정 비율 기준, 미배정 -1), 비용)"""
+        from scipy.optimize import linprog
+        from scipy.sparse import csr_matrix, hstack, identity
+
+        n, p = len(C), len(S)
+        w = self.weights
+        cost = np.concatenate([(w[:, None] * C[:, S]).ravel(), w * self._penalty(objective)])
+
+        rows = np.repeat(np.arange(n), p)
+        a_assign = csr_matrix((np.ones(n * p), (rows, np.arange(n * p))), shape=(n, n * p))
+        a_eq = hstack([a_assign, identity(n, format="csr")], format="csr")
+        a_ub = hstack([csr_matrix((np.repeat(w, p), (np.tile(np.arange(p), n), np.arange(n * p))), shape=(p, n * p)),
+                       csr_matrix((p, n))], format="csr")
+
+        res = linprog(cost, A_ub=a_ub, b_ub=self.capacity[S], A_eq=a_eq, b_eq=np.ones(n),
+                      bounds=(0, 1), method="highs")
+        if res.status != 0:
+            raise RuntimeError(f"용량 배정 LP 실패: {res.message}")
+        x = res.x[:n * p].reshape(n, p)
+        assign = np.asarray(S)[x.argmax(axis=1)]
+        assign[x.max(axis=1) < 1e-9] = -1
+        return assign, float(res.fun)
+
+    def evaluate(self, S, objective="median"):
+        """선택 집합 S 의 (정류장별 배정, 목적 함수 값)"""
+        C = self.cost_matrix(objective)
+        S = list(S)
+        if self.capacity is not None:
+            return self._assign_capacitated(C, S, objective)
+        d1, a1, _ = self._nearest(C, S)
+        if objective != "median":
+            a1 = self._nearest(self.dist, S)[1]  # 커버 여부가 같으면 가장 가까운 허브에 배정
+        return a1, float(self.weights @ d1)
+
+    # -----------------------------------------------------
+    # greedy 추가 + Teitz–Bart 교환
+    # -----------------------------------------------------
+    def _pick(self, scores, S, objective, shortlist):
+        """점수(비용 하한 순위)가 좋은 후보를 골라 실제 비용으로 평가 -> (집합, 비용)"""
+        if self.capacity is None:
+            shortlist = 1  # 용량이 없으면 점수가 곧 실제 비용 (확인용으로 한 번만 평가)
+        flat = scores.ravel()
+        top = np.argsort(flat, kind="stable")[:shortlist] if len(flat) <= shortlist \
+            else np.argpartition(flat, shortlist)[:shortlist]
+        top = top[np.isfinite(flat[top])]
+        top = top[np.argsort(flat[top], kind="stable")]
+        best_set, best_cost = None, np.inf
+        for t in top:
+            new_set = S(t)
+            cost = self.evaluate(new_set, objective)[1]
+            if cost < best_cost:
+                best_set, best_cost = new_set, cost
+        return best_set, best_cost
+
+    def _greedy(self, C, S, k, objective, shortlist):
+        """S 에서 시작해 비용을 가장 많이 줄이는 후보지를 k 개가 될 때까지 추가"""
+        S = list(S)
+        while len(S) < min(k, C.shape[1]):
+            d1 = self._nearest(C, S)[0] if S else np.full(len(C), np.inf)
+            scores = self._weighted_min(C, d1)
+            scores[S] = np.inf
+            S, _ = self._pick(scores, lambda c: S + [int(c)], objective, shortlist)
+        return S
+
+    def _swap_scores(self, C, S):
+        """
+        모든 교환 (S[pos] -> c) 의 비용 (len(S), 후보지 수) 을 행렬 한 번 훑기로 계산
+
+        cost(S - r + c) = Σ w·d1 - G[c] + E[r, c]
+          G[c]    = Σ_i w_i · max(0, d1_i - C_ic)                       (c 를 넣어 줄어드는 비용)
+          E[r, c] = Σ_{i: r 에 배정} w_i · clip(C_ic - d1_i, 0, d2_i - d1_i)  (r 을 빼서 늘어나는 비용)
+        """
+        d1, a1, d2 = self._nearest(C, S)
+        w = self.weights
+        pos = np.empty(C.shape[1], dtype=np.int64)
+        pos[S] = np.arange(len(S))
+        owner = np.zeros((len(S), len(C)), dtype=C.dtype)   # owner[r, i] = w_i (정류장 i 가 S[r] 에 배정된 경우)
+        owner[pos[a1], np.arange(len(C))] = w
+
+        # 순위만 정하면 되므로 블록 연산은 거리 행렬 dtype(float32) 으로 (실제 비용은 _pick 에서 다시 평가)
+        d1_c = d1.astype(C.dtype)[:, None]
+        span = (d2 - d1).astype(C.dtype)[:, None]
+        w_c = w.astype(C.dtype)
+        total = float(w @ d1)
+        scores = np.empty((len(S), C.shape[1]))
+        for start in range(0, C.shape[1], COL_BLOCK):
+            blk = slice(start, start + COL_BLOCK)
+            diff = C[:, blk] - d1_c
+            gain = w_c @ np.maximum(-diff, 0)
+            np.clip(diff, 0, span, out=diff)
+            scores[:, blk] = total - gain + owner @ diff
+        return scores
+
+    def _swap(self, C, S, objective, shortlist, max_iter):
+        """(나갈 허브 r, 들어올 후보 c) 모든 쌍을 평가해 가장 좋은 교환을 개선이 없을 때까지 반복"""
+        S = list(S)
+        current = self.evaluate(S, objective)[1]
+        for _ in range(max_iter):
+            if len(S) == 0 or len(S) == C.shape[1]:
+                break
+            scores = self._swap_scores(C, S)
+            scores[:, S] = np.inf
+
+            def swapped(t):
+                pos, c = divmod(int(t), C.shape[1])
+                return S[:pos] + [c] + S[pos + 1:]
+
+            new_set, cost = self._pick(scores, swapped, objective, shortlist)
+            if new_set is None or cost >= current - 1e-9 * max(1.0, abs(current)):
+                break
+            S, current = new_set, cost
+        return S
+
+    # -----------------------------------------------------
+    # MIP (scipy.optimize.milp / HiGHS)
+    # -----------------------------------------------------
+    def _solve_mip(self, C, k, objective, neighbors=None, time_limit=None):
+        """
+        p-median MIP (y_j: 허브 선택, x_ij: 배정 비율, u_i: 미배정)
+
+        neighbors 를 주면 정류장마다 가까운 후보지 neighbors 곳만 배정 변수로 둡니다.
+        """
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        from scipy.sparse import csr_matrix, vstack
+
+        n, m = C.shape
+        w = self.weights
+        if neighbors is not None and neighbors < m:
+            cols = np.argpartition(self.dist, neighbors - 1, axis=1)[:, :neighbors]
+        else:
+            cols = np.broadcast_to(np.arange(m), (n, m))
+        rows = np.repeat(np.arange(n), cols.shape[1])
+        cols = cols.ravel()
+        nx = len(cols)
+        x_idx = m + np.arange(nx)          # 변수 순서: y (m) | x (nx) | u (n)
+        u_idx = m + nx + np.arange(n)
+        nvar = m + nx + n
+
+        c = np.zeros(nvar)
+        c[x_idx] = w[rows] * C[rows, cols]
+        c[u_idx] = w * self._penalty(objective)
+
+        blocks, lo, hi = [], [], []
+        # Σ_j x_ij + u_i = 1
+        blocks.append(csr_matrix((np.ones(nx + n), (np.concatenate([rows, np.arange(n)]),
+                                                     np.concatenate([x_idx, u_idx]))), shape=(n, nvar)))
+        lo.append(np.ones(n))
+        hi.append(np.ones(n))
+        # x_ij <= y_j
+        r = np.arange(nx)
+        blocks.append(csr_matrix((np.r_[np.ones(nx), -np.ones(nx)], (np.r_[r, r], np.r_[x_idx, cols])),
+                                 shape=(nx, nvar)))
+        lo.append(np.full(nx, -np.inf))
+        hi.append(np.zeros(nx))
+        # Σ y_j = k
+        blocks.append(csr_matrix((np.ones(m), (np.zeros(m, dtype=int), np.arange(m))), shape=(1, nvar)))
+        lo.append([k])
+        hi.append([k])
+        if self.capacity is not None:
+            # Σ_i w_i x_ij <= cap_j y_j
+            blocks.append(csr_matrix((np.r_[w[rows], -self.capacity], (np.r_[cols, np.arange(m)], np.r_[x_idx, np.arange(m)])),
+                                     shape=(m, nvar)))
+            lo.append(np.full(m, -np.inf))
+            hi.append(np.zeros(m))
+
+        integrality = np.zeros(nvar)
+        integrality[:m] = 1
+        options = {"disp": False}
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+        res = milp(c, constraints=LinearConstraint(vstack(blocks, format="csr"), np.concatenate(lo), np.concatenate(hi)),
+                   integrality=integrality, bounds=Bounds(0, 1), options=options)
+        if res.x is None:
+            raise RuntimeError(f"허브 입지 MIP 실패: {res.message}")
+        return np.flatnonzero(res.x[:m] > 0.5).tolist()
+
+    # -----------------------------------------------------
+    # 실행
+    # -----------------------------------------------------
+    def solve(self, k, objective="median", method="heuristic", init=None, shortlist=SHORTLIST,
+              max_iter=100, neighbors=None, time_limit=None):
+        """
+        허브 k 곳 선택
+
+        method : "heuristic" (greedy + Teitz–Bart 교환, init 집합에서 이어서 탐색) 또는 "mip"
+        """
+        start = time.perf_counter()
+        C = self.cost_matrix(objective)
+        k = min(int(k), C.shape[1])
+        if method == "heuristic":
+            S = self._greedy(C, list(init or [])[:k], k, objective, shortlist)
+            S = self._swap(C, S, objective, shortlist, max_iter)
+        elif method == "mip":
+            S = self._solve_mip(C, k, objective, neighbors, time_limit)
+        else:
+            raise ValueError(f"지원하지 않는 풀이 방식입니다: {method}")
+
+        S = sorted(S)
+        assign, cost = self.evaluate(S, objective)
+        sol = HubSolution(k, objective, method, S, assign, cost, time.perf_counter() - start)
+        self.solutions[(objective, method, k)] = sol
+        return sol
+
+    def metrics(self, sol):
+        """인구 가중 평균 거리, 반경 내 커버 인구 / 비율, 최대 거리, 미배정 인구"""
+        w = self.weights
+        ok = sol.assign >= 0
+        d = np.full(len(w), np.nan)
+        d[ok] = self.dist[np.flatnonzero(ok), sol.assign[ok]]
+        total = w.sum()
+        covered = float(w[ok][d[ok] <= self.radius].sum())
+        return {
+            "k": sol.k,
+            "objective": sol.objective,
+            "method": sol.method,
+            "cost": sol.cost,
+            "weighted_mean_dist": float(w[ok] @ d[ok] / w[ok].sum()) if w[ok].sum() > 0 else np.nan,
+            "max_dist": float(d[ok].max()) if ok.any() else np.nan,
+            "covered_pop": covered,
+            "coverage_ratio": covered / total if total > 0 else np.nan,
+            "unserved_pop": float(w[~ok].sum()),
+            "sites": sol.sites.tolist(),
+            "elapsed": sol.elapsed,
+        }
+
+    def sweep(self, k_values, objective="median", method="heuristic", **kwargs):
+        """
+        여러 k 를 한 번에 실행 -> k 별 지표 DataFrame
+
+        heuristic 은 작은 k 의 해에서 greedy 로 1곳씩 추가한 뒤 교환 탐색을 이어갑니다. (warm start)
+        """
+        rows, prev = [], []
+        for k in sorted(set(int(k) for k in k_values)):
+            sol = self.solve(k, objective, method, init=prev if method == "heuristic" else None, **kwargs)
+            prev = sol.sites.tolist()
+            row = self.metrics(sol)
+            if "name" in self.sites.columns:
+                row["site_names"] = ", ".join(self.sites['name'].iloc[sol.sites].astype(str))
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def hub_frame(self, sol):
+        """선택된 후보지 + 허브 순번(target_cluster) / 배정 정류장 수 / 배정 인구"""
+        hubs = self.sites.iloc[sol.sites].reset_index(drop=True).copy()
+        hubs['target_cluster'] = np.arange(len(sol.sites))
+        cluster = sol.cluster
+        ok = cluster >= 0
+        hubs['stop_count'] = np.bincount(cluster[ok], minlength=len(sol.sites))
+        hubs['assigned_pop'] = np.bincount(cluster[ok], weights=self.weights[ok], minlength=len(sol.sites))
+        return hubs
+
+
+def main():
+    """충전소 후보지 k 스윕 (median / coverage) 저장"""
+    stops = pd.read_csv(os.path.join(DATA_DIR, "cheonan_all_stops_over_100.csv"), encoding="utf-8-sig")
+    locator = HubLocator(stops, pd.DataFrame(INFRA_CANDIDATES))
+
+    results = pd.concat([locator.sweep(range(1, len(INFRA_CANDIDATES) + 1), objective)
+                         for objective in ("median", "coverage")], ignore_index=True)
+    os.makedirs(VIS_DIR, exist_ok=True)
+    out_path = os.path.join(VIS_DIR, "hub_location_sweep.csv")
+    results.to_csv(out_path, index=False, encoding="utf-8-sig")
+    print(results[['objective', 'k', 'weighted_mean_dist', 'coverage_ratio', 'site_names']].to_string(index=False))
+    print(f"✅ 허브 입지 k 스윕 저장: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
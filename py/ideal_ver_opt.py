@@ -1,12 +1,8 @@
-import xpress as xp
 import numpy as np
-import pandas as pd
-import folium
-import requests
-import polyline
 import time
 import os
-from datetime import datetime, timedelta
+from dist_matrix import build_dist_matrix
+from node_store import NodeStore
 
 # =========================================================
 # 1. 경로 자동 설정 (os 모듈 활용)
@@ -18,14 +14,21 @@ PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트 (e_vrt_v2g_proje
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")  # data/ 폴더
 VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")  # visualization/ 폴더
 
-# 저장용 폴더가 없으면 자동 생성
-os.makedirs(VISUAL_DIR, exist_ok=True)
 
-# Xpress 라이브러리 초기화
-try:
-    xp.init('c:/xpressmp/bin/xpauth.xpr')
-except:
-    pass
+_XP = None
+
+
+def _xpress():
+    """xpress 는 모델을 만들 때 처음 import + 라이선스 초기화 (모듈 import 는 가볍게)"""
+    global _XP
+    if _XP is None:
+        import xpress as xp
+        try:
+            xp.init('c:/xpressmp/bin/xpauth.xpr')
+        except:
+            pass
+        _XP = xp
+    return _XP
 
 
 class Cheonan_SmartCity_Final_Boss:
@@ -33,16 +36,14 @@ class Cheonan_SmartCity_Final_Boss:
         print("--- 🏆 [System] 천안시 스마트시티 통합 최적화 끝판왕 가동 ---")
         self.visual_dir = visual_dir
 
-        # 데이터 로드
-        self.df_base = pd.read_csv(node_file)
-        self.df_passengers = pd.read_csv(passenger_file)
-        self.df = pd.concat([self.df_base, self.df_passengers], ignore_index=True)
+        # 데이터 로드 -> 노드 배열 저장소
+        self.nodes = NodeStore.from_frames(node_file, passenger_file)
 
-        self.N = len(self.df)
-        self.hubs = self.df[self.df['location_type'] == 0].index.tolist()
-        self.users = self.df[self.df['location_type'] == 2].index.tolist()
-        self.stops = self.df[self.df['location_type'] == 1].index.tolist()
-        self.user_dest = {u: int(self.df.at[u, 'dest_id']) for u in self.users}
+        self.N = len(self.nodes)
+        self.hubs = self.nodes.hubs.tolist()
+        self.users = self.nodes.users.tolist()
+        self.stops = self.nodes.stops.tolist()
+        self.user_dest = self.nodes.user_dest
 
         # 물리 행렬 및 파라미터
         self.dist = self._build_dist_matrix()
@@ -50,21 +51,20 @@ class Cheonan_SmartCity_Final_Boss:
         self.battery_cap = 64.0  # kWh
         self.max_load = 4  # 최대 탑승 인원
         self.M = 600  # Big-M 최적화 (10시간)
-        self.prob = xp.problem("Cheonan_Final_Boss")
+        self.prob = _xpress().problem("Cheonan_Final_Boss")
 
     def _build_dist_matrix(self):
-        mat = np.zeros((self.N, self.N))
-        coords = self.df[['lat', 'lon']].values
-        for i in range(self.N):
-            for j in range(self.N):
-                if i != j:
-                    mat[i, j] = np.sqrt(
-                        ((coords[i][0] - coords[j][0]) * 111000) ** 2 + ((coords[i][1] - coords[j][1]) * 88800) ** 2)
-        return mat
+        # 위경도 -> 미터 변환 근사치 (공용 거리 엔진, 벡터화 + float32)
+        return build_dist_matrix(self.nodes.lat, self.nodes.lon, method="flat")
 
     def build_model(self):
+        xp = _xpress()
         print("--- 🧠 모든 제약식 통합 중 (SoC + Load + Time + V2G) ---")
         p = self.prob
+        req_time = self.nodes.request_time.tolist()
+        # 노드별 적재 변화 (승객 +1, 정류장 -1, 허브 0)
+        demand = np.where(self.nodes.is_user, 1, np.where(self.nodes.is_stop, -1, 0)).tolist()
+        is_hub = self.nodes.is_hub.tolist()
 
         # 1. 결정 변수
         self.x = {(i, j, v): p.addVariable(vartype=xp.binary, name=f"x_{i}_{j}_{v}")
@@ -86,7 +86,7 @@ class Cheonan_SmartCity_Final_Boss:
             xp.Sum(
                 0.2 * self.dist[i, j] * self.x[i, j, v] for i in range(self.N) for j in range(self.N) if i != j for v in
                 range(self.V)) -  # 거리비용
-            xp.Sum(500 * (self.t[u, v] - self.df.at[u, 'request_time'] * self.z[u]) for u in self.users for v in
+            xp.Sum(500 * (self.t[u, v] - req_time[u] * self.z[u]) for u in self.users for v in
                    range(self.V)),  # 대기 페널티
             sense=xp.maximize
         )
@@ -108,19 +108,17 @@ class Cheonan_SmartCity_Final_Boss:
                         travel_time = self.dist[i, j] / 500
                         p.addConstraint(self.t[j, v] >= self.t[i, v] + travel_time - self.M * (1 - self.x[i, j, v]))
                         energy_loss = (self.dist[i, j] / 1000) * 0.31
-                        gain = (self.dis[i, v] / self.battery_cap * 100) if i in self.hubs else 0
+                        gain = (self.dis[i, v] / self.battery_cap * 100) if is_hub[i] else 0
                         p.addConstraint(
                             self.soc[j, v] <= self.soc[i, v] - energy_loss - gain + self.M * (1 - self.x[i, j, v]))
-                        demand = 1 if j in self.users else (-1 if j in self.stops else 0)
                         p.addConstraint(
-                            self.load[j, v] >= self.load[i, v] + demand - self.max_load * (1 - self.x[i, j, v]))
+                            self.load[j, v] >= self.load[i, v] + demand[j] - self.max_load * (1 - self.x[i, j, v]))
 
         for u in self.users:
             p.addConstraint(
                 xp.Sum(self.x[i, u, v] for i in range(self.N) if i != u for v in range(self.V)) == self.z[u])
-            req_time = self.df.at[u, 'request_time']
             for v in range(self.V):
-                p.addConstraint(self.t[u, v] >= req_time * xp.Sum(self.x[i, u, v] for i in range(self.N) if i != u))
+                p.addConstraint(self.t[u, v] >= req_time[u] * xp.Sum(self.x[i, u, v] for i in range(self.N) if i != u))
 
         for h in self.hubs:
             for v in range(self.V):
@@ -141,7 +139,10 @@ class Cheonan_SmartCity_Final_Boss:
         print(f"✅ 결과물이 visualization 폴더에 생성되었습니다: {report_path}")
 
 
-if __name__ == "__main__":
+def main():
+    """통합 모델 (SoC + 탑승 + 시간 + V2G) 풀이 후 보고서 저장"""
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+
     # 데이터 경로 자동 조합
     hub_file = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
     psg_file = os.path.join(DATA_DIR, "passenger_data.csv")
@@ -149,4 +150,8 @@ if __name__ == "__main__":
     # 모델 가동
     boss = Cheonan_SmartCity_Final_Boss(hub_file, psg_file, VISUAL_DIR)
     boss.build_model()
-    boss.solve_and_export()
\ No newline at end of file
+    boss.solve_and_export()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# =========================================================
+# 100m 격자 위 점들의 DBSCAN (격자 인덱스 연결 요소)
+# =========================================================
+# 사각지대 격자 중심점은 100m 간격 정격자 위에 있으므로, eps 안의 이웃은
+# 정해진 격자 오프셋((dx, dy), dx² + dy² <= (eps / cell)²) 뿐입니다.
+# 오프셋마다 정렬된 격자 키를 searchsorted 로 찾아 이웃 쌍을 만들고 연결 요소로 묶으면
+# 점 수에 거의 선형인 시간으로 sklearn DBSCAN 과 같은 라벨을 얻습니다.
+# (격자 위에 있지 않은 입력은 sklearn DBSCAN 으로 그대로 처리)
+
+LATTICE_TOL = 1e-6   # 격자 판정 허용 오차 (cell 대비 비율)
+
+
+def lattice_cell(xy, tol=LATTICE_TOL):
+    """점들이 정격자 위에 있으면 격자 간격, 아니면 None"""
+    if len(xy) < 2:
+        return None
+    steps = []
+    for axis in range(2):
+        diffs = np.diff(np.unique(xy[:, axis]))
+        if len(diffs):
+            steps.append(diffs.min())
+    if not steps:
+        return None
+    cell = min(steps)
+    if cell <= 0:
+        return None
+    r = (xy - xy.min(axis=0)) / cell
+    return float(cell) if np.abs(r - np.round(r)).max() <= tol else None
+
+
+def _neighbor_offsets(eps, cell):
+    """eps 안에 들어올 수 있는 격자 오프셋 (한쪽 반평면만, 자기 자신 제외)"""
+    reach = int(np.floor(eps / cell + LATTICE_TOL))
+    offsets = []
+    for dx in range(0, reach + 1):
+        for dy in range(-reach, reach + 1):
+            if (dx == 0 and dy <= 0) or (dx * dx + dy * dy) * cell * cell > eps * eps * (1 + LATTICE_TOL):
+                continue
+            offsets.append((dx, dy))
+    return offsets
+
+
+def _lattice_pairs(xy, eps, cell):
+    """거리가 eps 이하인 점 쌍 (i, j) (경계 오프셋은 실제 좌표 거리로 재확인)"""
+    idx = np.round((xy - xy.min(axis=0)) / cell).astype(np.int64)
+    width = idx[:, 1].max() + 2 * int(eps / cell) + 3
+    keys = idx[:, 0] * width + idx[:, 1]
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    src, dst = [], []
+    for dx, dy in _neighbor_offsets(eps, cell):
+        target = keys + dx * width + dy
+        pos = np.minimum(np.searchsorted(sorted_keys, target), len(keys) - 1)
+        hit = sorted_keys[pos] == target
+        i, j = np.flatnonzero(hit), order[pos[hit]]
+        if (dx * dx + dy * dy) * cell * cell >= eps * eps * (1 - LATTICE_TOL):
+            # eps 와 같은 거리는 부동소수 오차에 따라 DBSCAN 결과가 갈리므로 실제 거리로 판정
+            d = np.hypot(*(xy[i] - xy[j]).T)
+            i, j = i[d <= eps], j[d <= eps]
+        src.append(i)
+        dst.append(j)
+    return np.concatenate(src), np.concatenate(dst)
+
+
+def lattice_dbscan(xy, eps, min_samples=1, sample_weight=None, cell=None):
+    """
+    sklearn DBSCAN(eps, min_samples).fit_predict(xy, sample_weight) 과 같은 라벨 (잡음 -1)
+
+    라벨 번호는 DBSCAN 과 같이 클러스터의 첫 번째 코어 점 순서로 매깁니다.
+    cell 을 주지 않으면 격자 간격을 자동으로 찾고, 격자가 아니면 sklearn DBSCAN 으로 처리합니다.
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    n = len(xy)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    cell = cell or lattice_cell(xy)
+    if cell is None:
+        from sklearn.cluster import DBSCAN
+        return DBSCAN(eps=eps, min_samples=min_samples).fit_predict(xy, sample_weight=sample_weight)
+
+    w = np.ones(n) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    i, j = _lattice_pairs(xy, eps, cell)
+
+    # 코어 점: 자신 포함 eps 이웃의 가중치 합 >= min_samples
+    neighborhood = w + np.bincount(i, weights=w[j], minlength=n) + np.bincount(j, weights=w[i], minlength=n)
+    core = neighborhood >= min_samples
+
+    both = core[i] & core[j]
+    graph = coo_matrix((np.ones(both.sum()), (i[both], j[both])), shape=(n, n))
+    _, comp = connected_components(graph, directed=False)
+
+    labels = np.full(n, -1, dtype=np.int64)
+    core_idx = np.flatnonzero(core)
+    if len(core_idx):
+        # 클러스터 번호를 첫 코어 점 순서로 재배열
+        first = np.full(comp.max() + 1, n, dtype=np.int64)
+        np.minimum.at(first, comp[core_idx], core_idx)
+        used = np.flatnonzero(first < n)
+        rank = np.empty(comp.max() + 1, dtype=np.int64)
+        rank[used[np.argsort(first[used])]] = np.arange(len(used))
+        labels[core_idx] = rank[comp[core_idx]]
+
+        # 경계 점: 이웃 코어 중 가장 먼저 생긴 클러스터에 편입
+        border = ~core
+        cand = np.full(n, np.iinfo(np.int64).max)
+        for a, b in ((i, j), (j, i)):
+            m = border[a] & core[b]
+            np.minimum.at(cand, a[m], labels[b[m]])
+        attach = border & (cand < np.iinfo(np.int64).max)
+        labels[attach] = cand[attach]
+    return labels
+
+
+def cluster_summary(labels, weights):
+    """
+    클러스터별 (가중치 합, 가중치 최대 점의 위치, 점 개수) 를 한 번에 계산 (잡음 -1 제외)
+
+    최대 점이 여러 개면 먼저 나온 점 (pandas idxmax 와 동일)
+    """
+    labels = np.asarray(labels)
+    weights = np.asarray(weights, dtype=np.float64)
+    valid = np.flatnonzero(labels >= 0)
+    n_clusters = int(labels[valid].max()) + 1 if len(valid) else 0
+    total = np.bincount(labels[valid], weights=weights[valid], minlength=n_clusters)
+    count = np.bincount(labels[valid], minlength=n_clusters)
+
+    order = valid[np.lexsort((valid, -weights[valid], labels[valid]))]
+    first = np.r_[True, labels[order][1:] != labels[order][:-1]] if len(order) else np.zeros(0, dtype=bool)
+    best = np.empty(n_clusters, dtype=np.int64)
+    best[labels[order][first]] = order[first]
+    return total, best, count
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from dist_matrix import LAT_TO_M
+
+# =========================================================
+# folium 지도 렌더링 공용 함수 (피처 수가 많아도 가벼운 HTML)
+# =========================================================
+# 기존 스크립트는 iterrows() 로 정류장 / 노드마다 folium.Circle / Marker 객체를 만들고,
+# OSRM 경로 좌표를 그대로 PolyLine 에 넣었기 때문에 HTML 크기가 피처 수에 비례해 커졌습니다.
+# 여기서는 GeoPandas / shapely 벡터 연산으로 FeatureCollection 을 한 번에 만들어
+# 레이어 1개(GeoJson 또는 FastMarkerCluster)로 넣고,
+# 선 / 면은 지도 줌에 맞는 허용 오차로 Douglas–Peucker 단순화 후 좌표 자릿수를 줄입니다.
+
+WEB_MERCATOR_M_PER_PX = 156543.03392   # 줌 0, 적도 기준 타일 픽셀당 m
+COORD_DIGITS = 6                       # 위경도 소수 6자리 (약 0.1m)
+DEFAULT_LAT = 36.815                   # 천안 지도 중심 위도
+
+
+def zoom_tolerance(zoom, lat=DEFAULT_LAT, pixels=1.0):
+    """줌 레벨에서 pixels 픽셀에 해당하는 거리 (도 단위, 단순화 허용 오차)"""
+    m_per_px = WEB_MERCATOR_M_PER_PX * np.cos(np.radians(lat)) / 2 ** zoom
+    return pixels * m_per_px / LAT_TO_M
+
+
+def _round(geoms, digits=COORD_DIGITS):
+    import shapely
+
+    return shapely.transform(np.asarray(geoms), lambda c: np.round(c, digits))
+
+
+def to_wgs84_frame(data, lat="lat", lon="lon", columns=()):
+    """
+    lat / lon 컬럼을 가진 표 또는 GeoDataFrame -> EPSG:4326 GeoDataFrame (지정 컬럼만 유지)
+
+    표는 DataFrame 외에 {컬럼: 배열} dict 나 NodeStore 처럼 data[컬럼] 으로 배열을 주는 객체도 됩니다.
+    """
+    import geopandas as gpd
+
+    columns = list(columns)
+    if isinstance(data, gpd.GeoDataFrame):
+        gdf = data[columns + [data.geometry.name]]
+        gdf = gdf.to_crs(epsg=4326) if gdf.crs is not None else gdf
+        return gdf.rename_geometry("geometry") if gdf.geometry.name != "geometry" else gdf
+    return gpd.GeoDataFrame({c: np.asarray(data[c]) for c in columns},
+                            geometry=gpd.points_from_xy(np.asarray(data[lon], dtype=np.float64),
+                                                        np.asarray(data[lat], dtype=np.float64)),
+                            crs="EPSG:4326")
+
+
+def _geojson(gdf, **kwargs):
+    """좌표 자릿수를 줄인 GeoDataFrame -> folium.GeoJson"""
+    import folium
+
+    gdf = gdf.set_geometry(_round(gdf.geometry.values))
+    return folium.GeoJson(gdf.to_json(drop_id=True, separators=(",", ":")), **kwargs)
+
+
+# =========================================================
+# 점 / 선 / 면 레이어
+# =========================================================
+def point_layer(data, name, color="blue", color_field=None, radius=5, fill_opacity=0.7,
+                tooltip_fields=None, popup_fields=None, lat="lat", lon="lon"):
+    """
+    점 전체를 GeoJson 레이어 1개의 CircleMarker 로 표시
+
+    color_field 를 주면 점마다 그 컬럼의 색을 사용합니다. tooltip_fields / popup_fields 는 표시할 컬럼 목록.
+    """
+    import folium
+
+    fields = list(dict.fromkeys([c for c in [color_field] + list(tooltip_fields or []) + list(popup_fields or [])
+                                 if c]))
+    gdf = to_wgs84_frame(data, lat, lon, fields)
+
+    def style(feature):
+        c = feature["properties"][color_field] if color_field else color
+        return {"color": c, "fillColor": c, "fillOpacity": fill_opacity, "weight": 1}
+
+    return _geojson(
+        gdf, name=name, style_function=style,
+        marker=folium.CircleMarker(radius=radius, fill=True),
+        tooltip=folium.GeoJsonTooltip(fields=list(tooltip_fields), labels=False) if tooltip_fields else None,
+        popup=folium.GeoJsonPopup(fields=list(popup_fields)) if popup_fields else None,
+    )
+
+
+def cluster_layer(data, name, lat="lat", lon="lon"):
+    """점이 수만 개 이상일 때: 좌표 배열만 넘기는 FastMarkerCluster (클러스터링은 브라우저에서)"""
+    from folium.plugins import FastMarkerCluster
+
+    if hasattr(data, "geometry"):
+        pts = data.to_crs(epsg=4326).geometry if data.crs is not None else data.geometry
+        coords = np.column_stack([pts.y.to_numpy(), pts.x.to_numpy()])
+    else:
+        coords = np.column_stack([np.asarray(data[lat], dtype=np.float64), np.asarray(data[lon], dtype=np.float64)])
+    return FastMarkerCluster(np.round(coords, COORD_DIGITS).tolist(), name=name)
+
+
+def area_layer(gdf, radius, name, color="#95a5a6", fill_opacity=0.15, dissolve=True, zoom=12, quad_segs=8):
+    """
+    점마다 반경 radius(m) 원을 그리던 것을 면 레이어 1개로 표시 (gdf 는 미터 좌표계)
+
+    dissolve=True 이면 원들을 하나의 면으로 합친 뒤 줌에 맞게 단순화합니다.
+    (겹친 원이 진하게 겹쳐 보이던 효과 대신 서비스권 전체가 같은 농도로 표시됨)
+    """
+    import geopandas as gpd
+
+    shapes = gdf.geometry.buffer(radius, quad_segs=quad_segs)
+    if dissolve:
+        shapes = gpd.GeoSeries([shapes.union_all()], crs=gdf.crs)
+    shapes = shapes.to_crs(epsg=4326).simplify(zoom_tolerance(zoom), preserve_topology=True)
+    return _geojson(
+        gpd.GeoDataFrame(geometry=shapes.reset_index(drop=True)), name=name,
+        style_function=lambda _: {"color": "none", "weight": 0, "fillColor": color, "fillOpacity": fill_opacity},
+    )
+
+
+def line_layer(lines, name, colors="blue", weight=4, opacity=0.7, zoom=13, labels=None):
+    """
+    [[lat, lon], ...] 좌표 목록 여러 개를 LineString 으로 만들어 GeoJson 레이어 1개로 표시
+
+    각 선은 줌 zoom 에서 1픽셀 허용 오차로 Douglas–Peucker 단순화합니다.
+    colors 는 색 하나 또는 선마다의 색 목록.
+    """
+    import folium
+    import geopandas as gpd
+    import shapely
+
+    keep = [i for i, line in enumerate(lines) if len(line) >= 2]
+    colors = [colors] * len(lines) if isinstance(colors, str) else list(colors)
+    if not keep:
+        return folium.FeatureGroup(name=name)
+
+    coords = np.concatenate([np.asarray(lines[i], dtype=np.float64) for i in keep])
+    index = np.repeat(np.arange(len(keep)), [len(lines[i]) for i in keep])
+    geoms = shapely.linestrings(coords[:, ::-1], indices=index)   # (lat, lon) -> (x=lon, y=lat)
+    geoms = shapely.simplify(geoms, zoom_tolerance(zoom), preserve_topology=False)
+
+    props = pd.DataFrame({"color": [colors[i] for i in keep]})
+    if labels is not None:
+        props["label"] = [str(labels[i]) for i in keep]
+    return _geojson(
+        gpd.GeoDataFrame(props, geometry=geoms, crs="EPSG:4326"), name=name,
+        style_function=lambda f: {"color": f["properties"]["color"], "weight": weight, "opacity": opacity},
+        tooltip=folium.GeoJsonTooltip(fields=["label"], labels=False) if labels is not None else None,
+    )
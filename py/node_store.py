@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from dist_matrix import project_flat
+
+# =========================================================
+# 노드(허브 / 정류장 / 승객) 열 단위 저장소
+# =========================================================
+# 최적화 클래스들은 pd.concat([df_base, df_passengers]) 로 만든 DataFrame 에서
+# 제약식 루프마다 self.df.at[u, ...] 로 값을 하나씩 읽고, hubs / users 리스트에 `in` 검사를 했습니다.
+# 여기서는 두 CSV 를 한 번만 NumPy 구조화 배열로 옮겨 정수 인덱스로 바로 읽고,
+# 노드 종류는 bool 마스크(배열 연산) + frozenset(파이썬 루프 안 멤버십) 으로 제공합니다.
+# 노드 순서는 기존과 같습니다. (허브 / 정류장 파일 행 순서, 그 뒤에 승객 파일 행 순서)
+
+HUB, STOP, USER = 0, 1, 2   # location_type
+
+NODE_DTYPE = np.dtype([
+    ("lat", np.float64),
+    ("lon", np.float64),
+    ("request_time", np.float64),   # 승객 요청 시각 (분, 승객이 아니면 0)
+    ("dest", np.int64),             # 승객 목적지 노드 (승객이 아니면 -1)
+    ("type", np.int8),              # location_type (0 허브, 1 정류장, 2 승객)
+], align=True)
+
+# 기존 CSV / DataFrame 컬럼명 -> 저장소 필드
+COLUMN_ALIASES = {"location_type": "type", "dest_id": "dest"}
+
+
+def _frame(data):
+    """CSV 경로 또는 DataFrame -> 컬럼명 공백을 제거한 DataFrame (None 이면 빈 표)"""
+    if data is None:
+        return pd.DataFrame()
+    df = data if isinstance(data, pd.DataFrame) else pd.read_csv(data)
+    if any(c != c.strip() for c in map(str, df.columns)):
+        df = df.rename(columns=lambda c: str(c).strip())
+    return df
+
+
+class NodeStore:
+    """
+    노드 배열 저장소 (records: NODE_DTYPE 구조화 배열, lat / lon / ... 는 그 필드 뷰)
+
+    hubs / stops / users        : 노드 번호 배열 (int64)
+    is_hub / is_stop / is_user  : bool 마스크
+    hub_set / stop_set / user_set : 파이썬 루프용 frozenset
+    user_dest                   : {승객 노드: 목적지 노드}
+    """
+
+    __slots__ = ("records", "lat", "lon", "request_time", "dest", "type", "passenger_id", "extra", "n_base",
+                 "is_hub", "is_stop", "is_user", "hubs", "stops", "users",
+                 "hub_set", "stop_set", "user_set", "user_dest")
+
+    def __init__(self, records, passenger_id=None, extra=None, n_base=None):
+        self.records = records
+        self.lat = records["lat"]
+        self.lon = records["lon"]
+        self.request_time = records["request_time"]
+        self.dest = records["dest"]
+        self.type = records["type"]
+        n = len(records)
+        self.passenger_id = (np.asarray(passenger_id, dtype=object) if passenger_id is not None
+                             else np.full(n, None, dtype=object))
+        self.extra = extra or {}
+        self.n_base = n if n_base is None else n_base
+
+        self.is_hub = self.type == HUB
+        self.is_stop = self.type == STOP
+        self.is_user = self.type == USER
+        self.hubs = np.flatnonzero(self.is_hub)
+        self.stops = np.flatnonzero(self.is_stop)
+        self.users = np.flatnonzero(self.is_user)
+        self.hub_set = frozenset(self.hubs.tolist())
+        self.stop_set = frozenset(self.stops.tolist())
+        self.user_set = frozenset(self.users.tolist())
+        self.user_dest = dict(zip(self.users.tolist(), self.dest[self.users].tolist()))
+
+    @classmethod
+    def from_frames(cls, node_file, passenger_file=None):
+        """허브 / 정류장 + 승객 (CSV 경로 또는 DataFrame) -> NodeStore (DataFrame 연결 없이 열 단위 복사)"""
+        parts = [_frame(node_file), _frame(passenger_file)]
+        sizes = [len(p) for p in parts]
+        records = np.zeros(sum(sizes), dtype=NODE_DTYPE)
+        records["dest"] = -1
+
+        start = 0
+        extra = {}
+        passenger_id = np.full(len(records), None, dtype=object)
+        for part, size in zip(parts, sizes):
+            rows = slice(start, start + size)
+            for col in part.columns:
+                field = COLUMN_ALIASES.get(col, col)
+                values = part[col].to_numpy()
+                if field in NODE_DTYPE.names:
+                    records[field][rows] = np.nan_to_num(values.astype(np.float64), nan=-1 if field == "dest" else 0)
+                elif col == "passenger_id":
+                    passenger_id[rows] = values
+                else:
+                    if col not in extra:
+                        extra[col] = np.full(len(records), np.nan, dtype=object)
+                    extra[col][rows] = values
+            start += size
+        return cls(records, passenger_id, extra, n_base=sizes[0])
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, name):
+        """컬럼 배열 (기존 DataFrame 컬럼명도 허용: location_type, dest_id, passenger_id, cluster_id 등)"""
+        field = COLUMN_ALIASES.get(name, name)
+        if field in NODE_DTYPE.names:
+            return self.records[field]
+        if field == "passenger_id":
+            return self.passenger_id
+        return self.extra[field]
+
+    def xy(self):
+        """평면 좌표 (n, 2) (m, dist_matrix.project_flat)"""
+        return project_flat(self.lat, self.lon)
+
+    def frame(self):
+        """보고서용 DataFrame (기존 pd.concat 결과와 같은 컬럼 구성)"""
+        df = pd.DataFrame({"location_type": self.type.astype(np.int64), "lat": self.lat, "lon": self.lon})
+        for col, values in self.extra.items():
+            df[col] = values
+        df["passenger_id"] = self.passenger_id
+        user = self.is_user
+        df["dest_id"] = np.where(user, self.dest, np.nan)
+        df["request_time"] = np.where(user, self.request_time, np.nan)
+        return df
+
+    def __repr__(self):
+        return (f"NodeStore(n={len(self)}, hubs={len(self.hubs)}, stops={len(self.stops)}, "
+                f"users={len(self.users)})")
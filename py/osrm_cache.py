@@ -0,0 +1,207 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# =========================================================
+# OSRM 경로/도로 스냅 영구 캐시 (fast_ver_opt / create_passengers 공용)
+# =========================================================
+# 같은 좌표 쌍은 다시 요청하지 않도록 SQLite 에 저장하고,
+# 오래 쓰지 않은 항목부터 지우는 LRU 방식으로 크기를 제한합니다.
+# 캐시 적중 시의 사용 시각(last_used)은 메모리에 모아 두었다가 put / 크기 점검 / close 때 한 번에 기록합니다.
+# OSRM 서버 주소는 환경변수로 바꿀 수 있어 로컬 OSRM 이나 녹화 응답 서버로 대체 가능합니다.
+#   OSRM_BASE_URL  : 기본 http://router.project-osrm.org
+#   OSRM_CACHE_PATH: 기본 data/osrm_cache.sqlite
+#   OSRM_OFFLINE=1 : 네트워크 요청 없이 캐시에 있는 응답만 사용
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+
+OSRM_BASE_URL = os.environ.get("OSRM_BASE_URL", "http://router.project-osrm.org")
+CACHE_PATH = os.environ.get("OSRM_CACHE_PATH", os.path.join(DATA_DIR, "osrm_cache.sqlite"))
+OFFLINE = os.environ.get("OSRM_OFFLINE", "0") == "1"
+
+COORD_DIGITS = 5          # 좌표 반올림 자릿수 (약 1m)
+MAX_ENTRIES = 200000      # 캐시 최대 항목 수 (초과 시 LRU 삭제)
+TOUCH_FLUSH = 1000        # 기록하지 않은 사용 시각이 이만큼 쌓이면 한 번에 UPDATE
+MIN_INTERVAL = 0.1        # 네트워크 요청 간 최소 간격(초), 캐시 적중 시에는 대기하지 않음
+TIMEOUT = 2
+
+
+class OSRMCache:
+    def __init__(self, path=CACHE_PATH, base_url=OSRM_BASE_URL, max_entries=MAX_ENTRIES,
+                 min_interval=MIN_INTERVAL, timeout=TIMEOUT, offline=OFFLINE, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.max_entries = max_entries
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.offline = offline
+        self._session = session
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._last_request = 0.0
+        self._puts_since_trim = 0
+        self._touched = {}  # key -> 아직 DB 에 쓰지 않은 last_used
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS osrm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON osrm_cache(last_used)")
+        self.conn.commit()
+
+    # ---------------------------------------------------------
+    # 캐시 저장소
+    # ---------------------------------------------------------
+    @staticmethod
+    def make_key(service, *coords):
+        """서비스명 + 반올림한 (lat, lon) 좌표열로 캐시 키 생성"""
+        parts = [f"{round(float(lat), COORD_DIGITS)},{round(float(lon), COORD_DIGITS)}" for lat, lon in coords]
+        return f"{service}:" + ";".join(parts)
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM osrm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_FLUSH:
+                self._flush_touched()
+                self.conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO osrm_cache (key, value, last_used) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._flush_touched()
+            self._puts_since_trim += 1
+            # 매번 COUNT 하지 않고 일정 횟수마다 크기를 점검
+            if self._puts_since_trim >= 1000:
+                self._trim()
+            self.conn.commit()
+
+    def _flush_touched(self):
+        """모아 둔 사용 시각을 한 번에 기록 (commit 은 호출한 쪽에서)"""
+        if self._touched:
+            self.conn.executemany("UPDATE osrm_cache SET last_used = ? WHERE key = ?",
+                                  [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+
+    def _trim(self):
+        """최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        self._flush_touched()
+        self._puts_since_trim = 0
+        count = self.conn.execute("SELECT COUNT(*) FROM osrm_cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM osrm_cache WHERE key IN "
+                "(SELECT key FROM osrm_cache ORDER BY last_used ASC LIMIT ?)", (excess,)
+            )
+
+    def flush(self):
+        """적중 기록을 지금 DB 에 반영"""
+        with self._lock:
+            self._flush_touched()
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._trim()
+            self.conn.commit()
+            self.conn.close()
+
+    # ---------------------------------------------------------
+    # OSRM 요청
+    # ---------------------------------------------------------
+    def _wait_turn(self):
+        """네트워크 요청 간 최소 간격 유지 (캐시 적중 시에는 호출되지 않음)"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._last_request + self.min_interval)
+            self._last_request = slot
+        if slot > now:
+            time.sleep(slot - now)
+
+    @property
+    def session(self):
+        """requests 세션 (네트워크 요청이 처음 필요할 때 생성)"""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def _fetch(self, url):
+        import requests
+
+        if self.offline:
+            return None
+        self._wait_turn()
+        try:
+            r = self.session.get(url, timeout=self.timeout)
+            if r.status_code == 200:
+                data = r.json()
+                if data.get('code') == 'Ok':
+                    return data
+        except (requests.RequestException, ValueError):
+            pass
+        return None
+
+    def route(self, lat1, lon1, lat2, lon2):
+        """두 지점 간 도로 경로 [[lat, lon], ...] (실패 시 None)"""
+        key = self.make_key("route", (lat1, lon1), (lat2, lon2))
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        url = f"{self.base_url}/route/v1/driving/{lon1},{lat1};{lon2},{lat2}?overview=full"
+        data = self._fetch(url)
+        if data is None:
+            return None
+        import polyline
+
+        coords = [list(pt) for pt in polyline.decode(data['routes'][0]['geometry'])]
+        self.put(key, coords)
+        return coords
+
+    def nearest(self, lat, lon):
+        """가장 가까운 도로 위 좌표 (lat, lon) (실패 시 None)"""
+        key = self.make_key("nearest", (lat, lon))
+        cached = self.get(key)
+        if cached is not None:
+            return tuple(cached)
+
+        url = f"{self.base_url}/nearest/v1/driving/{lon},{lat}"
+        data = self._fetch(url)
+        if data is None:
+            return None
+        snapped_lon, snapped_lat = data['waypoints'][0]['location']
+        self.put(key, [snapped_lat, snapped_lon])
+        return snapped_lat, snapped_lon
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """프로세스 전체에서 공유하는 기본 캐시 인스턴스"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OSRMCache()
+        atexit.register(_default_cache.close)  # 남은 적중 기록 반영
+    return _default_cache
@@ -0,0 +1,382 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# =========================================================
+# 분석 파이프라인 실행기 (의존 그래프 + 내용 해시 캐시 + 병렬 실행 + 단계별 시간)
+# =========================================================
+# 각 스크립트를 하나의 단계(Stage)로 보고 입력 / 출력 파일을 선언합니다.
+#  - 의존 관계: 어떤 단계의 입력이 다른 단계의 출력이면 자동으로 연결 (after 로 직접 지정도 가능)
+#  - 캐시: 스크립트 + 스크립트가 import 하는 py/ 모듈 + 입력 파일 내용 + 선행 단계 키의 SHA-256 이
+#          지난 실행과 같고 출력이 모두 있으면 건너뜀 (data/cache/pipeline_manifest.json)
+#  - 병렬: 앞 단계가 끝난 단계는 서로 독립이면 동시에 실행 (각 단계는 별도 python 프로세스)
+#  - 시간: 단계별 시작 / 종료 / 소요 시간과 임계 경로를 visualization/pipeline_timing.csv 로 저장
+#
+#   python pipeline.py                 # 전체 실행 (바뀐 단계만)
+#   python pipeline.py hub_map --force # hub_map 과 그 앞 단계를 캐시 무시하고 실행
+#   python pipeline.py --dry-run       # 실행할 / 건너뛸 단계만 출력
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+MANIFEST_PATH = os.path.join(DATA_DIR, "cache", "pipeline_manifest.json")
+
+HASH_BLOCK = 1 << 20   # 파일 해시 읽기 단위 (1MB)
+
+BUS_EXCEL = os.path.join(DATA_DIR, "국토교통부_전국 버스정류장 위치정보_20251031.xlsx")
+GRID_DIR = os.path.join(DATA_DIR, "grid_data")
+STOPS_CSV = os.path.join(DATA_DIR, "cheonan_all_stops_over_100.csv")   # final_stop_set 이 data/ 에 함께 쓰는 후보지
+HUB_CSV = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")        # 허브 + 정류장 노드 (수작업 정리본)
+PASSENGER_CSV = os.path.join(DATA_DIR, "passenger_data.csv")
+SMP_DIR = os.path.join(DATA_DIR, "smp")
+
+
+class Stage:
+    """파이프라인 단계 (script: py/ 기준 스크립트, inputs / outputs: 파일 또는 폴더 경로)"""
+
+    def __init__(self, name, script, inputs=(), outputs=(), after=(), args=()):
+        self.name = name
+        self.script = script
+        self.inputs = [os.path.abspath(p) for p in inputs]
+        self.outputs = [os.path.abspath(p) for p in outputs]
+        self.after = list(after)
+        self.args = list(args)
+
+    def __repr__(self):
+        return f"Stage({self.name}: {self.script})"
+
+
+def _vis(name):
+    return os.path.join(VISUAL_DIR, name)
+
+
+# 기존 수동 실행 순서: final_stop_set -> elbow_hub -> elbow_map -> create_passengers
+#                      -> fast_ver_opt / ideal_ver_opt -> e-drt_inicoi5 -> social
+# e-drt_inicoi5.py 는 로컬 절대 경로의 SMP 파일을 읽으므로 같은 계산을 하는 v2g_economics.py 로 대신합니다.
+STAGES = [
+    Stage("stop_set", "final_stop_set.py", [BUS_EXCEL, GRID_DIR],
+          [STOPS_CSV, _vis("cheonan_all_stops_over_100.csv"), _vis("cheonan_all_stops_over_100_map.html")]),
+    Stage("heatmap", "cheonan_heatmap.py", [BUS_EXCEL, GRID_DIR], [_vis("cheonan_heatmap.html")]),
+    Stage("elbow", "elbow_hub.py", [STOPS_CSV], [_vis("elbow_kmeans.png")]),
+    Stage("hub_map", "elbow_map.py", [STOPS_CSV],
+          [_vis("final_analysis_results.csv"), _vis("final_hubs_list.csv"),
+           _vis("cheonan_final_capture_map.html")], after=["elbow"]),
+    Stage("passengers", "create_passengers.py", [HUB_CSV], [PASSENGER_CSV], after=["hub_map"]),
+    Stage("fast_opt", "fast_ver_opt.py", [HUB_CSV, PASSENGER_CSV],
+          [_vis("cheonan_smart_choice_map.html"), _vis("천안시_최종_결과보고서.xlsx")]),
+    Stage("ideal_opt", "ideal_ver_opt.py", [HUB_CSV, PASSENGER_CSV], [_vis("천안시_통합_최적화_결과보고서.xlsx")]),
+    Stage("v2g", "v2g_economics.py", [SMP_DIR], [_vis("v2g_annual_base.csv"), _vis("v2g_annual_proposal.csv")]),
+    Stage("scenario", "scenario_mc.py", [SMP_DIR], [_vis("scenario_percentiles.csv")]),
+    Stage("social", "social.py"),   # 경제성 결과는 social.py 안의 고정 수치로 사용 (v2g 출력은 읽지 않음)
+]
+
+
+# =========================================================
+# 1. 내용 해시
+# =========================================================
+class _Hasher:
+    """파일 SHA-256 (크기 + 수정 시각이 같으면 지난 해시 재사용), 폴더는 하위 파일 해시를 묶어서"""
+
+    def __init__(self, memo=None):
+        self.memo = memo or {}
+        self._lock = threading.Lock()
+
+    def file(self, path):
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            cached = self.memo.get(path)
+        if cached and cached[:2] == stamp:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self.memo[path] = stamp + [digest]
+        return digest
+
+    def path(self, path):
+        if os.path.isdir(path):
+            h = hashlib.sha256()
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    h.update(os.path.relpath(full, path).encode("utf-8"))
+                    h.update(self.file(full).encode())
+            return h.hexdigest()
+        if os.path.exists(path):
+            return self.file(path)
+        return "missing"
+
+
+def local_modules(script, base_dir=BASE_DIR, seen=None):
+    """스크립트가 (재귀적으로) import 하는 py/ 안의 모듈 파일 목록"""
+    seen = set() if seen is None else seen
+    path = os.path.join(base_dir, script)
+    if path in seen or not os.path.exists(path):
+        return seen
+    seen.add(path)
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_modules(name.split(".")[0] + ".py", base_dir, seen)
+    return seen
+
+
+def stage_key(stage, hasher, base_dir=BASE_DIR, upstream_keys=()):
+    """
+    단계 캐시 키: 코드(스크립트 + 로컬 모듈) + 인자 + 입력 내용 + 선행 단계 키
+
+    upstream_keys : 선행 단계 키 목록 (after 로만 이어진 단계도 앞 단계가 바뀌면 다시 실행되도록)
+    """
+    h = hashlib.sha256()
+    for path in sorted(local_modules(stage.script, base_dir)):
+        h.update(os.path.basename(path).encode("utf-8"))
+        h.update(hasher.file(path).encode())
+    h.update(json.dumps(stage.args).encode("utf-8"))
+    for path in stage.inputs:
+        h.update(path.encode("utf-8"))
+        h.update(hasher.path(path).encode())
+    for key in sorted(upstream_keys):
+        h.update(key.encode())
+    return h.hexdigest()
+
+
+# =========================================================
+# 2. 의존 그래프
+# =========================================================
+def build_graph(stages):
+    """단계 이름 -> 선행 단계 이름 집합 (입력 = 다른 단계 출력 이면 연결, 순환이면 ValueError)"""
+    producer = {}
+    for s in stages:
+        for out in s.outputs:
+            producer[out] = s.name
+    names = {s.name for s in stages}
+    deps = {}
+    for s in stages:
+        d = {producer[p] for p in s.inputs if p in producer and producer[p] != s.name}
+        d |= {a for a in s.after if a in names}
+        deps[s.name] = d
+
+    # 위상 정렬로 순환 확인
+    indeg = {n: len(d) for n, d in deps.items()}
+    ready = [n for n, v in indeg.items() if v == 0]
+    visited = 0
+    while ready:
+        n = ready.pop()
+        visited += 1
+        for m, d in deps.items():
+            if n in d:
+                indeg[m] -= 1
+                if indeg[m] == 0:
+                    ready.append(m)
+    if visited != len(deps):
+        raise ValueError(f"파이프라인 의존 관계에 순환이 있습니다: {[n for n, v in indeg.items() if v > 0]}")
+    return deps
+
+
+def upstream(targets, deps):
+    """targets 와 그 선행 단계 전부"""
+    todo, keep = list(targets), set()
+    while todo:
+        n = todo.pop()
+        if n not in keep:
+            keep.add(n)
+            todo.extend(deps[n])
+    return keep
+
+
+def critical_path(timing, deps):
+    """소요 시간 기준 가장 긴 의존 경로 (단계 이름 목록, 합계 초)"""
+    best = {}
+
+    def finish(n):
+        if n not in best:
+            prev = max(((finish(d)[0], d) for d in deps[n]), default=(0.0, None))
+            best[n] = (prev[0] + timing.get(n, 0.0), prev[1])
+        return best[n]
+
+    end = max(timing, key=lambda n: finish(n)[0])
+    path, n = [], end
+    while n is not None:
+        path.append(n)
+        n = best[n][1]
+    return path[::-1], best[end][0]
+
+
+# =========================================================
+# 3. 실행
+# =========================================================
+def _load_manifest(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"stages": {}, "files": {}}
+
+
+def _save_manifest(manifest, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _run_stage(stage, log_dir, base_dir, t0):
+    """
+    스크립트를 별도 프로세스로 실행 (표준 출력은 로그 파일로), 반환: (종료 코드, 시작 시각, 소요 시간)
+
+    시작 시각은 실제로 실행을 시작한 때의 t0 기준 초 (작업자가 모자라 대기한 시간은 포함하지 않음)
+    """
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONIOENCODING="utf-8")   # plt.show() 로 멈추지 않도록
+    log_path = os.path.join(log_dir, f"{stage.name}.log")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run([sys.executable, stage.script] + stage.args, cwd=base_dir, env=env,
+                              stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, start - t0, time.perf_counter() - start
+
+
+def run_pipeline(stages=STAGES, targets=None, force=False, workers=None, dry_run=False,
+                 manifest_path=MANIFEST_PATH, base_dir=BASE_DIR):
+    """
+    의존 순서대로 단계 실행 -> 단계별 결과 DataFrame (status: ran / cached / failed / blocked)
+
+    targets : 실행할 단계 이름 목록 (선행 단계 포함, None 이면 전체)
+    force   : 캐시 무시
+    workers : 동시에 실행할 단계 수 (None 이면 CPU 수)
+    """
+    import pandas as pd
+
+    by_name = {s.name: s for s in stages}
+    deps = build_graph(stages)
+    unknown = set(targets or []) - set(by_name)
+    if unknown:
+        raise KeyError(f"알 수 없는 단계: {sorted(unknown)}")
+    selected = upstream(targets, deps) if targets else set(by_name)
+    order = [s.name for s in stages if s.name in selected]
+
+    manifest = _load_manifest(manifest_path)
+    hasher = _Hasher(manifest.get("files"))
+    log_dir = os.path.join(os.path.dirname(manifest_path), "logs")
+    os.makedirs(log_dir, exist_ok=True)
+
+    rows = {}
+    keys = {}
+    t0 = time.perf_counter()
+    pending = {n: set(deps[n]) & selected for n in order}
+    running = {}
+
+    def cached(name):
+        stage = by_name[name]
+        key = keys[name] = stage_key(stage, hasher, base_dir, [keys[d] for d in deps[name]])
+        # dry-run 에서는 앞 단계가 실제로 실행되지 않으므로, 다시 실행될 단계의 후속 단계도 stale
+        stale_dep = dry_run and any(rows[d]["status"] == "stale" for d in deps[name])
+        hit = (not force and not stale_dep and manifest["stages"].get(name, {}).get("key") == key
+               and all(os.path.exists(p) for p in stage.outputs))
+        return key, hit
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        while pending or running:
+            # 선행 단계가 모두 끝난 단계 시작 (실패한 선행이 있으면 blocked)
+            for name in [n for n in order if n in pending and not pending[n]]:
+                del pending[name]
+                failed = [d for d in deps[name] if rows.get(d, {}).get("status") in ("failed", "blocked")]
+                if failed:
+                    rows[name] = {"stage": name, "status": "blocked", "start": None, "end": None, "elapsed": 0.0}
+                    _finish(name, pending)
+                    continue
+                key, hit = cached(name)
+                now = time.perf_counter() - t0
+                if hit or dry_run:
+                    rows[name] = {"stage": name, "status": "cached" if hit else "stale",
+                                  "start": now, "end": now, "elapsed": 0.0}
+                    _finish(name, pending)
+                    continue
+                print(f"▶ {name} ({by_name[name].script})")
+                running[pool.submit(_run_stage, by_name[name], log_dir, base_dir, t0)] = (name, key)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, key = running.pop(fut)
+                code, start, elapsed = fut.result()
+                ok = code == 0
+                # 출력 해시는 실행 직후 다시 계산해야 하므로 키는 실행 전 입력 기준으로 저장
+                if ok:
+                    manifest["stages"][name] = {"key": key, "elapsed": elapsed, "finished": time.time()}
+                    _save_manifest(dict(manifest, files=hasher.memo), manifest_path)
+                rows[name] = {"stage": name, "status": "ran" if ok else "failed",
+                              "start": start, "end": start + elapsed, "elapsed": elapsed}
+                print(f"{'✅' if ok else '❌'} {name} {elapsed:.1f}초"
+                      + ("" if ok else f" (종료 코드 {code}, 로그: {os.path.join(log_dir, name + '.log')})"))
+                _finish(name, pending)
+
+    if not dry_run:
+        _save_manifest(dict(manifest, files=hasher.memo), manifest_path)
+
+    result = pd.DataFrame([rows[n] for n in order])
+    # 임계 경로: 이번 실행 시간 (캐시면 지난 실행 시간) 기준
+    est = {n: rows[n]["elapsed"] if rows[n]["status"] == "ran"
+           else manifest["stages"].get(n, {}).get("elapsed", 0.0) for n in order}
+    path, total = critical_path(est, {n: deps[n] & selected for n in order})
+    result["critical"] = result["stage"].isin(path)
+    result.attrs["critical_path"] = path
+    result.attrs["critical_seconds"] = total
+    result.attrs["wall_seconds"] = time.perf_counter() - t0
+    return result
+
+
+def _finish(name, pending):
+    for d in pending.values():
+        d.discard(name)
+
+
+def main(argv=None):
+    """명령행 인자로 파이프라인 실행"""
+    parser = argparse.ArgumentParser(description="천안 e-DRT / V2G 분석 파이프라인")
+    parser.add_argument("targets", nargs="*", help="실행할 단계 (선행 단계 포함, 생략 시 전체)")
+    parser.add_argument("--force", action="store_true", help="캐시 무시하고 다시 실행")
+    parser.add_argument("--workers", type=int, default=None, help="동시 실행 단계 수")
+    parser.add_argument("--dry-run", action="store_true", help="실행하지 않고 상태만 출력")
+    parser.add_argument("--list", action="store_true", help="단계와 의존 관계 출력")
+    opts = parser.parse_args(argv)
+
+    if opts.list:
+        graph = build_graph(STAGES)
+        for s in STAGES:
+            print(f"{s.name:<12} {s.script:<22} <- {', '.join(sorted(graph[s.name])) or '-'}")
+        return 0
+
+    result = run_pipeline(targets=opts.targets or None, force=opts.force, workers=opts.workers,
+                          dry_run=opts.dry_run)
+    print(result.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"⏱ 전체 {result.attrs['wall_seconds']:.1f}초, 임계 경로 {' -> '.join(result.attrs['critical_path'])} "
+          f"({result.attrs['critical_seconds']:.1f}초)")
+    if not opts.dry_run:
+        os.makedirs(VISUAL_DIR, exist_ok=True)
+        result.to_csv(_vis("pipeline_timing.csv"), index=False, encoding="utf-8-sig")
+    return 1 if result["status"].isin(["failed", "blocked"]).any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+import numpy as np
+import pandas as pd
+import time
+import os
+
+from dist_matrix import LAT_TO_M, LON_TO_M
+from heuristic_dispatch import HeuristicDispatcher, MAX_DIST, ALT_SPEED, ALT_EXTRA
+
+# =========================================================
+# 1. 경로 자동 설정
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/ 폴더
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+
+PASSENGER_COLUMNS = ['passenger_id', 'location_type', 'lat', 'lon', 'dest_id', 'request_time']
+
+WINDOW = 60          # 재최적화 대상: 현재 시각 + 60분 이내 요청
+REOPT_EVERY = 30     # 재최적화 주기 (분, create_passengers 의 배치 간격)
+REOPT_TIME = 0.2     # 재최적화 1회 시간 제한 (초)
+
+
+# =========================================================
+# 2. 살아 있는 노드만 담는 거리 / 아크 행렬
+# =========================================================
+class _SlotMatrix:
+    """
+    노드 번호로 인덱싱하는 정방 행렬 (실제 저장은 슬롯 배열 data 에, 노드 -> 슬롯은 slot 배열)
+
+    하루 종일 돌아가는 배차기는 노드 번호가 계속 늘어나므로, 운행을 마쳤거나 거절된 승객의 슬롯은
+    비우고 새 승객이 다시 씁니다. 행렬 크기는 누적 요청 수가 아니라 동시에 살아 있는 노드 수를 따라갑니다.
+    """
+
+    def __init__(self, data, slot):
+        self.data = data
+        self.slot = slot
+
+    def __getitem__(self, key):
+        i, j = key
+        return self.data[self.slot[i], self.slot[j]]
+
+    def __setitem__(self, key, value):
+        i, j = key
+        self.data[self.slot[i], self.slot[j]] = value
+
+
+# =========================================================
+# 3. 실시간(이벤트 기반) 배차기
+# =========================================================
+class RealtimeDispatcher(HeuristicDispatcher):
+    """
+    요청이 들어올 때마다 현재 차량 계획에 바로 삽입하고(submit),
+    시각이 흐르면(advance) 이미 출발한 구간을 확정한 뒤 남은 구간만 주기적으로 재최적화합니다.
+    운행을 마친 앞부분(차량이 빈 채로 지나간 지점까지)은 계획에서 떼어내고 그 승객 노드의 슬롯을 비웁니다.
+
+    노드 번호 / 아크 규칙 / 시간창은 CheonanSmartCity_Master_Final 과 동일합니다.
+    (허브·정류장이 앞, 승객이 뒤에 붙는 순서 / 허브·목적지 외 아크는 max_dist 이내 / 요청 후 60분 이내 탑승)
+    """
+
+    def __init__(self, node_file, num_vehicles=12, max_dist=MAX_DIST, window=WINDOW,
+                 reopt_every=REOPT_EVERY, reopt_time=REOPT_TIME, capacity=256):
+        super().__init__(node_file, pd.DataFrame(columns=PASSENGER_COLUMNS), num_vehicles,
+                         max_dist=max_dist, time_limit=reopt_time)
+        self.max_dist = max_dist
+        self.window = window
+        self.reopt_every = reopt_every
+        self.last_reopt = None
+        self.retry_unserved = False  # 거절한 요청은 다시 배차하지 않음
+
+        self.users = []
+        self.lat = self.nodes.lat.copy()
+        self.lon = self.nodes.lon.copy()
+        self.passenger_ids = {}
+        self.decisions = []
+        self.latencies = []
+        self.reopt_latencies = []
+
+        # 허브 / 정류장은 슬롯 = 노드 번호로 고정, 승객은 빈 슬롯을 받아 씀
+        n = self.N
+        self._slot = np.full(n + capacity, -1, dtype=np.int64)
+        self._slot[:n] = np.arange(n)
+        self._free = []
+        self.dist = _SlotMatrix(self.dist, self._slot)
+        self.allowed = _SlotMatrix(self.allowed, self._slot)
+        self._grow_slots(n + capacity)
+        self._grow(n + capacity)
+
+    # ---------------------------------------------------------
+    # 노드 추가 / 회수 (행렬을 다시 만들지 않고 한 슬롯씩 채움)
+    # ---------------------------------------------------------
+    def _grow(self, cap):
+        """노드별 1차원 배열을 cap 크기로 확장 (앞의 N 개 값 유지)"""
+        n = self.N
+
+        def extend(arr, fill):
+            out = np.full((cap,) + arr.shape[1:], fill, dtype=arr.dtype)
+            out[:n] = arr[:n]
+            return out
+
+        self.lat, self.lon = extend(self.lat, 0.0), extend(self.lon, 0.0)
+        self.req, self.alt = extend(self.req, 0.0), extend(self.alt, 0.0)
+        self.dest = extend(self.dest, -1)
+        self.is_user = extend(self.is_user, False)
+        self.hub_rank = extend(self.hub_rank, 0)
+        self._slot = extend(self._slot, -1)
+        self.dist.slot = self.allowed.slot = self._slot
+
+    def _grow_slots(self, cap):
+        """거리 / 아크 행렬을 cap 슬롯으로 확장 (빈 슬롯은 작은 번호부터 사용)"""
+        old = len(self.dist.data)
+        dist = np.zeros((cap, cap))
+        dist[:old, :old] = self.dist.data
+        allowed = np.zeros((cap, cap), dtype=bool)
+        allowed[:old, :old] = self.allowed.data
+        self.dist.data, self.allowed.data = dist, allowed
+        self._free.extend(range(cap - 1, old - 1, -1))
+
+    def _add_passenger(self, lat, lon, dest_id, request_time):
+        k = self.N
+        if k >= len(self.req):
+            self._grow(2 * len(self.req))
+        if not self._free:
+            self._grow_slots(2 * len(self.dist.data))
+        s = self._slot[k] = self._free.pop()
+
+        # 살아 있는 노드와의 거리만 계산
+        live = np.flatnonzero(self._slot[:k] >= 0)
+        ls = self._slot[live]
+        self.lat[k], self.lon[k] = lat, lon
+        row = np.sqrt(((self.lat[live] - lat) * LAT_TO_M) ** 2 + ((self.lon[live] - lon) * LON_TO_M) ** 2)
+        dist, allowed = self.dist.data, self.allowed.data
+        dist[s, ls] = row
+        dist[ls, s] = row
+        dist[s, s] = 0.0
+        self.N = k + 1
+
+        self.is_user[k] = True
+        self.req[k] = request_time
+        self.dest[k] = dest_id
+        self.alt[k] = self.dist[k, dest_id] / ALT_SPEED + ALT_EXTRA
+
+        near = row <= self.max_dist
+        allowed[s, :] = False
+        allowed[:, s] = False
+        allowed[s, ls] = near
+        allowed[ls, s] = near
+        self.allowed[k, self.hubs] = True
+        self.allowed[self.hubs, k] = True
+        self.allowed[k, dest_id] = True
+        self.hub_rank[k] = self.hubs[np.argsort(self.dist[k, self.hubs])]
+        self.users.append(k)
+        return k
+
+    def _release(self, u):
+        """승객 노드 u 의 슬롯 반납 (노드 번호와 1차원 속성은 결과 / 로그용으로 남김)"""
+        self._free.append(int(self._slot[u]))
+        self._slot[u] = -1
+
+    def _retire(self, v):
+        """
+        확정 구간 중 차량이 빈 채로 떠난 마지막 지점까지를 계획에서 떼어냄
+        (그 지점이 새 출발점이 되고, 주행 거리 / 도착 시각은 origin / driven 으로 이어받음)
+        """
+        inner, lock = self.routes[v], self.locked[v]
+        onboard, cut = {}, 0
+        for k in range(lock):
+            node = inner[k]
+            if self.is_user[node]:
+                onboard[self.dest[node]] = onboard.get(self.dest[node], 0) + 1
+            else:
+                onboard.pop(node, None)
+                if not onboard:
+                    cut = k + 1
+        if cut == 0:
+            return
+        done = [self.origin[v]] + inner[:cut]
+        self.driven[v] += float(self.dist[done[:-1], done[1:]].sum())
+        self.history[v].extend(done[:-1])
+        self.origin[v] = done[-1]
+        self.origin_time[v] = self.fixed_times[v][cut - 1]
+        self.routes[v] = inner[cut:]
+        self.fixed_times[v] = self.fixed_times[v][cut:]
+        self.locked[v] = lock - cut
+        for node in done[1:]:
+            if self.is_user[node]:
+                self.done_psg[v] += 1
+                self._release(node)
+
+    # ---------------------------------------------------------
+    # 이벤트 API
+    # ---------------------------------------------------------
+    def submit(self, lat, lon, dest_id, request_time=None, passenger_id=None):
+        """
+        새 요청 1건을 현재 계획에 최소 비용 삽입 (모델 재구성 없음)
+
+        반환: {passenger_id, node, accepted, vehicle, pickup_eta, latency_ms}
+        """
+        start = time.perf_counter()
+        request_time = self.clock if request_time is None else float(request_time)
+        u = self._add_passenger(float(lat), float(lon), int(dest_id), request_time)
+        self.passenger_ids[u] = passenger_id if passenger_id is not None else f"RT_{len(self.users):04d}"
+
+        accepted = self._insert_request(u)
+        vehicle, eta = None, None
+        if not accepted and not self.retry_unserved:
+            self._release(u)  # 거절한 요청은 다시 쓰지 않으므로 슬롯 바로 반납
+        if accepted:
+            vehicle = next(v for v in range(self.V) if u in self.routes[v])
+            times = []
+            self._evaluate(vehicle, self.routes[vehicle], times)
+            eta = times[self.routes[vehicle].index(u) + 1]
+        latency = (time.perf_counter() - start) * 1000
+        self.latencies.append(latency)
+
+        decision = {"passenger_id": self.passenger_ids[u], "node": u, "accepted": accepted,
+                    "vehicle": vehicle, "pickup_eta": eta, "latency_ms": latency}
+        self.decisions.append(decision)
+        return decision
+
+    def advance(self, now):
+        """
+        시각을 now(분)로 진행
+        - 출발 시각이 now 이전인 구간(이미 지나간 노드 + 지금 향하고 있는 노드)을 확정
+        - reopt_every 분마다 남은 구간을 재최적화
+        """
+        now = float(now)
+        if now < self.clock:
+            raise ValueError(f"시각은 되돌릴 수 없습니다: {now} < {self.clock}")
+
+        for v in range(self.V):
+            inner = self.routes[v]
+            lock = self.locked[v]
+            if lock >= len(inner):
+                continue
+            times = []
+            self._evaluate(v, inner, times)
+            # times[k] = nodes[k] 도착(=출발) 시각, inner[k] 는 nodes[k + 1]
+            while lock < len(inner) and max(times[lock], self.clock) <= now:
+                lock += 1
+            self.fixed_times[v] = times[1:lock + 1]
+            self.locked[v] = lock
+            self._retire(v)
+        self.clock = now
+
+        if self.last_reopt is None or now - self.last_reopt >= self.reopt_every:
+            self.reoptimize()
+            self.last_reopt = now
+
+    def reoptimize(self, time_limit=None):
+        """확정되지 않은 구간만 지역 탐색 (슬라이딩 윈도우 안의 요청만 차량 간 이동)"""
+        start = time.perf_counter()
+        self._local_search(start + (self.time_limit if time_limit is None else time_limit))
+        self.reopt_latencies.append((time.perf_counter() - start) * 1000)
+
+    def _movable(self):
+        limit = self.clock + self.window
+        return {u: v for u, v in super()._movable().items() if self.req[u] <= limit}
+
+    def _passenger_id(self, u):
+        return self.passenger_ids[u]
+
+    # ---------------------------------------------------------
+    # 지표 / 재생
+    # ---------------------------------------------------------
+    def metrics(self):
+        """결정 지연(ms) p50/p99 및 수락률"""
+        lat = np.asarray(self.latencies)
+        reopt = np.asarray(self.reopt_latencies)
+        accepted = sum(d["accepted"] for d in self.decisions)
+        return {
+            "requests": len(self.decisions),
+            "accepted": accepted,
+            "accept_rate": accepted / len(self.decisions) if self.decisions else 0.0,
+            "p50_ms": float(np.percentile(lat, 50)) if len(lat) else 0.0,
+            "p99_ms": float(np.percentile(lat, 99)) if len(lat) else 0.0,
+            "max_ms": float(lat.max()) if len(lat) else 0.0,
+            "reopt_p50_ms": float(np.percentile(reopt, 50)) if len(reopt) else 0.0,
+            "reopt_p99_ms": float(np.percentile(reopt, 99)) if len(reopt) else 0.0,
+            "objective": float(sum(self.values)),
+        }
+
+    def replay(self, passenger_file):
+        """passenger_data.csv 의 요청을 요청 시각(배치) 순서대로 흘려 보내는 시뮬레이션"""
+        df = passenger_file if isinstance(passenger_file, pd.DataFrame) else pd.read_csv(passenger_file)
+        df = df.sort_values('request_time', kind='stable')
+
+        print("--- [Realtime] 요청 스트림 재생 ---")
+        for t, batch in df.groupby('request_time', sort=True):
+            self.advance(t)
+            for row in batch.itertuples(index=False):
+                self.submit(row.lat, row.lon, row.dest_id, row.request_time, row.passenger_id)
+            n_ok = sum(d["accepted"] for d in self.decisions[-len(batch):])
+            print(f" - t={t:>4}분: 요청 {len(batch)}건 중 {n_ok}건 배차")
+
+        m = self.metrics()
+        print(f" - 수락 {m['accepted']}/{m['requests']}건, 결정 지연 p50 {m['p50_ms']:.2f}ms / "
+              f"p99 {m['p99_ms']:.2f}ms, 목적함수 {m['objective']:,.0f}")
+        return m
+
+
+def main():
+    """승객 요청을 시간순으로 재생하며 실시간 배차"""
+    hub_file = os.path.join(DATA_DIR, "hub_and_stop_locations.csv")
+    psg_file = os.path.join(DATA_DIR, "passenger_data.csv")
+
+    dispatcher = RealtimeDispatcher(hub_file)
+    dispatcher.replay(psg_file)
+    print(pd.DataFrame(dispatcher.result()["logs"]).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
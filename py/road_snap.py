@@ -0,0 +1,102 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from osrm_cache import OSRMCache, CACHE_PATH, OSRM_BASE_URL
+
+# =========================================================
+# 도로 스냅(Snap) 일괄 처리 (create_passengers 용)
+# =========================================================
+# 1) 온라인 일괄 모드: 커넥션 풀 세션 + 제한된 동시성(스레드 풀) + 초당 요청 수 제한
+#    (응답은 osrm_cache 의 SQLite 캐시를 그대로 공유)
+# 2) 오프라인 모드: 로컬 도로망(선형 레이어)을 공간 색인(STRtree)으로 불러와
+#    가장 가까운 도로 선분 위 지점으로 투영 -> 대량 수요 생성 시 네트워크 불필요
+
+SNAP_WORKERS = 8          # 동시 요청 수
+SNAP_RATE = 20.0          # 초당 최대 네트워크 요청 수 (캐시 적중은 제한 없음)
+METRIC_CRS = "EPSG:5179"
+
+
+def make_pooled_session(workers=SNAP_WORKERS):
+    """동시 요청 수만큼 커넥션을 재사용하는 requests 세션"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def snap_batch_osrm(lats, lons, workers=SNAP_WORKERS, rate=SNAP_RATE, base_url=OSRM_BASE_URL,
+                    cache_path=CACHE_PATH, verbose=True):
+    """OSRM nearest 를 스레드 풀로 병렬 호출 (실패한 점은 원래 좌표 유지)"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    cache = OSRMCache(path=cache_path, base_url=base_url, min_interval=1.0 / rate,
+                      session=make_pooled_session(workers))
+
+    def _one(k):
+        snapped = cache.nearest(lats[k], lons[k])
+        return snapped if snapped is not None else (lats[k], lons[k])
+
+    out = np.empty((len(lats), 2), dtype=np.float64)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for k, snapped in enumerate(pool.map(_one, range(len(lats)))):
+            out[k] = snapped
+            if verbose and (k + 1) % 100 == 0:
+                print(f"📦 [{k + 1}/{len(lats)}] 좌표 보정 완료...")
+    if verbose:
+        print(f" - 캐시 적중 {cache.hits}건 / 미적중 {cache.misses}건")
+    cache.close()
+    return out[:, 0], out[:, 1]
+
+
+class OfflineRoadSnapper:
+    """로컬 도로망 선형(LineString) 레이어에 좌표를 투영하는 오프라인 스냅퍼"""
+
+    def __init__(self, road_path, layer=None):
+        import geopandas as gpd
+
+        if str(road_path).endswith(".parquet"):
+            roads = gpd.read_parquet(road_path)
+        else:
+            roads = gpd.read_file(road_path, layer=layer)
+        roads = roads[roads.geometry.notna()].to_crs(METRIC_CRS)
+        # 멀티라인은 개별 선분으로 분해해야 투영 지점을 정확히 구할 수 있습니다.
+        self.roads = roads.explode(index_parts=False).reset_index(drop=True)
+        self.lines = self.roads.geometry.values
+        self.sindex = self.roads.sindex
+
+    def snap(self, lats, lons):
+        """(lat, lon) 배열을 가장 가까운 도로 위 좌표로 일괄 보정"""
+        import geopandas as gpd
+        import shapely
+
+        pts = gpd.GeoSeries(gpd.points_from_xy(lons, lats), crs="EPSG:4326").to_crs(METRIC_CRS).values
+        # 각 점마다 가장 가까운 도로 하나 (동거리일 때는 첫 번째)
+        pt_idx, line_idx = self.sindex.nearest(pts, return_all=False)
+        order = np.argsort(pt_idx)
+        lines = self.lines[line_idx[order]]
+        on_road = shapely.line_interpolate_point(lines, shapely.line_locate_point(lines, pts))
+        snapped = gpd.GeoSeries(on_road, crs=METRIC_CRS).to_crs("EPSG:4326")
+        return snapped.y.values, snapped.x.values
+
+
+def snap_points(lats, lons, mode="batch", road_path=None, workers=SNAP_WORKERS, rate=SNAP_RATE):
+    """
+    좌표 배열 일괄 도로 보정
+
+    mode : "batch"   -> OSRM 병렬 요청 (캐시 공유)
+           "offline" -> road_path 의 로컬 도로망으로 투영
+           "none"    -> 보정하지 않음
+    """
+    if mode == "batch":
+        return snap_batch_osrm(lats, lons, workers=workers, rate=rate)
+    if mode == "offline":
+        if road_path is None:
+            raise ValueError("offline 모드에는 도로망 파일 경로(road_path)가 필요합니다.")
+        return OfflineRoadSnapper(road_path).snap(lats, lons)
+    if mode == "none":
+        return np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+    raise ValueError(f"지원하지 않는 스냅 모드입니다: {mode}")
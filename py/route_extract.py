@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# MIP 해 -> 차량별 운행 경로 (fast_ver_opt 결과 출력 공용)
+# =========================================================
+# 해 벡터를 getSolution() 한 번으로 모두 받아 오고, 차량별로 "다음 노드" 배열(successor)을
+# 만들어 경로를 따라갑니다. 아크 목록 전체를 매 단계마다 훑지 않으므로 아크 수에 선형입니다.
+
+
+class VehicleRoute:
+    """차량 1대의 운행 결과 (노드 순서 / 도착 시각 / 도착 후 탑승 인원 / 탑승 승객)"""
+
+    def __init__(self, vehicle, nodes, arrival, load, passengers):
+        self.vehicle = vehicle
+        self.nodes = nodes
+        self.arrival = arrival
+        self.load = load
+        self.passengers = passengers
+
+    @property
+    def name(self):
+        return f"e-DRT_{self.vehicle + 1:02d}"
+
+    @property
+    def arcs(self):
+        return list(zip(self.nodes[:-1], self.nodes[1:]))
+
+    def segment(self, u, dest):
+        """승객 u 의 탑승 ~ 하차 구간 노드 (경로에 목적지가 없으면 None)"""
+        if u not in self.nodes or dest not in self.nodes:
+            return None
+        return self.nodes[self.nodes.index(u): self.nodes.index(dest) + 1]
+
+    def __repr__(self):
+        return f"VehicleRoute({self.name}, nodes={self.nodes}, passengers={self.passengers})"
+
+
+def _column_index(variables):
+    """xpress 변수 배열 -> 같은 모양의 열 번호 배열"""
+    return np.frompyfunc(lambda var: var.index, 1, 1)(np.asarray(variables, dtype=object)).astype(np.int64)
+
+
+def extract_routes(model, threshold=0.5):
+    """
+    풀이가 끝난 CheonanSmartCity_Master_Final 에서 운행한 차량의 VehicleRoute 목록을 추출
+
+    도착 시각은 모델의 t 변수, 탑승 인원은 승객 탑승(+1) / 목적지 하차(-n) 로 계산합니다.
+    """
+    sol = np.asarray(model.prob.getSolution())
+    x_val = sol[_column_index(model.X)] > threshold            # (아크, 차량)
+    t_val = sol[_column_index(model.t)]                         # (노드, 차량)
+    z_val = sol[_column_index([model.z[u] for u in model.users])] > threshold
+    served = set(np.asarray(model.users)[z_val].tolist())
+
+    is_hub = model.nodes.is_hub
+    user_dest = model.user_dest
+
+    routes = []
+    for v in np.flatnonzero(x_val.any(axis=0)):
+        active = np.flatnonzero(x_val[:, v])
+        src, dst = model.arc_src[active], model.arc_dst[active]
+        succ = np.full(model.N, -1, dtype=np.int64)
+        succ[src] = dst
+
+        starts = src[is_hub[src]]
+        if len(starts) == 0:
+            continue
+        nodes = [int(starts[0])]
+        visited = {nodes[0]}
+        while True:
+            nxt = int(succ[nodes[-1]])
+            if nxt == -1 or nxt in visited:
+                break
+            nodes.append(nxt)
+            visited.add(nxt)
+            if is_hub[nxt]:
+                break
+
+        passengers = [n for n in nodes if n in served]
+        load, onboard, loads = 0, {}, []
+        for n in nodes:
+            if n in served:
+                load += 1
+                onboard[user_dest[n]] = onboard.get(user_dest[n], 0) + 1
+            load -= onboard.pop(n, 0)
+            loads.append(load)
+        routes.append(VehicleRoute(int(v), nodes, t_val[nodes, v].tolist(), loads, passengers))
+    return routes
+
+
+def passenger_logs(routes, nodes, user_dest):
+    """승객별 경로 검증 로그 (결과 보고서 '승객별_경로_검증' 시트 형식, nodes: NodeStore 또는 DataFrame)"""
+    passenger_id = np.asarray(nodes['passenger_id'])
+    logs = []
+    for r in routes:
+        for u in r.passengers:
+            chain = r.segment(u, user_dest[u])
+            if chain is None:
+                continue
+            logs.append({
+                '승객ID': passenger_id[u],
+                '이동경로(노드순서)': " -> ".join(map(str, chain)),
+                '배차차량': r.name
+            })
+    return logs
+
+
+def routes_to_frame(routes, nodes=None):
+    """분석용 정류 단위 표 (차량, 순번, 노드, 도착 시각, 탑승 인원[, 위경도], nodes: NodeStore 또는 DataFrame)"""
+    rows = [{'차량': r.name, '순번': k, '노드': n, '도착시각(분)': r.arrival[k], '탑승인원': r.load[k]}
+            for r in routes for k, n in enumerate(r.nodes)]
+    frame = pd.DataFrame(rows, columns=['차량', '순번', '노드', '도착시각(분)', '탑승인원'])
+    if nodes is not None and len(frame):
+        frame['lat'] = np.asarray(nodes['lat'])[frame['노드'].to_numpy()]
+        frame['lon'] = np.asarray(nodes['lon'])[frame['노드'].to_numpy()]
+    return frame
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+import os
+import time
+
+from v2g_economics import (V2G_AMOUNT, EFFICIENCY, C_DEG, C_DEG_FUTURE, V2G_INCENTIVE, NUM_VEHICLES,
+                           SMP_DIR, daily_schedule, load_smp)
+from gridstable import POWER_PER_HOUSEHOLD, NUM_VEHICLES_EXPANDED
+# DAILY_PROFIT: SMP 자료가 없을 때 쓰는 1일 순수익 (현행, 열화 60원)
+from social import ANNUAL_DAYS, CO2_BUS_FACTOR, CO2_EDRT_FACTOR, PINE_TREE_ABSORPTION, DAILY_PROFIT
+
+# =========================================================
+# V2G 수익 / 계통 기여 / 탄소 저감 몬테카를로 시나리오 엔진
+# =========================================================
+# e-drt_inicoi5.py, gridstable.py, social.py 는 상수 하나씩으로 점 추정만 했습니다.
+# 여기서는 파라미터 조합 수백만 개를 청크 단위 NumPy 배열로 한 번에 뽑아
+# 연간 순수익 / 피크 쉐이빙 kW / 수혜 가구 수 / CO2 저감량을 함께 계산하고,
+# 결과는 저장하지 않고 스트리밍 히스토그램에 누적해 분위수 표를 만듭니다. (메모리 = 청크 크기)
+#
+# SMP 경로: 과거 SMP 의 365일 구간(path) 하나를 시나리오마다 고르고 가격 배율을 곱합니다.
+# 방전 1 kWh 일 마진 m = 최고가 - 최저가 / 효율 을 경로별로 정렬해 두면
+#   Σ_day max(0, E·(s·m + 인센티브 - 열화)) 를 searchsorted 한 번으로 정확히 구할 수 있습니다.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+
+
+CHUNK_SIZE = 250_000            # 한 번에 평가할 시나리오 수
+HIST_BINS = 4096                # 분위수 히스토그램 구간 수
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# 파라미터 분포: (하한, 상한) 균등 분포, 숫자 하나면 고정값
+PARAM_RANGES = {
+    "incentive": (0.0, 2 * V2G_INCENTIVE),          # 방전 인센티브 (원/kWh)
+    "c_deg": (C_DEG_FUTURE, C_DEG),                  # 배터리 열화 비용 (원/kWh)
+    "smp_scale": (0.8, 1.2),                         # SMP 수준 배율
+    "fleet": (NUM_VEHICLES, NUM_VEHICLES_EXPANDED),                     # 차량 대수 (정수, gridstable 확대 시나리오 50대)
+    "power_kw": (7.0, 11.0),                         # 대당 방전 출력 (gridstable 10kW)
+    "daily_km": (150.0, 250.0),                      # 1일 주행거리 (social.py 150~250km)
+}
+METRICS = ("annual_profit", "peak_kw", "households", "co2_ton", "pine_trees")
+
+
+# =========================================================
+# 1. SMP 경로 (경로별 정렬된 일 마진)
+# =========================================================
+def margin_paths(dates, prices, days=ANNUAL_DAYS, stride=7, efficiency=EFFICIENCY):
+    """
+    (일, 24) SMP -> 경로별 일 마진 (경로 수, days) (원/kWh, 최고가 - 최저가 / 효율)
+
+    과거 자료의 days 일 구간을 stride 일 간격으로 잘라 경로로 씁니다. (자료가 짧으면 전체 1개)
+    """
+    sched = daily_schedule(prices, optimize=False, efficiency=efficiency)
+    margin = sched["smp_high"] - sched["smp_low"] / efficiency
+    margin = margin[np.isfinite(margin)]
+    if len(margin) <= days:
+        return margin[None, :]
+    starts = np.arange(0, len(margin) - days + 1, stride)
+    return margin[starts[:, None] + np.arange(days)]
+
+
+def default_paths():
+    """data/smp 가 있으면 과거 SMP 경로, 없으면 social.py 의 1일 순수익으로 만든 고정 경로"""
+    dates, prices = load_smp(SMP_DIR) if os.path.isdir(SMP_DIR) else (None, np.empty((0, 24)))
+    if len(prices):
+        return margin_paths(dates, prices)
+    # DAILY_PROFIT = E·(m - C_DEG) -> m
+    return np.full((1, ANNUAL_DAYS), DAILY_PROFIT / V2G_AMOUNT + C_DEG)
+
+
+class _PathIndex:
+    """경로별 오름차순 마진과 뒤쪽 누적합 (여러 경로를 1차원으로 이어 한 번에 searchsorted)"""
+
+    def __init__(self, paths):
+        paths = np.sort(np.asarray(paths, dtype=np.float64), axis=1)
+        self.n_paths, self.days = paths.shape
+        self.lo, self.hi = paths.min() - 1.0, paths.max() + 1.0
+        self.span = self.hi - self.lo + 1.0
+        self.flat = (paths + (np.arange(self.n_paths) * self.span)[:, None]).ravel()
+        suffix = np.zeros((self.n_paths, self.days + 1))
+        suffix[:, :-1] = np.cumsum(paths[:, ::-1], axis=1)[:, ::-1]
+        self.suffix = suffix.ravel()
+        self.total = suffix[:, 0]
+
+    def above(self, path, threshold):
+        """경로 path 에서 마진 > threshold 인 날 수와 그 마진 합"""
+        t = np.clip(threshold, self.lo, self.hi) + path * self.span
+        pos = np.searchsorted(self.flat, t, side="right") - path * self.days
+        return self.days - pos, self.suffix[path * (self.days + 1) + pos]
+
+
+# =========================================================
+# 2. 스트리밍 분위수 (범위가 넘치면 구간을 2배로 넓혀 합침)
+# =========================================================
+class StreamingQuantiles:
+    """고정 크기 히스토그램으로 분위수 근사 (오차 <= 범위 / bins), 평균 / 표준편차 / 최소 / 최대는 정확"""
+
+    def __init__(self, bins=HIST_BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.lo = self.width = None
+        self.n, self.sum, self.sumsq = 0, 0.0, 0.0
+        self.min, self.max = np.inf, -np.inf
+        self.negative = 0
+
+    def _grow(self, vmin, vmax):
+        while vmin < self.lo or vmax >= self.lo + self.width * self.bins:
+            # 아래로 넘치면 왼쪽, 위로 넘치면 오른쪽으로 범위를 2배 확장 (인접 구간 2개씩 합침)
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.zeros(self.bins, dtype=np.int64)
+            if vmin < self.lo:
+                self.counts[self.bins // 2:] = merged
+                self.lo -= self.width * self.bins
+            else:
+                self.counts[:self.bins // 2] = merged
+            self.width *= 2
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        vmin, vmax = values.min(), values.max()
+        if self.lo is None:
+            pad = max(vmax - vmin, abs(vmax), 1.0) * 0.05
+            self.lo, self.width = vmin - pad, (vmax - vmin + 2 * pad) / self.bins
+        self._grow(vmin, vmax)
+        idx = np.minimum(((values - self.lo) / self.width).astype(np.int64), self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins)
+        self.n += len(values)
+        self.sum += values.sum()
+        self.sumsq += (values ** 2).sum()
+        self.min, self.max = min(self.min, vmin), max(self.max, vmax)
+        self.negative += int((values < 0).sum())
+
+    def quantile(self, qs):
+        cdf = np.cumsum(self.counts) / self.n
+        edges = self.lo + self.width * np.arange(1, self.bins + 1)
+        out = np.interp(qs, np.r_[0.0, cdf], np.r_[self.lo, edges])
+        return np.clip(out, self.min, self.max)
+
+    def summary(self, quantiles=QUANTILES):
+        mean = self.sum / self.n
+        row = {"mean": mean, "std": float(np.sqrt(max(self.sumsq / self.n - mean ** 2, 0.0))),
+               "min": self.min, "max": self.max}
+        row.update({f"p{int(q * 100):02d}": v for q, v in zip(quantiles, self.quantile(quantiles))})
+        row["negative_prob"] = self.negative / self.n
+        return row
+
+
+# =========================================================
+# 3. 시나리오 표본 / 평가
+# =========================================================
+def sample_params(n, rng, ranges=PARAM_RANGES, n_paths=1):
+    """파라미터 표본 n 개 (dict of arrays)"""
+    out = {}
+    for name, spec in ranges.items():
+        if np.isscalar(spec):
+            out[name] = np.full(n, spec, dtype=np.float64)
+        elif name == "fleet":
+            out[name] = rng.integers(int(spec[0]), int(spec[1]) + 1, size=n).astype(np.float64)
+        else:
+            out[name] = rng.uniform(spec[0], spec[1], size=n)
+    out["path"] = rng.integers(0, n_paths, size=n)
+    return out
+
+
+def evaluate(params, index, energy=V2G_AMOUNT, optimize=True):
+    """
+    파라미터 배열 -> 지표 배열 (dict)
+
+    optimize=True 이면 손해 보는 날은 방전하지 않고(v2g_economics 최적 스케줄과 동일),
+    False 이면 매일 energy 만큼 방전(기존 e-drt_inicoi5.py 규칙)합니다.
+    """
+    s = params["smp_scale"]
+    x = params["incentive"] - params["c_deg"]          # 마진 외 1 kWh 당 순가치
+    path = params["path"]
+    if optimize:
+        # s·m + x > 0  <=>  m > -x / s
+        count, msum = index.above(path, -x / s)
+    else:
+        count, msum = np.full(len(s), index.days), index.total[path]
+    per_car = energy * (s * msum + x * count) * ANNUAL_DAYS / index.days
+
+    fleet = params["fleet"]
+    peak_kw = fleet * params["power_kw"]
+    co2_kg = (CO2_BUS_FACTOR - CO2_EDRT_FACTOR) * fleet * params["daily_km"] * ANNUAL_DAYS
+    return {
+        "annual_profit": per_car * fleet,
+        "peak_kw": peak_kw,
+        "households": peak_kw / POWER_PER_HOUSEHOLD,
+        "co2_ton": co2_kg / 1000,
+        "pine_trees": co2_kg / PINE_TREE_ABSORPTION,
+    }
+
+
+def run(n_scenarios=1_000_000, paths=None, ranges=PARAM_RANGES, chunk_size=CHUNK_SIZE, seed=42,
+        optimize=True, quantiles=QUANTILES):
+    """
+    시나리오 n_scenarios 개를 chunk_size 씩 평가 -> 지표별 분위수 표 (DataFrame)
+
+    paths : 경로별 일 마진 (margin_paths 결과, None 이면 default_paths)
+    """
+    index = _PathIndex(default_paths() if paths is None else paths)
+    stats = {m: StreamingQuantiles() for m in METRICS}
+    start = time.perf_counter()
+    for c, begin in enumerate(range(0, n_scenarios, chunk_size)):
+        n = min(chunk_size, n_scenarios - begin)
+        rng = np.random.default_rng([seed, c])   # 청크별 독립 난수 (재현 가능)
+        result = evaluate(sample_params(n, rng, ranges, index.n_paths), index, optimize=optimize)
+        for m in METRICS:
+            stats[m].update(result[m])
+    table = pd.DataFrame({m: stats[m].summary(quantiles) for m in METRICS}).T
+    table.index.name = "metric"
+    print(f" - 시나리오 {n_scenarios:,}개 (SMP 경로 {index.n_paths}개) 평가 {time.perf_counter() - start:.2f}초")
+    return table
+
+
+def main():
+    """시나리오 100만 개 분위수 표 저장"""
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+    table = run(1_000_000)
+    pd.set_option("display.float_format", lambda v: f"{v:,.1f}")
+    print(table.to_string())
+    out_path = os.path.join(VISUAL_DIR, "scenario_percentiles.csv")
+    table.to_csv(out_path, encoding="utf-8-sig")
+    print(f"✅ 몬테카를로 분위수 표 저장: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
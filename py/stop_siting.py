@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+import re
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from blind_spot import SERVICE_DIST, covered_mask, points_xy
+from lattice_cluster import lattice_dbscan, cluster_summary
+
+# =========================================================
+# 1. 경로 / 기본값
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+GRID_DIR = os.path.join(DATA_DIR, "grid_data")
+SITING_DIR = os.path.join(PROJECT_ROOT, "visualization", "siting")
+
+INSTALL_THRESHOLD = 100   # 클러스터 인구 100명 이상
+MEM_LIMIT_MB = 4096       # 지역 1곳 처리 시 워커 메모리 상한 (POSIX 만 적용)
+CANDIDATE_FILE = "stops_over_100.csv"
+DONE_FILE = "done.json"
+CANDIDATE_COLUMNS = ["lat", "lon", "total_pop", "grid_count", "node_id"]
+
+
+# =========================================================
+# 2. 사각지대 격자 -> 후보 정류장 (final_stop_set.py 와 같은 규칙)
+# =========================================================
+def select_candidates(shadow_grids, radius=SERVICE_DIST, threshold=INSTALL_THRESHOLD):
+    """
+    DBSCAN(eps=radius, min_samples=1) 으로 사각지대 격자를 묶고,
+    인구 합이 threshold 이상인 클러스터마다 인구 최다 격자를 후보지로 선정
+
+    클러스터링은 100m 격자 연결 요소(lattice_dbscan), 클러스터별 합계 / 최다 격자는
+    cluster_summary 로 한 번에 구합니다. (sklearn DBSCAN + 클러스터별 필터 반복과 같은 결과)
+    """
+    if len(shadow_grids) == 0:
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+
+    pop = shadow_grids['val'].to_numpy(dtype=np.float64)
+    clusters = lattice_dbscan(points_xy(shadow_grids), radius, min_samples=1, sample_weight=pop)
+    total, best, count = cluster_summary(clusters, pop)
+    keep = np.flatnonzero(total >= threshold)
+
+    # 위경도 변환 (기존 결과와 같도록 위경도 좌표계에서 중심점을 구함)
+    best_ll = shadow_grids.iloc[best[keep]].to_crs(epsg=4326)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        centroid = best_ll.geometry.centroid
+
+    candidates_df = pd.DataFrame({
+        "lat": centroid.y.to_numpy(),
+        "lon": centroid.x.to_numpy(),
+        "total_pop": total[keep].astype(int),
+        "grid_count": count[keep],
+    })
+    candidates_df = candidates_df.sort_values("total_pop", ascending=False).reset_index(drop=True)
+    candidates_df['node_id'] = candidates_df.index + 1
+    return candidates_df
+
+
+# =========================================================
+# 3. 지역 목록
+# =========================================================
+def region_name(grid_path):
+    """'..._(격자) 100M_충청남도 천안시_202410/nlsp_*.shp' -> '충청남도 천안시'"""
+    folder = os.path.basename(os.path.dirname(os.path.abspath(grid_path)))
+    match = re.search(r"100M_(.+)_\d{6}$", folder)
+    return match.group(1) if match else folder
+
+
+def discover_regions(grid_dir=GRID_DIR):
+    """grid_dir 아래 모든 격자 shp -> {지역명: 경로}"""
+    regions = {}
+    for root, _, files in os.walk(grid_dir):
+        for f in sorted(files):
+            if f.lower().endswith(".shp"):
+                path = os.path.join(root, f)
+                regions[region_name(path)] = path
+    return dict(sorted(regions.items()))
+
+
+# =========================================================
+# 4. 지역 1곳 처리 (워커 프로세스)
+# =========================================================
+def _limit_memory(mem_limit_mb):
+    """워커 주소 공간 상한 (초과 시 MemoryError 로 해당 지역만 실패 처리)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    if mem_limit_mb:
+        limit = int(mem_limit_mb) * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _region_dir(out_dir, region):
+    return os.path.join(out_dir, re.sub(r'[\\/:*?"<>|\s]+', "_", region))
+
+
+def site_region(region, grid_path, excel_path, out_dir, radius=SERVICE_DIST, threshold=INSTALL_THRESHOLD):
+    """지역 1곳의 사각지대 -> 후보지 CSV 저장 후 요약 반환 (완료 표시 파일은 마지막에 원자적으로 기록)"""
+    from scipy.spatial import cKDTree
+    from geo_cache import load_grid, load_bus_stops
+
+    start = time.perf_counter()
+    grid = load_grid(grid_path)
+    populated = grid[grid['val'] > 0]
+    # 시 경계 밖(인접 지역) 정류장의 서비스권도 반영하도록 전국 정류장으로 판정
+    tree = cKDTree(points_xy(load_bus_stops(excel_path, columns=[])))
+    shadow = populated[~covered_mask(points_xy(populated), tree, radius)]
+    candidates = select_candidates(shadow, radius, threshold)
+
+    region_dir = _region_dir(out_dir, region)
+    os.makedirs(region_dir, exist_ok=True)
+    csv_path = os.path.join(region_dir, CANDIDATE_FILE)
+    candidates.to_csv(csv_path + ".tmp", index=False, encoding="utf-8-sig")
+    os.replace(csv_path + ".tmp", csv_path)
+
+    summary = {
+        "region": region,
+        "grid_path": os.path.abspath(grid_path),
+        "radius": radius,
+        "threshold": threshold,
+        "status": "done",
+        "populated_grids": int(len(populated)),
+        "shadow_grids": int(len(shadow)),
+        "candidates": int(len(candidates)),
+        "candidate_pop": int(candidates['total_pop'].sum()) if len(candidates) else 0,
+        "csv": os.path.relpath(csv_path, out_dir),
+        "elapsed": time.perf_counter() - start,
+    }
+    done_path = os.path.join(region_dir, DONE_FILE)
+    with open(done_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    os.replace(done_path + ".tmp", done_path)
+    return summary
+
+
+def _run_region(args):
+    region, grid_path, excel_path, out_dir, radius, threshold, mem_limit_mb = args
+    _limit_memory(mem_limit_mb)
+    try:
+        return site_region(region, grid_path, excel_path, out_dir, radius, threshold)
+    except MemoryError:
+        return {"region": region, "grid_path": os.path.abspath(grid_path), "status": "failed: memory limit"}
+    except Exception as e:
+        return {"region": region, "grid_path": os.path.abspath(grid_path),
+                "status": f"failed: {type(e).__name__}: {e}"}
+
+
+def _load_done(out_dir, region, grid_path, radius, threshold):
+    """같은 조건으로 이미 끝난 지역이면 요약, 아니면 None"""
+    done_path = os.path.join(_region_dir(out_dir, region), DONE_FILE)
+    if not os.path.exists(done_path):
+        return None
+    with open(done_path, encoding="utf-8") as f:
+        summary = json.load(f)
+    same = (summary.get("grid_path") == os.path.abspath(grid_path) and summary.get("radius") == radius
+            and summary.get("threshold") == threshold)
+    return summary if same else None
+
+
+# =========================================================
+# 5. 전국 일괄 실행 (재시작 가능)
+# =========================================================
+def run_batch(regions=None, excel_path=None, out_dir=SITING_DIR, radius=SERVICE_DIST,
+              threshold=INSTALL_THRESHOLD, workers=None, mem_limit_mb=MEM_LIMIT_MB, resume=True):
+    """
+    여러 지역 격자에 대해 후보 정류장 선정을 프로세스 풀로 병렬 실행
+
+    regions : {지역명: 격자 shp 경로} 또는 경로 목록 (None 이면 data/grid_data 전체)
+    - 지역마다 out_dir/<지역>/stops_over_100.csv 와 완료 표시(done.json)를 남기고,
+      resume=True 이면 같은 조건으로 끝난 지역은 건너뜁니다. (중간에 죽어도 남은 지역만 다시 실행)
+    - 워커는 지역 1곳마다 새로 띄우고 mem_limit_mb 로 메모리 상한을 둡니다.
+    - 전체 결과는 out_dir/index.csv (지역별 요약) 와 all_candidates.csv (후보지 병합) 로 저장합니다.
+    """
+    from geo_cache import BUS_EXCEL_PATH, load_bus_stops
+
+    excel_path = excel_path or BUS_EXCEL_PATH
+    if regions is None:
+        regions = discover_regions()
+    elif not isinstance(regions, dict):
+        regions = {region_name(p): p for p in regions}
+    os.makedirs(out_dir, exist_ok=True)
+
+    # 정류장 캐시는 워커들이 동시에 만들지 않도록 미리 생성
+    load_bus_stops(excel_path, columns=[])
+
+    summaries, todo = {}, []
+    for region, path in regions.items():
+        done = _load_done(out_dir, region, path, radius, threshold) if resume else None
+        if done is not None:
+            summaries[region] = {**done, "status": "skipped (done)"}
+        else:
+            todo.append((region, path, excel_path, out_dir, radius, threshold, mem_limit_mb))
+    print(f"--- [Batch] 지역 {len(regions)}곳 중 {len(todo)}곳 처리 (완료 {len(regions) - len(todo)}곳 건너뜀) ---")
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+            futures = [pool.submit(_run_region, task) for task in todo]
+            for fut in as_completed(futures):
+                s = fut.result()
+                summaries[s["region"]] = s
+                print(f" - {s['region']}: {s['status']}"
+                      + (f", 후보지 {s['candidates']}곳 ({s['elapsed']:.1f}초)" if s["status"] == "done" else ""))
+
+    index = pd.DataFrame([summaries[r] for r in regions])
+    index.to_csv(os.path.join(out_dir, "index.csv"), index=False, encoding="utf-8-sig")
+
+    merged = []
+    for s in summaries.values():
+        if s["status"] in ("done", "skipped (done)"):
+            df = pd.read_csv(os.path.join(out_dir, s["csv"]), encoding="utf-8-sig")
+            df.insert(0, "region", s["region"])
+            merged.append(df)
+    merged = pd.concat(merged, ignore_index=True) if merged else pd.DataFrame(columns=["region"] + CANDIDATE_COLUMNS)
+    merged.to_csv(os.path.join(out_dir, "all_candidates.csv"), index=False, encoding="utf-8-sig")
+
+    n_fail = int((~index['status'].isin(["done", "skipped (done)"])).sum())
+    print(f"✅ [Batch] 후보지 {len(merged):,}곳 병합 저장 (실패 {n_fail}곳): {out_dir}")
+    return index
+
+
+def main():
+    """지역별 정류장 후보지 일괄 선정"""
+    run_batch()
+
+
+if __name__ == "__main__":
+    main()
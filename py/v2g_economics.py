@@ -0,0 +1,298 @@
+import numpy as np
+import pandas as pd
+import glob
+import os
+import re
+import time
+
+# =========================================================
+# 1. 경로 / V2G 운영 상수 (e-drt_inicoi5.py 와 동일한 값)
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+SMP_DIR = os.path.join(DATA_DIR, "smp")  # 시간별 SMP CSV (여러 해 / 여러 파일)
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+
+BATTERY_CAP = 77.4        # 배터리 용량 (kWh, 아이오닉 5 Long Range)
+V2G_AMOUNT = 20.0         # 1일 V2G 방전량 (kWh)
+EFFICIENCY = 0.9          # 충/방전 효율 (Round-trip 효율)
+C_DEG = 60                # 배터리 열화 비용 (원/kWh)
+NUM_VEHICLES = 12
+
+V2G_INCENTIVE = 100       # [전략 제안] kWh당 정책 인센티브
+C_DEG_FUTURE = 20         # [전략 제안] 기술 발전으로 낮아진 열화 비용
+
+CHARGE_HOURS = (1, 2, 3, 4, 5, 6)      # 새벽 충전 시간대 (SMP 시간 표기 1~24)
+DISCHARGE_HOURS = (14, 15, 16, 17)     # 오후 방전 시간대
+HOURS = 24
+CHUNK_ROWS = 200_000                   # CSV 를 나눠 읽을 행 수
+
+
+# =========================================================
+# 2. SMP 파일 읽기 (청크 단위, 일 × 24시간 행렬로 변환)
+# =========================================================
+# 지원 형식
+# - 세로형: (날짜) + time('1h'~'24h' 또는 1~24) + price  (날짜 컬럼이 없으면 파일명의 YYYY-MM-DD 사용)
+# - 가로형: 날짜 + 1h ~ 24h 컬럼 (전력거래소 SMP 내려받기 형식)
+DATE_COLUMNS = ("date", "일자", "거래일", "구분", "기간", "day")
+HOUR_COLUMNS = ("time", "hour", "시간")
+
+
+def _hour_number(values):
+    """'1h' / ' 1 ' / 1 -> 1 (숫자로 바꿀 수 없으면 NaN)"""
+    return pd.to_numeric(pd.Series(values).astype(str).str.replace("h", "", regex=False).str.strip(),
+                         errors="coerce").to_numpy()
+
+
+def _wide_hour_columns(columns):
+    """가로형 시간 컬럼 {컬럼명: 시간(1~24)}"""
+    hours = {}
+    for c in columns:
+        m = re.fullmatch(r"\s*(\d{1,2})\s*h?\s*", str(c))
+        if m and 1 <= int(m.group(1)) <= HOURS:
+            hours[c] = int(m.group(1))
+    return hours
+
+
+def _file_date(path):
+    m = re.search(r"(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})", os.path.basename(path))
+    return np.datetime64(f"{m.group(1)}-{m.group(2)}-{m.group(3)}", "D") if m else np.datetime64("NaT", "D")
+
+
+def _read_chunks(path, chunksize):
+    try:
+        reader = pd.read_csv(path, chunksize=chunksize, encoding="utf-8-sig")
+        first = next(reader)
+    except UnicodeDecodeError:
+        reader = pd.read_csv(path, chunksize=chunksize, encoding="cp949")
+        first = next(reader)
+    yield first
+    yield from reader
+
+
+def _chunk_records(chunk, path):
+    """청크 1개 -> (날짜[D], 시간 1~24, 가격) 1차원 배열"""
+    chunk.columns = [str(c).strip() for c in chunk.columns]
+    date_col = next((c for c in chunk.columns if c.lower() in DATE_COLUMNS), None)
+    if date_col is not None:
+        dates = pd.to_datetime(chunk[date_col].astype(str).str.strip(), errors="coerce").to_numpy("datetime64[D]")
+    else:
+        dates = np.full(len(chunk), _file_date(path))
+
+    hour_col = next((c for c in chunk.columns if c.lower() in HOUR_COLUMNS), None)
+    if hour_col is not None and "price" in [c.lower() for c in chunk.columns]:
+        price_col = next(c for c in chunk.columns if c.lower() == "price")
+        return dates, _hour_number(chunk[hour_col]), pd.to_numeric(chunk[price_col], errors="coerce").to_numpy()
+
+    wide = _wide_hour_columns(chunk.columns)
+    if not wide:
+        raise ValueError(f"SMP 형식을 알 수 없습니다 (time/price 또는 1h~24h 컬럼 필요): {path}")
+    values = chunk[list(wide)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    return (np.repeat(dates, len(wide)), np.tile(np.array(list(wide.values()), dtype=np.float64), len(chunk)),
+            values.ravel())
+
+
+def load_smp(paths, chunksize=CHUNK_ROWS):
+    """
+    SMP CSV 여러 개 -> (날짜 배열[D], (일 수, 24) 가격 행렬)
+
+    파일을 chunksize 행씩 읽어 (날짜, 시간, 가격) 으로만 모은 뒤 한 번에 행렬로 채웁니다.
+    같은 날짜 / 시간이 여러 번 나오면 마지막 값을 쓰고, 없는 시간은 NaN 입니다.
+    """
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(os.path.join(paths, "*.csv"))) if os.path.isdir(paths) else [paths]
+    dates, hours, prices = [], [], []
+    for path in paths:
+        for chunk in _read_chunks(path, chunksize):
+            d, h, p = _chunk_records(chunk, path)
+            ok = ~np.isnat(d) & np.isfinite(h) & (h >= 1) & (h <= HOURS)
+            dates.append(d[ok])
+            hours.append(h[ok].astype(np.int64))
+            prices.append(p[ok])
+    if not dates:
+        return np.array([], dtype="datetime64[D]"), np.empty((0, HOURS))
+
+    dates = np.concatenate(dates)
+    days, day_idx = np.unique(dates, return_inverse=True)
+    matrix = np.full((len(days), HOURS), np.nan)
+    matrix[day_idx, np.concatenate(hours) - 1] = np.concatenate(prices)
+    return days, matrix
+
+
+# =========================================================
+# 3. 일별 최적 충/방전 스케줄 (일 단위 벡터화)
+# =========================================================
+def _segments(energy, power_kw, efficiency, n_charge, n_discharge):
+    """
+    방전량 [0, energy] 를 한계 가격이 일정한 구간으로 분할 -> (구간 길이, 방전 시간 순위, 충전 시간 순위)
+
+    x 번째 kWh 방전은 비싼 순서로 x / P 번째 방전 시간, 필요한 충전량 x / 효율 은
+    싼 순서로 (x / 효율) / P 번째 충전 시간에 대응합니다. 구간 경계는 날짜와 무관하므로 한 번만 계산합니다.
+    """
+    if power_kw is None:
+        return np.array([energy]), np.array([0]), np.array([0])
+    bounds = np.unique(np.concatenate([
+        np.arange(n_discharge + 1) * power_kw,
+        np.arange(n_charge + 1) * power_kw * efficiency,
+        [energy],
+    ]))
+    bounds = bounds[bounds <= energy]
+    mid = (bounds[:-1] + bounds[1:]) / 2
+    return np.diff(bounds), (mid // power_kw).astype(np.int64), (mid / efficiency // power_kw).astype(np.int64)
+
+
+def daily_schedule(prices, energy=V2G_AMOUNT, efficiency=EFFICIENCY, c_deg=C_DEG, battery_cap=BATTERY_CAP,
+                   charge_hours=CHARGE_HOURS, discharge_hours=DISCHARGE_HOURS, power_kw=None,
+                   incentive=0.0, optimize=True):
+    """
+    (일 수, 24) SMP 행렬 -> 일별 방전량 / 매출 / 충전 비용 / 열화 비용 / 순수익 (dict of arrays)
+
+    - 충전은 charge_hours 중 싼 시간부터, 방전은 discharge_hours 중 비싼 시간부터 채웁니다.
+      (충전 시간대가 방전 시간대보다 앞서므로 순서 제약은 자동으로 만족)
+    - power_kw : 시간당 충/방전 한도 (None 이면 기존 분석처럼 최저 / 최고 1시간에 전량)
+    - 방전량 상한 = min(energy, 배터리 용량 × 효율, 시간대 × 출력 한도)
+    - optimize=True 이면 1 kWh 더 방전할 때의 한계 수익이 양수인 만큼만 거래 (손해 보는 날은 쉼),
+      False 이면 기존 분석처럼 매일 상한만큼 거래
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    c_idx = np.asarray(charge_hours) - 1
+    d_idx = np.asarray(discharge_hours) - 1
+
+    # 빈 시간(NaN)은 충전 시 +inf, 방전 시 -inf 로 두어 맨 뒤로 보냄
+    charge_raw = np.where(np.isnan(prices[:, c_idx]), np.inf, prices[:, c_idx])
+    discharge_raw = np.where(np.isnan(prices[:, d_idx]), -np.inf, prices[:, d_idx])
+    charge = np.sort(charge_raw, axis=1)
+    discharge = -np.sort(-discharge_raw, axis=1)
+
+    e_max = min(energy, battery_cap * efficiency)
+    if power_kw is not None:
+        e_max = min(e_max, len(d_idx) * power_kw, len(c_idx) * power_kw * efficiency)
+    length, d_rank, c_rank = _segments(e_max, power_kw, efficiency, len(c_idx), len(d_idx))
+
+    sell = discharge[:, d_rank]                     # (일, 구간) 방전 단가
+    buy = charge[:, c_rank] / efficiency            # 방전 1 kWh 당 충전 비용
+    margin = sell + incentive - buy - c_deg         # 한계 수익 (구간 순서로 감소)
+    with np.errstate(invalid="ignore"):
+        if optimize:
+            traded = np.where(margin > 0, length, 0.0)
+        else:
+            traded = np.where(np.isfinite(margin), length, np.nan)
+
+        kwh = np.nansum(traded, axis=1) if optimize else traded.sum(axis=1)
+        revenue = np.nansum(np.where(traded > 0, sell * traded, 0.0), axis=1)
+        charge_cost = np.nansum(np.where(traded > 0, buy * traded, 0.0), axis=1)
+    if not optimize:
+        bad = np.isnan(kwh)
+        revenue[bad] = charge_cost[bad] = np.nan
+    degradation = kwh * c_deg
+    bonus = kwh * incentive
+
+    has_charge = np.isfinite(charge[:, 0])
+    has_discharge = np.isfinite(discharge[:, 0])
+    return {
+        "v2g_kwh": kwh,
+        "smp_low": np.where(has_charge, charge[:, 0], np.nan),
+        "smp_high": np.where(has_discharge, discharge[:, 0], np.nan),
+        "charge_hour": np.where(has_charge, np.asarray(charge_hours)[np.argmin(charge_raw, axis=1)], -1),
+        "discharge_hour": np.where(has_discharge, np.asarray(discharge_hours)[np.argmax(discharge_raw, axis=1)], -1),
+        "revenue": revenue,
+        "charge_cost": charge_cost,
+        "degradation_cost": degradation,
+        "incentive": bonus,
+        "profit": revenue + bonus - charge_cost - degradation,
+    }
+
+
+def daily_frame(dates, prices, **kwargs):
+    """daily_schedule 결과를 날짜 인덱스 DataFrame 으로"""
+    out = pd.DataFrame(daily_schedule(prices, **kwargs))
+    out.insert(0, "date", pd.to_datetime(dates))
+    return out
+
+
+# =========================================================
+# 4. 연간 수익 분포
+# =========================================================
+def annual_summary(daily, num_vehicles=NUM_VEHICLES):
+    """연도별 차량 1대 / 전체 연간 순수익과 일 수익 분포"""
+    profit = daily['profit']
+    year = daily['date'].dt.year
+    g = profit.groupby(year)
+    out = pd.DataFrame({
+        "days": g.count(),
+        "profit_per_car": g.sum(),
+        "fleet_profit": g.sum() * num_vehicles,
+        "mean_daily": g.mean(),
+        "p05_daily": g.quantile(0.05),
+        "p50_daily": g.median(),
+        "p95_daily": g.quantile(0.95),
+        "trade_day_ratio": (daily['v2g_kwh'] > 0).groupby(year).mean(),
+    })
+    # 자료가 1년치보다 적은 해는 365일 기준으로 환산한 값도 함께
+    out["profit_per_car_365"] = out["mean_daily"] * 365
+    out.index.name = "year"
+    return out.reset_index()
+
+
+def bootstrap_annual(daily_profit, n_boot=10000, days=365, num_vehicles=NUM_VEHICLES, seed=42):
+    """일 수익에서 days 일을 복원 추출한 연간 전체(num_vehicles 대) 수익 표본 n_boot 개"""
+    p = np.asarray(daily_profit, dtype=np.float64)
+    p = p[np.isfinite(p)]
+    if len(p) == 0:
+        return np.empty(0)
+    rng = np.random.default_rng(seed)
+    total = np.zeros(n_boot)
+    # 표본 행렬(n_boot × days)을 한 번에 만들지 않고 일 단위 블록으로 누적
+    for start in range(0, days, 64):
+        total += p[rng.integers(0, len(p), size=(n_boot, min(64, days - start)))].sum(axis=1)
+    return total * num_vehicles
+
+
+def distribution(samples, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """표본 -> 평균 / 분위수 / 손실 확률 dict"""
+    samples = np.asarray(samples, dtype=np.float64)
+    out = {"mean": float(samples.mean()), "std": float(samples.std())}
+    out.update({f"p{int(q * 100):02d}": float(v) for q, v in zip(quantiles, np.quantile(samples, quantiles))})
+    out["loss_prob"] = float((samples < 0).mean())
+    return out
+
+
+def analyze(paths=SMP_DIR, num_vehicles=NUM_VEHICLES, n_boot=10000, **kwargs):
+    """SMP 파일 -> (일별 DataFrame, 연도별 요약, 부트스트랩 연간 전체 수익 분포)"""
+    start = time.perf_counter()
+    dates, prices = load_smp(paths)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    daily = daily_frame(dates, prices, **kwargs)
+    annual = annual_summary(daily, num_vehicles)
+    dist = distribution(bootstrap_annual(daily['profit'], n_boot, num_vehicles=num_vehicles)) if len(daily) else {}
+    print(f" - SMP {len(dates):,}일 로드 {load_time:.2f}초, 스케줄 / 분포 계산 {time.perf_counter() - start:.3f}초")
+    return daily, annual, dist
+
+
+def main():
+    """기본 / 전략 제안 시나리오 연간 V2G 수익 저장"""
+    if not os.path.isdir(SMP_DIR):
+        print(f"경로 에러: {SMP_DIR}\n시간별 SMP 폴더를 찾을 수 없습니다. 경로를 다시 확인해주세요.")
+        return
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+    scenarios = {
+        "기본 (열화 60원)": dict(c_deg=C_DEG),
+        "전략 제안 (인센티브 100원, 열화 20원)": dict(c_deg=C_DEG_FUTURE, incentive=V2G_INCENTIVE),
+    }
+    for label, params in scenarios.items():
+        print(f"--- [V2G] {label} ---")
+        daily, annual, dist = analyze(SMP_DIR, **params)
+        print(annual.to_string(index=False))
+        if dist:
+            print(f"🚀 {NUM_VEHICLES}대 연간 수익 분포 (만원): 중앙값 {dist['p50'] / 10000:,.1f}, "
+                  f"5~95% {dist['p05'] / 10000:,.1f} ~ {dist['p95'] / 10000:,.1f}, 손실 확률 {dist['loss_prob']:.1%}")
+        tag = "base" if "기본" in label else "proposal"
+        annual.to_csv(os.path.join(VISUAL_DIR, f"v2g_annual_{tag}.csv"), index=False, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+import os
+import time
+
+from v2g_economics import C_DEG, EFFICIENCY, load_smp, SMP_DIR
+from gridstable import NUM_VEHICLES_CURRENT, NUM_VEHICLES_EXPANDED
+
+# =========================================================
+# 차량별 시간 단위 충/방전 스케줄 LP (운행 패턴별 희소 LP)
+# =========================================================
+# e-drt_inicoi5.py 는 하루 충전 1회 / 방전 1회, ideal_ver_opt.py 는 허브 방전량 dis <= 20 만 가정했습니다.
+# 여기서는 차량 v, 시각 t 마다
+#   c[v,t] : 계통에서 충전한 전력량 (kWh)      0 <= c <= 충전기 출력 × 정차 여부
+#   d[v,t] : 계통으로 방전한 전력량 (kWh)      0 <= d <= 방전 출력 × 정차 여부
+#   s[v,t] : 시각 t 종료 시점 배터리 에너지     SOC_MIN ~ SOC_MAX (%) × 용량
+#   u[v,t] : 주행 중 배터리가 부족할 때의 비상 충전 (큰 벌점, 보통 0)
+# 에너지 수지  s[t] = s[t-1] + η·c[t] - d[t]/η - 주행 소모[t] + u[t]  (η = 왕복 효율의 제곱근)
+# 목적 함수    Σ SMP·c - (SMP + 인센티브)·d + 열화 비용·d + 벌점·u  최소화
+# 변수 / 제약은 scipy.sparse 로 한 번에 만들고 HiGHS 쌍대 단체법(scipy.optimize.linprog)으로 풉니다.
+# - 정차 / 주행 패턴이 같은 차량은 최적 스케줄도 같으므로 패턴마다 대표 1대만 (대수를 가중치로) 풉니다.
+# - 차량 사이에 묶이는 제약이 없으면 패턴마다 1대짜리 LP 를 프로세스 병렬로 (여러 대를 한 LP 로 묶으면 더 느림)
+# - (선택) 시간별 전체 방전 한도 Σ_v d[v,t] <= L[t] 가 있으면 패턴 전체를 block_hours 단위 LP 로,
+#   뒤 lookahead_hours 를 함께 풀고 앞 block_hours 만 확정한 뒤 마지막 SoC 를 다음 블록에 이어 줍니다.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # py/
+PROJECT_ROOT = os.path.dirname(BASE_DIR)  # 프로젝트 루트
+VISUAL_DIR = os.path.join(PROJECT_ROOT, "visualization")
+
+BATTERY_CAP = 64.0           # kWh (ideal_ver_opt / heuristic_dispatch 와 동일)
+SOC_MIN, SOC_MAX = 20.0, 100.0
+CHARGER_KW = 10.0            # 충/방전 출력 (gridstable.DISCHARGE_POWER_PER_CAR)
+ENERGY_PER_KM = 0.31         # kWh/km
+SHORTFALL_PENALTY = 1e6      # 비상 충전 1 kWh 벌점 (원)
+BLOCK_HOURS = 168            # 전체 방전 한도가 있을 때 한 번에 확정하는 시간 수 (1주)
+LOOKAHEAD_HOURS = 24         # 블록 뒤로 함께 풀고 버리는 시간 수 (블록 끝 SoC 조건의 영향 완화)
+
+
+class V2GSchedule:
+    """차량 × 시간 충전 / 방전 / SoC 결과와 수익 집계"""
+
+    def __init__(self, charge, discharge, soc, shortfall, prices, incentive, c_deg, elapsed):
+        self.charge = charge          # (V, T) kWh
+        self.discharge = discharge    # (V, T) kWh
+        self.soc = soc                # (V, T) %
+        self.shortfall = shortfall    # (V, T) kWh
+        self.prices = prices
+        self.incentive = incentive
+        self.c_deg = c_deg
+        self.elapsed = elapsed
+
+    def vehicle_frame(self):
+        """차량별 충전량 / 방전량 / 매출 / 충전 비용 / 열화 비용 / 순수익"""
+        revenue = self.discharge @ (self.prices + self.incentive)
+        cost = self.charge @ self.prices
+        degradation = self.discharge.sum(axis=1) * self.c_deg
+        return pd.DataFrame({
+            "vehicle": np.arange(len(self.charge)),
+            "charge_kwh": self.charge.sum(axis=1),
+            "discharge_kwh": self.discharge.sum(axis=1),
+            "revenue": revenue,
+            "charge_cost": cost,
+            "degradation_cost": degradation,
+            "profit": revenue - cost - degradation,
+            "shortfall_kwh": self.shortfall.sum(axis=1),
+            "min_soc": self.soc.min(axis=1),
+        })
+
+    def fleet_frame(self):
+        """시간별 전체 충전 / 방전 / 평균 SoC (피크 시간 계통 기여량 확인용)"""
+        return pd.DataFrame({
+            "hour": np.arange(self.charge.shape[1]),
+            "price": self.prices,
+            "charge_kwh": self.charge.sum(axis=0),
+            "discharge_kwh": self.discharge.sum(axis=0),
+            "mean_soc": self.soc.mean(axis=0),
+        })
+
+
+# =========================================================
+# 운행(정차 불가) 구간 -> 시간별 가용 / 주행 소모 행렬
+# =========================================================
+def profiles_from_windows(windows, n_vehicles, horizon):
+    """
+    운행 구간 목록 -> (가용 여부 (V, T) bool, 주행 소모 (V, T) kWh)
+
+    windows : (차량, 시작 시각, 종료 시각(미포함), 주행 소모 kWh) 목록.
+              구간 동안은 충/방전할 수 없고, 소모량은 구간 시간에 고르게 나눕니다.
+    """
+    available = np.ones((n_vehicles, horizon), dtype=bool)
+    drive = np.zeros((n_vehicles, horizon))
+    for v, start, end, kwh in windows:
+        start, end = max(int(start), 0), min(int(end), horizon)
+        if end <= start:
+            continue
+        available[v, start:end] = False
+        drive[v, start:end] += kwh / (end - start)
+    return available, drive
+
+
+def windows_from_routes(routes, dist, start_hour=0, energy_per_km=ENERGY_PER_KM):
+    """
+    route_extract.VehicleRoute 목록 -> 운행 구간 (차량, 시작 시각, 종료 시각, 주행 소모 kWh)
+
+    arrival 은 분 단위이고 start_hour 시각부터 운행했다고 봅니다.
+    """
+    windows = []
+    for route in routes:
+        if len(route.nodes) < 2:
+            continue
+        km = sum(float(dist[i, j]) for i, j in route.arcs) / 1000
+        begin = start_hour + route.arrival[0] / 60
+        end = start_hour + route.arrival[-1] / 60
+        windows.append((route.vehicle, int(np.floor(begin)), int(np.ceil(max(end, begin + 1e-9))),
+                        km * energy_per_km))
+    return windows
+
+
+# =========================================================
+# 희소 LP 구성 / 풀이
+# =========================================================
+def _solve_task(args):
+    return _solve_block(*args)
+
+
+def _solve_block(prices, available, drive, soc_start, soc_end, battery_cap, charger_kw, discharge_kw,
+                 efficiency, c_deg, incentive, fleet_limit, weight=None):
+    """weight : 행(대표 차량)마다 같은 패턴 차량 수 (목적 함수와 전체 방전 한도에 곱함, None 이면 1)"""
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_matrix
+
+    V, T = available.shape
+    n = V * T
+    eta = np.sqrt(efficiency)
+    # 변수 순서: c | d | s | u  (각각 v * T + t)
+    c0, d0, s0, u0 = 0, n, 2 * n, 3 * n
+    idx = np.arange(n)
+    t_of = idx % T
+    w = np.ones(n) if weight is None else np.repeat(np.asarray(weight, dtype=np.float64), T)
+
+    price = np.tile(prices, V)
+    cost = np.concatenate([price, c_deg - (price + incentive), np.zeros(n), np.full(n, SHORTFALL_PENALTY)])
+    cost *= np.tile(w, 4)
+
+    # 에너지 수지: s[t] - s[t-1] - η·c[t] + d[t]/η - u[t] = -주행[t]   (t = 0 은 s[-1] = soc_start)
+    rows = [idx, idx, idx, idx]
+    cols = [s0 + idx, c0 + idx, d0 + idx, u0 + idx]
+    vals = [np.ones(n), np.full(n, -eta), np.full(n, 1 / eta), -np.ones(n)]
+    prev = idx[t_of > 0]
+    rows.append(prev)
+    cols.append(s0 + prev - 1)
+    vals.append(-np.ones(len(prev)))
+    a_eq = coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(n, 4 * n)).tocsr()
+    b_eq = -drive.ravel()
+    b_eq[t_of == 0] += soc_start
+
+    lo_s = np.full((V, T), SOC_MIN / 100 * battery_cap)
+    lo_s[:, -1] = np.maximum(lo_s[:, -1], soc_end)   # 블록 끝 SoC 하한 (기간 경계에서 배터리를 비우지 않도록)
+    lower = np.concatenate([np.zeros(2 * n), lo_s.ravel(), np.zeros(n)])
+    upper = np.concatenate([(available * charger_kw).ravel(), (available * discharge_kw).ravel(),
+                            np.full(n, SOC_MAX / 100 * battery_cap), np.full(n, np.inf)])
+
+    a_ub = b_ub = None
+    if fleet_limit is not None:
+        # 시간별 전체 방전 한도 Σ_v d[v,t] <= L[t]
+        a_ub = coo_matrix((w, (t_of, d0 + idx)), shape=(T, 4 * n)).tocsr()
+        b_ub = np.broadcast_to(np.asarray(fleet_limit, dtype=np.float64), (T,)).copy()
+
+    res = linprog(cost, A_ub=a_ub, b_ub=b_ub, A_eq=a_eq, b_eq=b_eq, bounds=np.column_stack([lower, upper]),
+                  method="highs-ds")
+    if res.status != 0:
+        raise RuntimeError(f"V2G 스케줄 LP 실패: {res.message}")
+    x = res.x.reshape(4, V, T)
+    return x[0], x[1], x[2], x[3]
+
+
+def _profile_classes(available, drive):
+    """정차 / 주행 패턴이 같은 차량 묶음 -> (묶음별 대표 차량, 차량별 묶음 번호, 묶음별 차량 수)"""
+    key = np.hstack([available.astype(np.float64), drive])
+    _, first, inverse, counts = np.unique(key, axis=0, return_index=True, return_inverse=True,
+                                          return_counts=True)
+    return first, inverse.ravel(), counts
+
+
+def schedule_fleet(prices, n_vehicles=12, available=None, drive=None, battery_cap=BATTERY_CAP,
+                   soc_init=80.0, charger_kw=CHARGER_KW, discharge_kw=None, efficiency=EFFICIENCY,
+                   c_deg=C_DEG, incentive=0.0, fleet_limit=None, block_hours=None, lookahead_hours=LOOKAHEAD_HOURS,
+                   workers=None):
+    """
+    시간별 SMP (T,) 에 대해 차량 n_vehicles 대의 최적 충/방전 스케줄
+
+    available / drive : (V, T) 정차 가능 여부 / 주행 소모 kWh (profiles_from_windows 결과, 없으면 항상 정차)
+    soc_init          : 시작 SoC (%), 각 블록 끝 SoC 는 시작 SoC 이상으로 유지
+    fleet_limit       : 시간별 전체 방전 한도 kW (스칼라 또는 (T,))
+    block_hours       : 한 번에 확정할 시간 수 (None 이면 fleet_limit 가 없을 때 전체 기간, 있을 때 BLOCK_HOURS)
+    lookahead_hours   : 블록 뒤로 함께 풀고 버리는 시간 수
+    workers           : fleet_limit 가 없을 때 패턴별 LP 를 나눠 풀 프로세스 수 (None 이면 CPU 수)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    T = len(prices)
+    V = n_vehicles
+    available = np.ones((V, T), dtype=bool) if available is None else np.asarray(available, dtype=bool)
+    drive = np.zeros((V, T)) if drive is None else np.asarray(drive, dtype=np.float64)
+    discharge_kw = charger_kw if discharge_kw is None else discharge_kw
+    if fleet_limit is not None:
+        fleet_limit = np.broadcast_to(np.asarray(fleet_limit, dtype=np.float64), (T,))
+    soc_level = battery_cap * soc_init / 100
+    params = (battery_cap, charger_kw, discharge_kw, efficiency, c_deg, incentive)
+
+    start = time.perf_counter()
+    rep, cls, weight = _profile_classes(available, drive)
+    K = len(rep)
+    out = {k: np.empty((K, T)) for k in ("c", "d", "s", "u")}
+    if fleet_limit is None and block_hours is None:
+        # 차량끼리 묶이는 제약이 없으므로 패턴마다 전체 기간을 1대짜리 LP 로 (프로세스 병렬)
+        tasks = [(prices, available[[r]], drive[[r]], np.full(1, soc_level), soc_level, *params, None)
+                 for r in rep]
+        workers = os.cpu_count() if workers is None else workers
+        if workers > 1 and K > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(workers, K)) as pool:
+                results = list(pool.map(_solve_task, tasks, chunksize=max(1, K // (4 * workers))))
+        else:
+            results = [_solve_task(task) for task in tasks]
+        for k, res in enumerate(results):
+            for key, arr in zip(("c", "d", "s", "u"), res):
+                out[key][k] = arr[0]
+    else:
+        # 시간별 전체 한도가 있으면 패턴 전체를 시간 블록 단위로 (블록 + 앞보기 구간을 풀고 블록만 확정)
+        block_hours = BLOCK_HOURS if block_hours is None else block_hours
+        avail_c, drive_c = available[rep], drive[rep]
+        soc_start = np.full(K, soc_level)
+        for b in range(0, T, block_hours):
+            keep = min(b + block_hours, T)
+            win = slice(b, min(keep + lookahead_hours, T))
+            res = _solve_block(prices[win], avail_c[:, win], drive_c[:, win], soc_start, soc_level, *params,
+                               None if fleet_limit is None else fleet_limit[win], weight)
+            for key, arr in zip(("c", "d", "s", "u"), res):
+                out[key][:, b:keep] = arr[:, :keep - b]
+            soc_start = out["s"][:, keep - 1]
+    out = {k: arr[cls] for k, arr in out.items()}
+
+    # LP 해의 작은 음수 / 잡음 정리
+    for k in ("c", "d", "u"):
+        out[k][np.abs(out[k]) < 1e-9] = 0.0
+    return V2GSchedule(out["c"], out["d"], out["s"] / battery_cap * 100, out["u"], prices, incentive, c_deg,
+                       time.perf_counter() - start)
+
+
+def main():
+    """12대 / 50대 시간별 충방전 스케줄 저장"""
+    if not os.path.isdir(SMP_DIR):
+        print(f"경로 에러: {SMP_DIR}\n시간별 SMP 폴더를 찾을 수 없습니다. 경로를 다시 확인해주세요.")
+        return
+    dates, smp = load_smp(SMP_DIR)
+    prices = pd.Series(smp.ravel()).ffill().bfill().to_numpy()
+    print(f"--- [V2G LP] SMP {len(dates):,}일 ({len(prices):,}시간) ---")
+    os.makedirs(VISUAL_DIR, exist_ok=True)
+    for n_vehicles in (NUM_VEHICLES_CURRENT, NUM_VEHICLES_EXPANDED):  # 현재 규모 / 확대 시나리오
+        # 매일 9~18시 운행 (주행 40km) 가정
+        windows = [(v, day * 24 + 9, day * 24 + 18, 40 * ENERGY_PER_KM)
+                   for v in range(n_vehicles) for day in range(len(dates))]
+        available, drive = profiles_from_windows(windows, n_vehicles, len(prices))
+        result = schedule_fleet(prices, n_vehicles, available, drive)
+        per_car = result.vehicle_frame()
+        print(f" - {n_vehicles}대: 전체 순수익 {per_car['profit'].sum() / 10000:,.1f} 만원, "
+              f"방전 {per_car['discharge_kwh'].sum():,.0f} kWh, 풀이 {result.elapsed:.1f}초")
+        per_car.to_csv(os.path.join(VISUAL_DIR, f"v2g_schedule_{n_vehicles}.csv"), index=False, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()